@@ -7,9 +7,10 @@
 #------------------------------------------------------------------
 #This section imports external libraries to be used in this project
 import os                       #Basic computer capabilities to be able to locate csv files inside data folder
-import yfinance as data_pull    #API call to yahoo finance for financial data
+from thesis import fetch        #API call to yahoo finance for financial data, cached inside Cache folder (THESIS_OFFLINE=1 uses Data folder)
 import pandas as pd             #Data manipulation external library
 import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+from thesis import report      #Debug csv files are written inside Output/debug
 from arch import arch_model       #GARCH model
 from arch.unitroot import ADF   #Augmented Dickey-Fuller Test from external library 'arch'
 
@@ -41,23 +42,11 @@ except:
 #------------------------------------------------------------------
 #This section pulls data from yahoo finance based on the parameters set above
 print("[*] Downloading Commodity Data")
-raw_data['oil'] = data_pull.download(
-    tickers['oil'],                
-    research_period['start'],       
-    research_period['end'],         
-    time_interval            
-    )
-raw_data['coal'] = data_pull.download(
-    tickers['coal'],                
-    research_period['start'],       
-    research_period['end'],         
-    time_interval            
-    )
-raw_data['gas'] = data_pull.download(
-    tickers['gas'],                
-    research_period['start'],       
-    research_period['end'],         
-    time_interval           
+raw_data = fetch.download_frames(   #Oil, coal and gas are downloaded concurrently
+    tickers,
+    research_period['start'],
+    research_period['end'],
+    time_interval
     )
 
 print("[*] Completed Downloading Commodity Data")
@@ -138,8 +127,8 @@ garch_result = model.fit()
 #print(independent_variable.index)
 print(garch_result.summary())
 #print(garch_result.pvalues)
-returns_dataframe['S&P SEA 40 Index'].to_csv('index.csv')  
+report.debug_csv(returns_dataframe['S&P SEA 40 Index'], 'index.csv')  
 print("[*] Descriptive Summary Generated at: Output/processed_output.csv")
-returns_dataframe['Crude Oil'].to_csv('return_oil.csv')
-raw_data['oil'].to_csv('raw_oil.csv')
+report.debug_csv(returns_dataframe['Crude Oil'], 'return_oil.csv')
+report.debug_csv(raw_data['oil'], 'raw_oil.csv')
 print("[*] ADF Test Summary Generated at: Output/processed_output.csv")
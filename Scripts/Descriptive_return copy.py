@@ -7,9 +7,10 @@
 #------------------------------------------------------------------
 #This section imports external libraries to be used in this project
 import os                       #Basic computer capabilities to be able to locate csv files inside data folder
-import yfinance as data_pull    #API call to yahoo finance for financial data
+from thesis import price_cache as data_pull  #API call to yahoo finance for financial data, cached inside Cache folder (THESIS_OFFLINE=1 uses Data folder)
 import pandas as pd             #Data manipulation external library
 import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+from thesis import report      #Debug csv files are written inside Output/debug
 from arch import arch_model       #GARCH model
 from arch.unitroot import ADF   #Augmented Dickey-Fuller Test from external library 'arch'
 
@@ -136,9 +137,9 @@ garch_result = model.fit()
 print(independent_variable.shape)
 print(garch_result.summary())
 #print(garch_result.pvalues)
-returns_dataframe['S&P SEA 40 Index'].to_csv('index2.csv')  
+report.debug_csv(returns_dataframe['S&P SEA 40 Index'], 'index2.csv')  
 print("[*] Descriptive Summary Generated at: Output/processed_output.csv")
-returns_dataframe['Crude Oil'].to_csv('return_oil2.csv')
-returns_dataframe.to_csv('dataframe2.csv')
-raw_data['oil'].to_csv('raw_oil2.csv')
+report.debug_csv(returns_dataframe['Crude Oil'], 'return_oil2.csv')
+report.debug_csv(returns_dataframe, 'dataframe2.csv')
+report.debug_csv(raw_data['oil'], 'raw_oil2.csv')
 print("[*] ADF Test Summary Generated at: Output/processed_output.csv")
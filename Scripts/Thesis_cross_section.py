@@ -0,0 +1,22 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#This section imports external libraries to be used in this project
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+from thesis import cross_section   #Fits the GARCH-X of every dependent series on all CPU cores
+
+#-------------------------------------------------------------------
+# File Hierarchy: Thesis Folder -> Studies Folder (cross_section_20_23.toml) | Data Folder | Output Folder | Scripts Folder (Thesis.py)
+#Dependent series, the common exogenous block and the model are set inside the [cross_section] table of the study file
+script_directory = os.path.dirname(os.path.abspath(__file__))
+study_location = os.path.join(script_directory, '../Studies/cross_section_20_23.toml')
+#-------------------------------------------------------------------
+#This section fits every dependent series and writes the stacked coefficient table into the Output folder
+if __name__ == '__main__':     #Worker processes import this file again, only the parent runs the fits
+    tables = cross_section.run_study_cross_section(study_location)
+    print(tables['Fits'][['Dependent', 'Status', 'Log-Likelihood', 'AIC', 'BIC']])
+    print(tables['Coefficient Matrix'])
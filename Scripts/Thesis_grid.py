@@ -0,0 +1,22 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#This section imports external libraries to be used in this project
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+from thesis import batch       #Fans every fit of the grid out over all CPU cores
+
+#-------------------------------------------------------------------
+# File Hierarchy: Thesis Folder -> Studies Folder (grid_windows.toml) | Data Folder | Output Folder | Scripts Folder (Thesis.py)
+#Sample windows, dependent indices and exogenous regressor sets of the grid are set inside the study file
+script_directory = os.path.dirname(os.path.abspath(__file__))
+study_location = os.path.join(script_directory, '../Studies/grid_windows.toml')
+#-------------------------------------------------------------------
+#This section runs the whole grid and writes one consolidated report into the Output folder
+if __name__ == '__main__':     #Worker processes import this file again, only the parent runs the grid
+    tables = batch.run_study_grid(study_location)
+    print(tables['Fits'])
+
@@ -0,0 +1,22 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#This section imports external libraries to be used in this project
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+from thesis import model_zoo   #Fits every volatility specification of the zoo on all CPU cores
+
+#-------------------------------------------------------------------
+# File Hierarchy: Thesis Folder -> Studies Folder (thesis_20_23_fix.toml) | Data Folder | Output Folder | Scripts Folder (Thesis.py)
+#Input files and the regression of this study are set inside the study file, a [zoo] table in it narrows the grid of specifications
+script_directory = os.path.dirname(os.path.abspath(__file__))
+study_location = os.path.join(script_directory, '../Studies/thesis_20_23_fix.toml')
+#-------------------------------------------------------------------
+#This section fits the whole zoo and writes the AIC / BIC ranking into the Output folder
+if __name__ == '__main__':     #Worker processes import this file again, only the parent runs the zoo
+    tables = model_zoo.run_study_zoo(study_location)
+    print(tables['Ranking'][['Model', 'Status', 'AIC', 'BIC', 'AIC Rank', 'BIC Rank']])
+
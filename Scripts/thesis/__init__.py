@@ -0,0 +1,8 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Shared helpers imported by the thesis scripts inside the Scripts folder
@@ -0,0 +1,158 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Command line entry point, run from the Scripts folder:
+#   python -m thesis run thesis_20_23_fix [--offline] [--sources fake] [--no-export] [--trace] - every stage of a study (or a grid study)
+#   python -m thesis update thesis_20_23_fix [--offline]                  - fold the days appended since the last update
+#   python -m thesis describe brent_20_23.csv [--prices]               - min / max / mean / std of one csv file
+#   python -m thesis imports [--budget 1.0] [module ...]               - import time of the package in a fresh interpreter
+#   python -m thesis bench [--scales data 10x 100x] [--compare COMMIT]  - stage benchmark suite (see bench.py)
+#Only the standard library is imported here; pandas is imported when a command needs it and arch, yfinance,
+#scipy and statsmodels only when a stage that uses them actually runs (see pipeline.garch_x, price_cache,
+#unitroot). 'imports' checks that this stays true: it fails when an import takes longer than the budget or
+#pulls in one of the heavy libraries.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import sys                      #Exit codes and the running interpreter
+import argparse                 #Command line arguments
+import subprocess               #Measures import time in a fresh interpreter
+import time                     #Wall time of the measured imports
+
+import_budget = 1.0             #Seconds a fresh 'import' of a checked module may take
+heavy_modules = ('arch', 'yfinance', 'statsmodels', 'scipy')    #Imported only by the stages that need them
+checked_modules = ('thesis.__main__', 'thesis.pipeline')
+
+#-------------------------------------------------------------------
+#Commands
+
+def run(arguments):
+    if arguments.offline:       #Read before price_cache is imported
+        os.environ['THESIS_OFFLINE'] = '1'
+    if arguments.sources:       #Every series from one backend of sources.py, e.g. 'fake' for runs without network or Data files
+        os.environ['THESIS_SOURCES'] = arguments.sources
+    if arguments.trace:         #Output/trace/<study name>.json and .trace.json, see trace.py
+        os.environ['THESIS_TRACE'] = '1'
+    from thesis import pipeline
+    study = pipeline.load_study(pipeline.study_location(arguments.study))
+    if 'grid' in study:         #Grid studies go through the batch runner
+        from thesis import batch
+        tables = batch.run_study_grid(study)
+        print(tables['Fits'])
+        return 0
+    results = pipeline.run_study(study, export_results=not arguments.no_export)
+    print(results['descriptive'])
+    for stage in ('adf', 'vif'):
+        if stage in results:
+            print(results[stage])
+    if 'garch' in results:
+        print(results['garch'].summary())
+    return 0
+
+def describe(arguments):
+    from thesis import paths, loader, returns, pipeline
+    location = arguments.csv if os.path.exists(arguments.csv) else os.path.join(paths.data_directory, arguments.csv)
+    prices = loader.read_prices(location)
+    if arguments.column:
+        prices = prices[arguments.column]
+    table = prices if arguments.prices else returns.compute_returns(prices, kind='log', gaps='previous')
+    print(pipeline.describe(table.to_frame() if table.ndim == 1 else table))
+    return 0
+
+def _import_report(module):     #(seconds, {package: cumulative microseconds}) of importing module in a fresh interpreter
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                               capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    seconds = time.perf_counter() - started
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    packages = {}
+    for line in completed.stderr.splitlines()[1:]:     #import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = max(packages.get(package, 0), int(cumulative))  #Outermost import of the package
+    return seconds, packages
+
+def imports(arguments):
+    failed = False
+    for module in arguments.modules or checked_modules:
+        seconds, packages = _import_report(module)
+        heavy = sorted(set(packages) & set(heavy_modules))
+        slowest = sorted(((name, microseconds) for name, microseconds in packages.items() if name != 'thesis'),
+                         key=lambda item: -item[1])[:5]
+        print(f"{module}: {seconds:.3f}s (budget {arguments.budget:.3f}s), slowest: "
+              + ', '.join(f"{name} {microseconds / 1e6:.3f}s" for name, microseconds in slowest))
+        if heavy:
+            print(f"    imports {', '.join(heavy)} at import time")
+        failed |= seconds > arguments.budget or bool(heavy)
+    return 1 if failed else 0
+
+def bench(arguments):
+    from thesis import bench as suite
+    import pandas as pd         #Data manipulation external library
+    with pd.option_context('display.width', 200, 'display.max_rows', 200):
+        if arguments.compare:
+            print(suite.compare(arguments.compare, arguments.head))
+            return 0
+        results = suite.run(arguments.scales, arguments.repeat, save=not arguments.no_save)
+        print(results.set_index(['scale', 'stage']))
+    return 0
+
+def update(arguments):          #Incremental run, see incremental.py
+    if arguments.offline:
+        os.environ['THESIS_OFFLINE'] = '1'
+    from thesis import pipeline, incremental
+    results = incremental.run_incremental(pipeline.study_location(arguments.study))
+    if results['appended'] is None:
+        print("[*] Study rebuilt in full")
+    else:
+        print(f"[*] {results['appended']} new rows appended")
+    if results['appended'] != 0:
+        print(results['descriptive'])
+    return 0
+
+#-------------------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='thesis', description="Runs the thesis studies from the command line")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run every stage of a study file")
+    run_parser.add_argument('study', help="study name inside the Studies folder or path to a .toml/.yaml file")
+    run_parser.add_argument('--offline', action='store_true', help="read cached / Data folder prices instead of yahoo finance")
+    run_parser.add_argument('--sources', choices=['csv', 'parquet', 'yahoo', 'fake'], help="serve every series from this data-source backend")
+    run_parser.add_argument('--no-export', action='store_true', help="do not write the Output workbook")
+    run_parser.add_argument('--trace', action='store_true', help="write a timing / memory trace of every stage")
+    run_parser.set_defaults(handler=run)
+
+    update_parser = commands.add_parser('update', help="fold the trading days appended since the last update into a study")
+    update_parser.add_argument('study', help="study name inside the Studies folder or path to a .toml/.yaml file")
+    update_parser.add_argument('--offline', action='store_true', help="read cached / Data folder prices instead of yahoo finance")
+    update_parser.set_defaults(handler=update)
+
+    describe_parser = commands.add_parser('describe', help="descriptive statistics of one csv file")
+    describe_parser.add_argument('csv', help="file name inside the Data folder or path to a csv file")
+    describe_parser.add_argument('--column', help="only this column")
+    describe_parser.add_argument('--prices', action='store_true', help="describe the prices instead of their log returns")
+    describe_parser.set_defaults(handler=describe)
+
+    imports_parser = commands.add_parser('imports', help="check the import time budget")
+    imports_parser.add_argument('modules', nargs='*', help=f"modules to import (default: {', '.join(checked_modules)})")
+    imports_parser.add_argument('--budget', type=float, default=import_budget, help="seconds allowed per import")
+    imports_parser.set_defaults(handler=imports)
+
+    bench_parser = commands.add_parser('bench', help="time and measure the memory of every pipeline stage")
+    bench_parser.add_argument('--scales', nargs='+', default=['data', '10x', '100x'], help="'data' and / or 10x, 100x, 1000x")
+    bench_parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage, the best one is kept")
+    bench_parser.add_argument('--no-save', action='store_true', help="do not append the results to Output/bench/history.jsonl")
+    bench_parser.add_argument('--compare', metavar='COMMIT', help="compare the recorded results of COMMIT with the latest ones")
+    bench_parser.add_argument('--head', metavar='COMMIT', help="commit compared against --compare (latest recorded by default)")
+    bench_parser.set_defaults(handler=bench)
+
+    arguments = parser.parse_args(argv)
+    return arguments.handler(arguments)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Batch runner for a grid of sample windows x dependent indices x exogenous regressor sets
+#The aligned returns are copied once into shared memory; every worker process attaches to the same block
+#and reads numpy views of it, so no process receives a pickled copy of the data. Every GARCH-X fit of the
+#grid runs on its own core and all results are collected into one Excel workbook plus parquet files.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import itertools                #Builds the grid of fits
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import pipeline, report
+
+min_observations = 100          #Fits with fewer aligned rows than this are skipped
+min_coverage = 0.8              #Fits whose aligned sample holds less than this share of the window's dates are skipped
+_shared = {}                    #Per worker process: the attached shared memory blocks and the frame built on them
+
+#-------------------------------------------------------------------
+#Shared memory panel
+
+class SharedPanel:              #Owns the shared memory copy of a returns frame, use as a context manager
+    def __init__(self, returns_dataframe):
+        values = np.ascontiguousarray(returns_dataframe.to_numpy(dtype='float64'))
+        dates = returns_dataframe.index.to_numpy(dtype='datetime64[ns]').view('int64')
+        self.values_block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        self.dates_block = shared_memory.SharedMemory(create=True, size=max(dates.nbytes, 1))
+        np.ndarray(values.shape, 'float64', self.values_block.buf)[:] = values
+        np.ndarray(dates.shape, 'int64', self.dates_block.buf)[:] = dates
+        self.descriptor = {     #Everything a worker needs to rebuild the frame, without the data itself
+            'values': self.values_block.name,
+            'dates': self.dates_block.name,
+            'shape': values.shape,
+            'columns': list(returns_dataframe.columns),
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for block in (self.values_block, self.dates_block):
+            block.close()
+            block.unlink()
+
+def _attach_block(name):        #Workers share the resource tracker of the parent, which unlinks the block once
+    return shared_memory.SharedMemory(name=name)
+
+def attach(descriptor):         #Returns a frame whose values are a zero-copy view of the shared block
+    values_block = _attach_block(descriptor['values'])
+    dates_block = _attach_block(descriptor['dates'])
+    rows, columns = descriptor['shape']
+    values = np.ndarray((rows, columns), 'float64', values_block.buf)
+    dates = np.ndarray((rows,), 'int64', dates_block.buf)
+    frame = pd.DataFrame(values, index=pd.DatetimeIndex(dates.view('datetime64[ns]'), name='Date'),
+                         columns=descriptor['columns'], copy=False)
+    return frame, (values_block, dates_block)
+
+def _worker_init(descriptor):
+    _shared['frame'], _shared['blocks'] = attach(descriptor)
+
+#-------------------------------------------------------------------
+#One fit of the grid
+
+def _fit(job, model):
+    window, dependent, exogenous = job
+    frame = _shared['frame']
+    in_window = frame.loc[(frame.index >= pd.Timestamp(window['start'])) & (frame.index < pd.Timestamp(window['end'])),
+                          [dependent] + list(exogenous)]
+    sample = in_window.dropna()
+    row = {
+        'Window': f"{window['start']} - {window['end']}",
+        'Dependent': dependent,
+        'Exogenous': ', '.join(exogenous),
+    }
+    if len(in_window) and len(sample) < min_coverage * len(in_window):  #A series that only overlaps part of the window
+        return {**row, 'Status': f"Skipped (covers {len(sample)} of {len(in_window)} dates)"}, None
+    return fit_sample(sample, dependent, exogenous, model, row)
+
+#Fits one GARCH-X on an aligned sample, returns (row + status + fit statistics, coefficients labelled with row)
+def fit_sample(sample, dependent, exogenous, model, row):
+    if len(sample) < min_observations:
+        return {**row, 'Status': f"Skipped ({len(sample)} observations)"}, None
+    try:
+        garch_result = pipeline.garch_x(sample[dependent], sample[list(exogenous)], model)
+    except Exception as error:  #One failing fit must not stop the rest of the grid
+        return {**row, 'Status': f"Failed ({error})"}, None
+    coefficients = pipeline.garch_table(garch_result).rename_axis('Parameter').reset_index()
+    for position, (key, value) in enumerate(row.items()):
+        coefficients.insert(position, key, value)
+    return {**row, 'Status': 'Fitted', **pipeline.garch_fit_statistics(garch_result)}, coefficients
+
+#-------------------------------------------------------------------
+#Grid runner
+
+#windows: list of {'start': ..., 'end': ...}, dependents: column names, exogenous_sets: lists of column names
+#Returns {'Fits': one row per fit, 'Coefficients': one row per fit and parameter}
+def run_grid(returns_dataframe, windows, dependents, exogenous_sets, model=None, workers=None):
+    jobs = list(itertools.product(windows, dependents, [tuple(exogenous) for exogenous in exogenous_sets]))
+    with SharedPanel(returns_dataframe) as panel:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_worker_init,
+                                 initargs=(panel.descriptor,)) as pool:
+            outcomes = list(pool.map(_fit, jobs, itertools.repeat(model), chunksize=1))
+    fits = pd.DataFrame([fit for fit, _ in outcomes])
+    coefficients = [table for _, table in outcomes if table is not None]
+    return {
+        'Fits': fits,
+        'Coefficients': pd.concat(coefficients, ignore_index=True) if coefficients else pd.DataFrame(),
+    }
+
+#Streams every table into one workbook inside the Output folder plus one parquet file per table (Output/<name>/)
+def write_report(tables, name):
+    with report.ReportWriter(name) as writer:
+        for sheet_name, table in tables.items():
+            writer.add(sheet_name, table, index=False)
+    print(f"[*] Batch Report Generated at: Output/{name}.xlsx")
+
+#Runs the [grid] table of a study file, e.g. Studies/grid_windows.toml
+def run_study_grid(study, workers=None):
+    study = pipeline.load_study(study)
+    series = study['series']
+    grid = study['grid']
+    _, results = pipeline.returns_panel(study, dropna=False)
+    tables = run_grid(
+        results['returns_dataframe'],
+        grid['windows'],
+        [series[key]['name'] for key in grid['dependent']],
+        [[series[key]['name'] for key in exogenous] for exogenous in grid['exogenous']],
+        {**pipeline.default_model, **study.get('model', {})},
+        workers,
+    )
+    if study.get('output'):
+        write_report(tables, study['output'])
+    return tables
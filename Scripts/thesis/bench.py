@@ -0,0 +1,234 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Benchmark suite of the pipeline stages: load -> log-return -> align -> describe -> ADF -> VIF -> GARCH-X
+#'data' runs the stages on the thesis_20_23_fix study (csv files from the Data folder, yahoo finance series
+#from the offline sources), the other scales on synthetic panels written as csv files into a temporary folder:
+#   scale   instruments   years       (the thesis panel is 4 instruments over 4 years)
+#   10x     40            4
+#   100x    40            40
+#   1000x   400           40
+#Every stage is timed 'repeat' times (best time kept) and run once more under tracemalloc for its peak
+#memory. Stage caches and the parsed files kept by the data sources are dropped before every run of a stage,
+#so 'load' always measures reading and parsing the files, and yahoo finance is replaced by a stub that refuses
+#to be called, so the suite runs offline (both are undone when run() returns). Results are appended to Output/bench/history.jsonl with the git commit they were
+#measured on; compare() lines two commits up stage by stage.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import sys                      #Installs the yahoo finance stub
+import json                     #Stores benchmark results
+import time                     #Wall time of every stage
+import types                    #Builds the yahoo finance stub
+import contextlib               #Offline setup that is undone after the run
+import shutil                   #Removes the synthetic csv files
+import platform                 #Machine the results were measured on
+import tempfile                 #Folder of the synthetic csv files
+import subprocess               #Git commit of the measured tree
+import tracemalloc              #Peak memory of every stage
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import paths, pipeline, loader, price_cache, memo, sources
+
+scales = {                      #Scale -> (instrument factor, year factor) of the synthetic panel
+    '10x': (10, 1),
+    '100x': (10, 10),
+    '1000x': (100, 10),
+}
+base_instruments = 4            #Index, oil, coal and gas
+base_years = 4
+trading_days = 252
+history_location = os.path.join(paths.output_directory, 'bench', 'history.jsonl')
+
+#-------------------------------------------------------------------
+#Offline setup
+
+def _refuse_download(*args, **kwargs):
+    raise RuntimeError("yfinance is stubbed out while benchmarking, every price must come from the Data folder")
+
+#Every price is read locally, any yahoo finance call fails loudly and no stage result is cached, until the block exits
+@contextlib.contextmanager
+def offline():
+    missing = object()
+    previous = (price_cache.offline, sys.modules.get('yfinance', missing), memo.enabled)
+    price_cache.offline = True
+    sys.modules['yfinance'] = types.SimpleNamespace(__name__='yfinance', download=_refuse_download)
+    memo.enabled = False
+    try:
+        yield
+    finally:
+        price_cache.offline, yfinance, memo.enabled = previous
+        if yfinance is missing:
+            sys.modules.pop('yfinance', None)
+        else:
+            sys.modules['yfinance'] = yfinance
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=paths.root_directory, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+#-------------------------------------------------------------------
+#Synthetic panels
+
+#Prices of 'instruments' series over 'years' of business days: the first series follows a GARCH(1,1) driven by
+#the others so the GARCH-X stage has something to fit. Series are spread over four exchanges that each close on
+#~2% of the dates (holidays), so aligning them drops dates the way the thesis panel does
+def synthetic_prices(instruments, years, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = years * trading_days
+    dates = pd.bdate_range('1990-01-01', periods=rows, name='Date')
+    exogenous = rng.standard_normal((rows, instruments - 1)) * 0.02
+    shocks = rng.standard_normal(rows)
+    residuals = np.empty(rows)
+    variance = 1e-4
+    for row in range(rows):
+        residuals[row] = np.sqrt(variance) * shocks[row]
+        variance = 2e-6 + 0.08 * residuals[row] ** 2 + 0.9 * variance
+    dependent = 0.1 * exogenous[:, :3].sum(axis=1) + residuals
+    log_prices = np.log(100.0) + np.cumsum(np.column_stack([dependent, exogenous]), axis=0)
+    open_dates = rng.random((base_instruments, rows)) > 0.02
+    prices = {}
+    for column in range(instruments):
+        kept = open_dates[column % base_instruments]
+        prices[f"series_{column}"] = pd.Series(np.exp(log_prices[kept, column]).round(4), index=dates[kept], name=f"series_{column}")
+    return prices
+
+def write_csv_files(prices, directory):     #One Date,<name> csv file per series, like the Data folder
+    locations = {}
+    for key, series in prices.items():
+        locations[key] = os.path.join(directory, f"{key}.csv")
+        series.to_csv(locations[key], date_format='%m/%d/%Y')
+    return locations
+
+#-------------------------------------------------------------------
+#Stages
+
+def data_stages():              #(stage name, callable) of the thesis_20_23_fix study
+    study = pipeline.load_study(pipeline.study_location('thesis_20_23_fix'))
+    series, period = study['series'], study['period']
+    model = {**pipeline.default_model, **study.get('model', {})}
+    state = {}
+    def load():
+        state['prices'] = pipeline.load_prices(series, period)
+    return state, [
+        ('load', load),
+        *_analysis_stages(state, period, series[model['dependent']]['name'],
+                          [series[key]['name'] for key in model['exogenous']], model),
+    ]
+
+def synthetic_stages(locations):
+    state = {}
+    def load():
+        state['prices'] = {key: loader.read_prices(location)[key] for key, location in locations.items()}
+    keys = list(locations)
+    return state, [('load', load), *_analysis_stages(state, None, keys[0], keys[1:4], pipeline.default_model)]
+
+def _analysis_stages(state, period, dependent, exogenous, model):
+    def log_returns():
+        state['returns'] = pipeline.log_returns(state['prices'])
+    def align():
+        state['returns_dataframe'] = pipeline.align(state['returns'], period)
+    return [
+        ('log_returns', log_returns),
+        ('align', align),
+        ('describe', lambda: pipeline.describe(state['returns_dataframe'])),
+        ('adf', lambda: pipeline.adf_test(state['returns_dataframe'])),
+        ('vif', lambda: pipeline.vif(state['returns_dataframe'])),
+        ('garch', lambda: pipeline.garch_x(state['returns_dataframe'][dependent], state['returns_dataframe'][exogenous], model)),
+    ]
+
+def _cold():                    #Every repeat reads the csv files again instead of timing a dictionary lookup
+    sources.clear()
+    memo._file_keys.clear()
+
+def _measure(stages, repeat):
+    rows = []
+    for name, stage in stages:
+        seconds = []
+        for _ in range(repeat):
+            _cold()
+            started = time.perf_counter()
+            stage()
+            seconds.append(time.perf_counter() - started)
+        _cold()
+        tracemalloc.start()
+        stage()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rows.append({'stage': name, 'seconds': min(seconds), 'mean seconds': float(np.mean(seconds)), 'peak bytes': peak})
+    return rows
+
+#-------------------------------------------------------------------
+
+#Runs the suite on 'data' and the given synthetic scales, returns one row per scale and stage
+def run(scales_run=('data', '10x', '100x'), repeat=3, save=True):
+    with offline():
+        results = _run(scales_run, repeat)
+    if save:
+        record(results, repeat)
+    return results
+
+def _run(scales_run, repeat):
+    rows = []
+    for scale in scales_run:
+        directory = None
+        if scale == 'data':
+            state, stages = data_stages()
+        else:
+            instruments, years = scales[scale]
+            prices = synthetic_prices(base_instruments * instruments, base_years * years)
+            directory = tempfile.mkdtemp(prefix='thesis_bench_')
+            state, stages = synthetic_stages(write_csv_files(prices, directory))
+            del prices
+        try:
+            measured = _measure(stages, repeat)
+        finally:
+            if directory:
+                shutil.rmtree(directory, ignore_errors=True)
+        panel_rows, instruments = state['returns_dataframe'].shape
+        rows += [{'scale': scale, 'rows': panel_rows, 'instruments': instruments, **row} for row in measured]
+    return pd.DataFrame(rows)
+
+def record(results, repeat):    #Appends the results to the history with the commit and machine they belong to
+    run_information = {
+        'commit': commit(),
+        'time': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'machine': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+    }
+    os.makedirs(os.path.dirname(history_location), exist_ok=True)
+    with open(history_location, 'a') as history_file:
+        for row in results.to_dict('records'):
+            history_file.write(json.dumps({**run_information, **row}, default=float) + '\n')
+    return history_location
+
+def history():
+    if not os.path.exists(history_location):
+        return pd.DataFrame()
+    return pd.read_json(history_location, lines=True, dtype={'commit': str})
+
+#Best time of every scale and stage on two commits (latest run of each) and the ratio head / base
+def compare(base, head=None):
+    measured = history()
+    head = head or measured['commit'].iloc[-1]
+    columns = {}
+    for label, commit_id in (('base', base), ('head', head)):
+        runs = measured[measured['commit'].astype(str).str.startswith(str(commit_id))]
+        if runs.empty:
+            raise LookupError(f"No benchmark results recorded for commit {commit_id}")
+        latest = runs[runs['time'] == runs['time'].max()]
+        columns[f"{label} seconds"] = latest.set_index(['scale', 'stage'])['seconds']
+        columns[f"{label} peak MB"] = latest.set_index(['scale', 'stage'])['peak bytes'] / 2 ** 20
+    table = pd.DataFrame(columns)
+    table['ratio'] = table['head seconds'] / table['base seconds']
+    return table
@@ -0,0 +1,132 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Bootstrap and Monte-Carlo inference for the GARCH-X coefficients
+#The fitted model is used to simulate new samples of the dependent index, keeping the commodity returns
+#as they are, with innovations drawn in one of three ways:
+#   'residual' - standardized residuals of the fit, resampled one by one
+#   'block'    - standardized residuals resampled in moving blocks (keeps short range dependence)
+#   'normal'   - standard normal draws (parametric Monte-Carlo)
+#Every replication is refitted (warm-started from the original estimates) and the spread of the refitted
+#parameters gives empirical confidence intervals for Const, the commodity coefficients, omega, alpha[1] and
+#beta[1]. Replications are generated in fixed-size chunks, each with its own child seed, so the results only
+#depend on the seed and not on how many worker processes run the chunks.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import pipeline, garch_kernel
+
+methods = ('residual', 'block', 'normal')
+chunk_size = 50                 #Replications simulated and refitted together by one worker call
+
+#-------------------------------------------------------------------
+#Simulation
+
+def draw_innovations(std_resids, replications, observations, method='residual', block_size=20, rng=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    if method == 'normal':
+        return rng.standard_normal((replications, observations))
+    if method == 'residual':
+        return std_resids[rng.integers(0, len(std_resids), (replications, observations))]
+    if method == 'block':
+        blocks = -(-observations // block_size)
+        starts = rng.integers(0, len(std_resids) - block_size + 1, (replications, blocks))
+        positions = (starts[:, :, None] + np.arange(block_size)).reshape(replications, -1)[:, :observations]
+        return std_resids[positions]
+    raise ValueError(f"method must be one of {methods}, got {method!r}")
+
+#Vectorized GARCH(1,1)-X simulator: one row per replication, the recursion loops over time only
+def simulate(params, x, innovations, sigma2_0):
+    k = x.shape[1]
+    omega, alpha, beta = params[k:]
+    replications, observations = innovations.shape
+    resids = np.empty((replications, observations))
+    sigma2 = np.full(replications, omega + (alpha + beta) * sigma2_0)
+    for t in range(observations):
+        if t:
+            sigma2 = omega + alpha * resids[:, t - 1] ** 2 + beta * sigma2
+        resids[:, t] = np.sqrt(sigma2) * innovations[:, t]
+    return x @ params[:k] + resids
+
+#-------------------------------------------------------------------
+#Refitting
+
+def _replicate_chunk(seed, replications, params, x, sigma2_0, std_resids, method, block_size, model):
+    rng = np.random.default_rng(seed)
+    innovations = draw_innovations(std_resids, replications, x.shape[0], method, block_size, rng)
+    samples = simulate(params, x, innovations, sigma2_0)
+    exogenous = x[:, 1:]
+    estimates = np.full((replications, len(params)), np.nan)
+    for replication, sample in enumerate(samples):
+        try:
+            if model.get('backend', 'kernel') == 'kernel':
+                garch_result = garch_kernel.fit(sample, exogenous, params, covariance=False)
+            else:
+                garch_result = pipeline.garch_x(pd.Series(sample), pd.DataFrame(exogenous), {**model, 'scale': 1}, params)
+        except Exception:       #Replications that cannot be fitted are left out of the intervals
+            continue
+        if garch_result.convergence_flag == 0:
+            estimates[replication] = np.asarray(garch_result.params)
+    return estimates
+
+#Returns {'Intervals': one row per parameter, 'Replications': every refitted parameter vector}
+#model['backend'] picks the refitting backend, 'kernel' (default here) or 'arch'
+def bootstrap(dependent_variable, independent_variable, model=None, replications=1000, method='residual',
+              block_size=20, seed=0, level=0.95, workers=None):
+    if method not in methods:
+        raise ValueError(f"method must be one of {methods}, got {method!r}")
+    model = {**pipeline.default_model, 'backend': 'kernel', **(model or {})}
+    if not pipeline.garch11_x(model):   #simulate() only knows the GARCH(1,1)-X recursion
+        raise ValueError("The bootstrap only simulates mean='ARX' (no lags), vol='Garch', p=1, q=1 with normal errors, "
+                         f"got mean={model['mean']!r}, vol={model['vol']!r}, p={model['p']}, o={model.get('o', 0)}, "
+                         f"q={model['q']}, dist={model.get('dist', 'normal')!r}")
+    original = pipeline.garch_x(dependent_variable, independent_variable, model)
+    names = list(original.params.index)
+    params = np.asarray(original.params, dtype='float64')
+    y = np.asarray(dependent_variable, dtype='float64') * model['scale']
+    x = np.column_stack([np.ones(len(y)), np.asarray(independent_variable, dtype='float64') * model['scale']])
+    sigma2_0 = garch_kernel.backcast(y - x @ np.linalg.lstsq(x, y, rcond=None)[0])
+    resids, sigma2 = garch_kernel.variance(params, y, x, sigma2_0)
+    std_resids = resids / np.sqrt(sigma2)
+
+    sizes = [min(chunk_size, replications - start) for start in range(0, replications, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    arguments = [(seeds[i], sizes[i], params, x, sigma2_0, std_resids, method, block_size, model) for i in range(len(sizes))]
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        chunks = [_replicate_chunk(*argument) for argument in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_replicate_chunk, *zip(*arguments)))
+    estimates = pd.DataFrame(np.vstack(chunks), columns=names)
+    fitted = estimates.dropna()
+    tail = (1 - level) / 2
+    intervals = pd.DataFrame({
+        'coef': original.params,
+        'bootstrap mean': fitted.mean(),
+        'bootstrap std err': fitted.std(),
+        f"{tail:.1%}": fitted.quantile(tail),
+        f"{1 - tail:.1%}": fitted.quantile(1 - tail),
+    })
+    intervals['replications'] = len(fitted)
+    return {'Intervals': intervals, 'Replications': estimates}
+
+#Bootstrap of the GARCH-X stage of a study file
+def run_study_bootstrap(study, **options):
+    study = pipeline.load_study(study)
+    series = study['series']
+    model = {**pipeline.default_model, **study.get('model', {})}
+    _, results = pipeline.returns_panel(study)
+    returns_dataframe = results['returns_dataframe']
+    return bootstrap(
+        returns_dataframe[series[model['dependent']]['name']],
+        returns_dataframe[[series[key]['name'] for key in model['exogenous']]],
+        {'backend': 'kernel', **model},
+        **options,
+    )
@@ -0,0 +1,119 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Alignment of series traded on different exchange calendars (S&P SEA 40 in Asia, Brent / API2 on ICE Europe,
+#natural gas on NYMEX). Every series keeps its own dates until it is aligned with one of these policies:
+#   'inner' - keep the dates every series traded on, each return measured against that series' own previous
+#             trading day (the same rows as pd.concat(...).dropna(), the thesis default)
+#   'ffill' - keep the dates of the anchor series, the other series use their last price at or before that
+#             date as long as it is not older than 'limit' calendar days
+#   'close' - as 'ffill', but the dates are first turned into the UTC instant of every exchange's close
+#             ('close' and 'timezone' of each series), so an Asian close is matched with the European and
+#             American closes that had already happened at that moment (lead / lag for non-synchronous closes)
+#All matching is a merge-asof done with np.searchsorted on sorted int64 date arrays, never a per-row loop.
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+import pandas as pd             #Data manipulation external library
+
+from thesis import returns
+
+policies = ('inner', 'ffill', 'close')
+nanoseconds_per_day = 86_400 * 10 ** 9
+
+#-------------------------------------------------------------------
+#int64 date keys
+
+def date_keys(index):           #Sorted dates as int64 nanoseconds
+    return pd.DatetimeIndex(index).as_unit('ns').asi8
+
+def close_keys(index, close='00:00', timezone='UTC'):   #UTC instant of the close of every trading day
+    dates = pd.DatetimeIndex(index).as_unit('ns').normalize()
+    closes = dates + pd.Timedelta(close + ':00' if close.count(':') == 1 else close)
+    return closes.tz_localize(timezone, ambiguous='NaT', nonexistent='shift_forward').tz_convert('UTC').asi8
+
+#Position in right_keys of the last key at or before (backward) / first key at or after (forward) every
+#left key, -1 where there is none within 'tolerance' nanoseconds. Both arrays must be sorted.
+def asof_positions(left_keys, right_keys, tolerance=None, direction='backward'):
+    if direction == 'backward':
+        positions = np.searchsorted(right_keys, left_keys, side='right') - 1
+        valid = positions >= 0
+        distance = left_keys - right_keys[np.maximum(positions, 0)] if len(right_keys) else np.zeros(len(left_keys), dtype='int64')
+    elif direction == 'forward':
+        positions = np.searchsorted(right_keys, left_keys, side='left')
+        valid = positions < len(right_keys)
+        distance = right_keys[np.minimum(positions, len(right_keys) - 1)] - left_keys if len(right_keys) else np.zeros(len(left_keys), dtype='int64')
+    else:
+        raise ValueError(f"direction must be 'backward' or 'forward', got {direction!r}")
+    if tolerance is not None:
+        valid &= distance <= tolerance
+    return np.where(valid, positions, -1)
+
+def _intersection(key_arrays):  #Dates present in every sorted array
+    common = key_arrays[0]
+    for keys in key_arrays[1:]:
+        positions = np.minimum(np.searchsorted(keys, common), len(keys) - 1)
+        common = common[keys[positions] == common] if len(keys) else common[:0]
+    return common
+
+#-------------------------------------------------------------------
+
+def _clean(series):             #Sorted, unique, without missing prices
+    series = series.dropna()
+    series = series[~series.index.duplicated(keep='last')]
+    return series if series.index.is_monotonic_increasing else series.sort_index()
+
+#prices: {key: Series of prices on that series' own dates}, anchor: key whose dates are kept by 'ffill'/'close'
+#(the first series by default), limit: staleness limit in calendar days, sessions: {key: {'close': 'HH:MM',
+#'timezone': 'Area/City'}} for 'close'. Returns (log returns with one column per series, rows report)
+def align_returns(prices, policy='inner', anchor=None, limit=None, sessions=None, direction='backward'):
+    if policy not in policies:
+        raise ValueError(f"policy must be one of {policies}, got {policy!r}")
+    prices = {key: _clean(series) for key, series in prices.items()}
+    names = [series.name if series.name is not None else key for key, series in prices.items()]
+    anchor = anchor if anchor is not None else next(iter(prices))
+    all_dates = np.unique(np.concatenate([date_keys(series.index) for series in prices.values()]))
+    stale = 0
+
+    if policy == 'inner':
+        series_returns = [
+            pd.Series(returns.compute_returns(series.to_numpy(), kind='log', gaps='keep')[:, 0], index=series.index[1:])
+            for series in prices.values()
+        ]
+        common = _intersection([date_keys(series.index) for series in series_returns])
+        values = np.column_stack([
+            series.to_numpy()[np.searchsorted(date_keys(series.index), common)] for series in series_returns
+        ])
+        aligned = pd.DataFrame(values, index=pd.DatetimeIndex(common.view('datetime64[ns]'), name='Date'), columns=names)
+    else:
+        sessions = sessions or {}
+        tolerance = None if limit is None else int(limit * nanoseconds_per_day)
+        fresh = 0 if policy == 'ffill' else nanoseconds_per_day     #Older matches count as stale prices
+        keys = {
+            key: close_keys(series.index, **sessions.get(key, {})) if policy == 'close' else date_keys(series.index)
+            for key, series in prices.items()
+        }
+        aligned_prices = np.empty((len(keys[anchor]), len(prices)))
+        for column, (key, series) in enumerate(prices.items()):
+            positions = asof_positions(keys[anchor], keys[key], tolerance, direction)
+            matched = positions >= 0
+            aligned_prices[:, column] = np.where(matched, series.to_numpy()[np.maximum(positions, 0)], np.nan)
+            stale += int((np.abs(keys[key][positions[matched]] - keys[anchor][matched]) > fresh).sum())
+        aligned = returns.compute_returns(pd.DataFrame(aligned_prices, index=pd.DatetimeIndex(prices[anchor].index, name='Date'),
+                                                       columns=names), kind='log', gaps='keep')
+    return aligned, {
+        'policy': policy,
+        'dates': len(all_dates),    #Dates on which at least one of the series traded
+        'rows kept': int(aligned.notna().all(axis=1).sum()),
+        'stale prices used': stale,
+    }
+
+#Rows kept by every policy on the same prices, one row per policy ('close' only when sessions are given)
+def compare_policies(prices, anchor=None, limit=None, sessions=None):
+    reports = [
+        align_returns(prices, policy, anchor, limit, sessions)[1]
+        for policy in policies if policy != 'close' or sessions
+    ]
+    return pd.DataFrame(reports).set_index('policy')
@@ -0,0 +1,101 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Cross-section of dependent series: the same ARX-GARCH with one common exogenous (commodity) block fitted
+#against N indices or equities at once
+#The exogenous block and every dependent column are copied once into shared memory (see batch.py); every
+#worker attaches to it when it starts, works out once which rows of the exogenous block are complete and
+#then only receives column names, so the design is never rebuilt or pickled per fit. N fits cost about
+#N / cores fits. Dependents come from the study's series and, for many equities, from a wide csv with one
+#price column per constituent. All fits are stacked into one coefficient table.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import itertools                #Worker arguments
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import paths, pipeline, loader, returns, batch
+
+#-------------------------------------------------------------------
+#One fit
+
+def _complete_rows(frame, exogenous):   #Rows where every exogenous column has a value, computed once per process
+    if frame is not batch._shared.get('frame'):
+        return frame[list(exogenous)].notna().all(axis=1).to_numpy()
+    key = ('complete rows', tuple(exogenous))
+    if key not in batch._shared:
+        batch._shared[key] = frame[list(exogenous)].notna().all(axis=1).to_numpy()
+    return batch._shared[key]
+
+def _fit(dependent, exogenous, model, frame=None):
+    frame = frame if frame is not None else batch._shared['frame']
+    rows = _complete_rows(frame, exogenous) & frame[dependent].notna().to_numpy()
+    sample = frame.loc[rows, [dependent, *exogenous]]
+    return batch.fit_sample(sample, dependent, exogenous, model, {'Dependent': dependent})
+
+#-------------------------------------------------------------------
+
+#Returns {'Fits': one row per dependent, 'Coefficients': one row per dependent and parameter,
+#'Coefficient Matrix': coef of every parameter (columns) for every dependent (rows)}
+def run_cross_section(returns_dataframe, dependents, exogenous, model=None, workers=None):
+    model = {**pipeline.default_model, **(model or {})}
+    exogenous = list(exogenous)
+    if not dependents:
+        raise ValueError("The cross-section has no dependent series: give [cross_section] a 'dependent' list or 'constituents'")
+    panel = returns_dataframe[list(dict.fromkeys([*exogenous, *dependents]))]
+    workers = min(workers or os.cpu_count(), len(dependents))
+    if workers == 1:
+        outcomes = [_fit(dependent, exogenous, model, panel) for dependent in dependents]
+    else:
+        with batch.SharedPanel(panel) as shared_panel:
+            with ProcessPoolExecutor(max_workers=workers, initializer=batch._worker_init,
+                                     initargs=(shared_panel.descriptor,)) as pool:
+                outcomes = list(pool.map(_fit, dependents, itertools.repeat(exogenous), itertools.repeat(model),
+                                         chunksize=max(1, len(dependents) // (workers * 4))))
+    fits = pd.DataFrame([fit for fit, _ in outcomes])
+    coefficients = [table for _, table in outcomes if table is not None]
+    coefficients = pd.concat(coefficients, ignore_index=True) if coefficients else pd.DataFrame()
+    return {
+        'Fits': fits,
+        'Coefficients': coefficients,
+        'Coefficient Matrix': (coefficients.pivot(index='Dependent', columns='Parameter', values='coef')
+                               .reindex(index=[dependent for dependent in dependents if dependent in set(coefficients['Dependent'])],
+                                        columns=list(dict.fromkeys(coefficients['Parameter'])))
+                               .reset_index()) if len(coefficients) else pd.DataFrame(),
+    }
+
+#Log returns of every price column of a wide csv inside the Data folder (one column per constituent)
+def load_constituents(location, period=None):
+    if not os.path.isabs(location):
+        location = os.path.join(paths.data_directory, location)
+    returns_dataframe = returns.compute_returns(loader.read_prices(location), kind='log', gaps='previous')
+    return pipeline.align(returns_dataframe, period, dropna=False)
+
+#Runs the [cross_section] table of a study file: dependent (series keys), constituents (wide csv, optional),
+#exogenous (series keys) and model overrides, e.g. Studies/cross_section_20_23.toml
+def run_study_cross_section(study, workers=None, export_results=True):
+    study = pipeline.load_study(study)
+    series = study['series']
+    options = study['cross_section']
+    _, results = pipeline.returns_panel(study, dropna=False)
+    returns_dataframe = results['returns_dataframe']
+    dependents = [series[key]['name'] for key in options.get('dependent', [])]
+    if options.get('constituents'):
+        constituents = load_constituents(options['constituents'], study['period'])
+        constituents = constituents.drop(columns=[column for column in constituents.columns if column in returns_dataframe.columns])
+        returns_dataframe = returns_dataframe.join(constituents, how='outer')
+        dependents += list(constituents.columns)
+    tables = run_cross_section(
+        returns_dataframe,
+        dependents,
+        [series[key]['name'] for key in options['exogenous']],
+        {**pipeline.default_model, **study.get('model', {}), **options.get('model', {})},
+        workers,
+    )
+    if export_results and study.get('output'):
+        batch.write_report(tables, os.path.splitext(study['output'])[0] + '_cross_section')
+    return tables
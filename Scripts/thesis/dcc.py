@@ -0,0 +1,215 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Multivariate volatility: DCC(1,1) and CCC GARCH over the aligned returns (Engle, 2002, two-step estimation)
+#   1. a univariate GARCH is fitted to every column, in parallel on a process pool reading the returns from
+#      shared memory (see batch.py), giving the standardized residuals e[t] (T x N)
+#   2. DCC: Q[t] = (1 - a - b) S + a e[t-1] e[t-1]' + b Q[t-1],  R[t] = diag(Q[t])^-1/2 Q[t] diag(Q[t])^-1/2
+#      with S the sample second moment of e, (a, b) estimated by maximising the correlation quasi-likelihood
+#      -1/2 sum(log|R[t]| + e[t]' R[t]^-1 e[t] - e[t]'e[t]).  CCC keeps R[t] = corr(e), factorised once.
+#The Q recursion is run with scipy.signal.lfilter on blocks of rows and every block is factorised with one
+#batched Cholesky, so the likelihood is vectorized without ever holding the T x N x N correlation array:
+#memory is the T x N residuals plus one block of at most 'block_bytes'. Correlation paths are returned for
+#chosen pairs only (by default the first series against every other one).
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import itertools                #Pairs of series and worker arguments
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+from scipy import optimize, signal
+
+from thesis import pipeline, batch
+
+methods = ('dcc', 'ccc')
+univariate_model = {            #arch_model arguments of the univariate step
+    'mean': 'Constant',
+    'vol': 'Garch',
+    'p': 1,
+    'q': 1,
+    'dist': 'normal',
+    'scale': 100,
+}
+block_bytes = 64 * 2 ** 20      #Bytes of the (rows, N, N) block of correlation matrices held at once
+
+#-------------------------------------------------------------------
+#Univariate step
+
+def _fit_univariate(column, model, frame=None):
+    from arch import arch_model     #GARCH model
+    frame = frame if frame is not None else batch._shared['frame']
+    garch_result = arch_model(frame[column] * model['scale'], mean=model['mean'], vol=model['vol'], p=model['p'],
+                              o=model.get('o', 0), q=model['q'], dist=model['dist']).fit(disp='off')
+    row = {'Series': column, **garch_result.params.to_dict(), **pipeline.garch_fit_statistics(garch_result)}
+    return row, garch_result.std_resid.to_numpy()
+
+#Returns (one row of parameters and fit statistics per series, standardized residuals T x N)
+def univariate(returns_dataframe, model=None, workers=None):
+    model = {**univariate_model, **(model or {})}
+    columns = list(returns_dataframe.columns)
+    workers = min(workers or os.cpu_count(), len(columns))
+    if workers == 1:
+        outcomes = [_fit_univariate(column, model, returns_dataframe) for column in columns]
+    else:
+        with batch.SharedPanel(returns_dataframe) as panel:
+            with ProcessPoolExecutor(max_workers=workers, initializer=batch._worker_init,
+                                     initargs=(panel.descriptor,)) as pool:
+                outcomes = list(pool.map(_fit_univariate, columns, itertools.repeat(model)))
+    table = pd.DataFrame([row for row, _ in outcomes]).set_index('Series')
+    std_resid = pd.DataFrame(np.column_stack([resid for _, resid in outcomes]), index=returns_dataframe.index, columns=columns)
+    return table, std_resid
+
+#-------------------------------------------------------------------
+#Correlation step
+
+def _blocks(rows, n):           #Row ranges whose (rows, n, n) arrays fit in block_bytes
+    size = max(1, block_bytes // (3 * 8 * n * n))
+    for start in range(0, rows, size):
+        yield start, min(start + size, rows)
+
+#Yields (start, stop, R[start:stop]) of the DCC recursion, block after block
+def iter_correlations(resid, a, b, unconditional):
+    rows, n = resid.shape
+    intercept = (1 - a - b) * unconditional
+    previous = None             #Q of the last row of the previous block
+    for start, stop in _blocks(rows, n):
+        inputs = np.empty((stop - start, n, n))
+        inputs[:] = intercept
+        lagged = resid[max(start - 1, 0):stop - 1]
+        if start == 0:          #Q[0] = S
+            inputs[0] = unconditional
+            inputs[1:] += a * lagged[:, :, None] * lagged[:, None, :]
+            q = signal.lfilter([1.0], [1.0, -b], inputs, axis=0)
+        else:
+            inputs += a * lagged[:, :, None] * lagged[:, None, :]
+            q, _ = signal.lfilter([1.0], [1.0, -b], inputs, axis=0, zi=b * previous[None])
+        previous = q[-1]
+        scale = np.sqrt(np.einsum('tii->ti', q))
+        yield start, stop, q / scale[:, :, None] / scale[:, None, :]
+
+def _block_loglikelihood(resid, correlations):
+    cholesky = np.linalg.cholesky(correlations)
+    solved = np.linalg.solve(cholesky, resid[:, :, None])[..., 0]
+    return -0.5 * (2 * np.log(np.einsum('tii->ti', cholesky)).sum() + (solved ** 2).sum() - (resid ** 2).sum())
+
+def constant_loglikelihood(resid, correlation):    #CCC: one Cholesky of the constant R for every row
+    cholesky = np.linalg.cholesky(correlation)
+    solved = np.linalg.solve(cholesky, resid.T)
+    return -0.5 * (len(resid) * 2 * np.log(np.diag(cholesky)).sum() + (solved ** 2).sum() - (resid ** 2).sum())
+
+def correlation_loglikelihood(params, resid, unconditional):
+    a, b = params
+    try:
+        return sum(_block_loglikelihood(resid[start:stop], correlations)
+                   for start, stop, correlations in iter_correlations(resid, a, b, unconditional))
+    except np.linalg.LinAlgError:   #Q[t] not positive definite for these parameters
+        return -np.inf
+
+def _objective(params, resid, unconditional):    #Large finite value where the likelihood is undefined, SLSQP stops on inf
+    loglikelihood = correlation_loglikelihood(params, resid, unconditional)
+    return -loglikelihood if np.isfinite(loglikelihood) else 1e10
+
+#(a, b), correlation log-likelihood, converged. Without starting values the best point of a coarse grid is used
+def fit_correlation(resid, starting_values=None):
+    unconditional = resid.T @ resid / len(resid)
+    if starting_values is None:
+        grid = [(a, b) for a in (0.01, 0.03, 0.05, 0.10) for b in (0.50, 0.80, 0.90, 0.95) if a + b < 1]
+        starting_values = min(grid, key=lambda params: _objective(params, resid, unconditional))
+    optimization_result = optimize.minimize(
+        _objective, np.asarray(starting_values), args=(resid, unconditional), method='SLSQP', bounds=[(0.0, 1.0), (0.0, 1.0)],
+        constraints=[{'type': 'ineq', 'fun': lambda params: 0.9999 - params[0] - params[1]}],
+    )
+    return optimization_result.x, -optimization_result.fun, bool(optimization_result.success)
+
+#-------------------------------------------------------------------
+
+class DCCResult:
+    #scale: factor the returns were multiplied by for the univariate fits, their log-likelihoods are in scaled units
+    def __init__(self, method, univariate_table, std_resid, params, correlation_loglikelihood, converged, scale=1):
+        self.method = method
+        self.univariate = univariate_table
+        self.std_resid = std_resid
+        self.params = pd.Series(params, index=['a', 'b'], name='params')
+        self.converged = converged
+        values = std_resid.to_numpy()
+        self.unconditional = values.T @ values / len(values)
+        self.constant = np.corrcoef(values, rowvar=False)
+        self.scale = scale
+        #Log-likelihood of the unscaled returns: the density of r is scale times the density of scale * r
+        self.loglikelihood = float(univariate_table['Log-Likelihood'].sum() + correlation_loglikelihood
+                                   + values.size * np.log(scale))
+        self.correlation_loglikelihood = float(correlation_loglikelihood)
+
+    def _iter(self):
+        values = self.std_resid.to_numpy()
+        if self.method == 'ccc':
+            yield 0, len(values), np.broadcast_to(self.constant, (len(values),) + self.constant.shape)
+        else:
+            yield from iter_correlations(values, *self.params.to_numpy(), self.unconditional)
+
+    #pairs: None (first series against every other one), 'all' or a list of (series, series)
+    def correlation_paths(self, pairs=None):
+        columns = list(self.std_resid.columns)
+        if pairs is None:
+            pairs = [(columns[0], other) for other in columns[1:]]
+        elif pairs == 'all':
+            pairs = list(itertools.combinations(columns, 2))
+        rows = np.array([columns.index(first) for first, _ in pairs], dtype='int64')
+        cols = np.array([columns.index(second) for _, second in pairs], dtype='int64')
+        paths = np.empty((len(self.std_resid), len(pairs)))
+        for start, stop, correlations in self._iter():
+            paths[start:stop] = correlations[:, rows, cols]
+        return pd.DataFrame(paths, index=self.std_resid.index, columns=[f"{first} / {second}" for first, second in pairs])
+
+    def correlation(self, date):    #N x N correlation matrix on one date
+        position = self.std_resid.index.get_loc(pd.Timestamp(date))
+        for start, stop, correlations in self._iter():
+            if start <= position < stop:
+                return pd.DataFrame(correlations[position - start], index=self.std_resid.columns, columns=self.std_resid.columns)
+
+    def tables(self, pairs=None):   #Sheets of the report
+        return {
+            'Univariate': self.univariate.reset_index(),
+            'Correlation': pd.DataFrame([{
+                'Model': self.method.upper(), **(self.params.to_dict() if self.method == 'dcc' else {}),
+                'Correlation Log-Likelihood': self.correlation_loglikelihood, 'Log-Likelihood': self.loglikelihood,
+                'Converged': self.converged, 'No. Observations': len(self.std_resid), 'Series': len(self.std_resid.columns),
+            }]),
+            'Unconditional Correlation': pd.DataFrame(self.constant, index=self.std_resid.columns, columns=self.std_resid.columns).reset_index(names='Series'),
+            'Correlation Paths': self.correlation_paths(pairs).reset_index(),
+        }
+
+#Fits DCC (or CCC) GARCH to every column of the aligned returns
+def fit(returns_dataframe, method='dcc', model=None, workers=None, starting_values=None):
+    if method not in methods:
+        raise ValueError(f"method must be one of {methods}, got {method!r}")
+    if returns_dataframe.shape[1] < 2:
+        raise ValueError(f"{method.upper()} needs at least two series, got {list(returns_dataframe.columns)}")
+    returns_dataframe = returns_dataframe.dropna()
+    univariate_table, std_resid = univariate(returns_dataframe, model, workers)
+    scale = {**univariate_model, **(model or {})}['scale']
+    if method == 'ccc':
+        values = std_resid.to_numpy()
+        constant = np.corrcoef(values, rowvar=False)
+        loglikelihood = constant_loglikelihood(values, constant)
+        return DCCResult(method, univariate_table, std_resid, (np.nan, np.nan), loglikelihood, True, scale)
+    params, loglikelihood, converged = fit_correlation(std_resid.to_numpy(), starting_values)
+    return DCCResult(method, univariate_table, std_resid, params, loglikelihood, converged, scale)
+
+#DCC of a study file over the series of its [dcc] table (series keys, method, pairs, univariate model overrides)
+def run_study_dcc(study, workers=None, export_results=True):
+    study = pipeline.load_study(study)
+    series = study['series']
+    options = study.get('dcc', {})
+    _, results = pipeline.returns_panel(study)
+    columns = [series[key]['name'] for key in options.get('series', list(series))]
+    dcc_result = fit(results['returns_dataframe'][columns], options.get('method', 'dcc'), options.get('model'), workers)
+    pairs = options.get('pairs')
+    pairs = [tuple(series[key]['name'] for key in pair) for pair in pairs] if isinstance(pairs, list) else pairs
+    tables = dcc_result.tables(pairs)
+    if export_results and study.get('output'):
+        batch.write_report(tables, os.path.splitext(study['output'])[0] + '_' + dcc_result.method)
+    return dcc_result, tables
@@ -0,0 +1,60 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Concurrent fetch stage for a whole tickers dictionary, e.g. {'oil': 'BZ=F', 'coal': 'MTFZ24.NYM', 'gas': 'NG=F'}
+#Every ticker is downloaded on a bounded thread pool with retries and exponential backoff, so the time
+#spent waiting on yahoo finance is roughly that of the slowest ticker instead of the sum of all of them.
+#Any callable with the signature downloader(ticker, start, end, interval) can be passed in place of the
+#cached yahoo finance download, which is how a fake downloader or a local stub server is plugged in.
+import time                     #Sleeps between retries
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd             #Data manipulation external library
+
+from thesis import price_cache, trace
+
+max_workers = 8                 #Upper bound on simultaneous downloads
+retries = 3                     #Attempts per ticker before giving up
+backoff = 0.5                   #Seconds to wait after the first failure, doubled after every further failure
+
+#-------------------------------------------------------------------
+
+def _download_with_retry(downloader, ticker, start, end, interval, retries, backoff, sleep):
+    for attempt in range(retries):
+        try:
+            with trace.span('fetch', ticker=ticker, attempt=attempt + 1) as record:
+                bars = downloader(ticker, start, end, interval)
+                record['rows out'] = len(bars)
+            return bars
+        except LookupError:     #No data for the ticker (e.g. no offline stand-in), retrying cannot help
+            raise
+        except Exception:
+            if attempt == retries - 1:
+                raise
+            sleep(backoff * 2 ** attempt)
+
+#Returns {key: price frame} for every key inside tickers, downloaded concurrently
+def download_frames(tickers, start, end, interval='1d', downloader=None, workers=None, retries=retries, backoff=backoff, sleep=time.sleep):
+    downloader = downloader or price_cache.download
+    workers = max(1, min(workers or max_workers, len(tickers)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            key: pool.submit(_download_with_retry, downloader, ticker, start, end, interval, retries, backoff, sleep)
+            for key, ticker in tickers.items()
+        }
+        frames = {}
+        for key, future in futures.items():
+            try:
+                frames[key] = future.result()
+            except LookupError as error:
+                raise LookupError(f"Series {key!r} ({tickers[key]}): {error}") from error
+        return frames
+
+#Returns one wide frame with a column per ticker, aligned on the dates every ticker traded
+def download_wide(tickers, start, end, interval='1d', column='Adj Close', dropna=True, **options):
+    frames = download_frames(tickers, start, end, interval, **options)
+    wide = pd.concat({tickers[key]: frame[column] for key, frame in frames.items()}, axis=1)
+    return wide.dropna() if dropna else wide
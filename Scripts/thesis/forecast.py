@@ -0,0 +1,241 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Volatility forecasts from stored GARCH-X fits
+#A fit is saved once to Cache/models/<key>.json, the key being a hash of the fitted data and the model
+#specification, together with everything a forecast needs: the parameters, the last residuals, conditional
+#variances and dependent values. forecast() then runs the mean / variance recursions forward for any path of
+#the oil, coal and gas returns without refitting, either analytically (GARCH and GJR-GARCH, any horizon,
+#EGARCH one step ahead) or by simulating the fitted model. Loaded models are kept in memory, so a forecast
+#from a stored model takes well under a millisecond for the analytic method.
+#Exogenous paths and forecasts are in the units of the returns frame (the model scale is applied inside).
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import json                     #Stores fitted models
+import hashlib                  #Keys fitted models by data and specification
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import paths, pipeline
+
+forecast_methods = ('analytic', 'simulation')
+_loaded = {}                    #Model key -> stored model, for this process
+
+#-------------------------------------------------------------------
+#Model store
+
+def data_hash(dependent_variable, independent_variable):
+    frame = pd.concat([dependent_variable, independent_variable], axis=1)
+    digest = hashlib.sha1(frame.index.to_numpy(dtype='datetime64[ns]').tobytes())
+    digest.update(np.ascontiguousarray(frame.to_numpy(dtype='float64')).tobytes())
+    digest.update(json.dumps([str(column) for column in frame.columns]).encode())
+    return digest.hexdigest()
+
+def model_key(data_key, model):
+    specification = {key: value for key, value in model.items() if key not in ('dependent', 'exogenous', 'backend')}
+    return hashlib.sha1(json.dumps([data_key, specification], sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+def model_location(key):
+    return os.path.join(paths.cache_directory, 'models', f"{key}.json")
+
+def save_model(stored):
+    location = model_location(stored['key'])
+    os.makedirs(os.path.dirname(location), exist_ok=True)
+    with open(location + '.tmp', 'w') as model_file:
+        json.dump(stored, model_file)
+    os.replace(location + '.tmp', location)
+    _loaded[stored['key']] = stored
+
+def load_model(key):
+    if key not in _loaded:
+        if not os.path.exists(model_location(key)):
+            return None
+        with open(model_location(key)) as model_file:
+            _loaded[key] = json.load(model_file)
+    return _loaded[key]
+
+def _state(garch_result, dependent_variable, model):    #Last values the recursions start from (model scale)
+    memory = max(model['p'], model.get('o', 0), model['q'], 1)
+    resids = np.asarray(garch_result.resid, dtype='float64')
+    sigma2 = np.asarray(garch_result.conditional_volatility, dtype='float64') ** 2
+    return {
+        'resids': resids[-memory:].tolist(),
+        'sigma2': sigma2[-memory:].tolist(),
+        'y': (np.asarray(dependent_variable, dtype='float64')[-max(model.get('lags', 0), 1):] * model['scale']).tolist(),
+    }
+
+#Returns the stored model of this data and specification, fitting (and storing) it only the first time
+def fit_or_load(dependent_variable, independent_variable, model=None):
+    model = {**pipeline.default_model, **(model or {})}
+    key = model_key(data_hash(dependent_variable, independent_variable), model)
+    stored = load_model(key)
+    if stored is None:          #arch backend, the forecast starts from its residuals and conditional variances
+        garch_result = pipeline.garch_x(dependent_variable, independent_variable, {**model, 'backend': 'arch'})
+        stored = {
+            'key': key,
+            'model': model,
+            'names': list(garch_result.params.index),
+            'params': [float(value) for value in garch_result.params],
+            'exogenous': [str(column) for column in pd.DataFrame(independent_variable).columns],
+            'last_date': str(dependent_variable.index[-1]),
+            'statistics': {name: getattr(value, 'item', lambda: value)() for name, value in pipeline.garch_fit_statistics(garch_result).items()},
+            'state': _state(garch_result, dependent_variable, model),
+        }
+        save_model(stored)
+    return stored
+
+#-------------------------------------------------------------------
+#Parameters
+
+def _split_params(stored):      #Mean and volatility parameters by position, as arch orders them
+    model = stored['model']
+    params = np.asarray(stored['params'])
+    lags, k = model.get('lags', 0), len(stored['exogenous'])
+    p, o, q = model['p'], model.get('o', 0), model['q']
+    position = 1 + lags + k
+    return {
+        'const': params[0],
+        'ar': params[1:1 + lags],
+        'beta_x': params[1 + lags:position],
+        'omega': params[position],
+        'alpha': params[position + 1:position + 1 + p],
+        'gamma': params[position + 1 + p:position + 1 + p + o],
+        'beta': params[position + 1 + p + o:position + 1 + p + o + q],
+        'dist': params[position + 1 + p + o + q:],
+    }
+
+def _exogenous_path(stored, exogenous_path, horizon):   #(horizon, k) array in model scale
+    names = stored['exogenous']
+    if not names:
+        return np.zeros((horizon, 0))
+    if exogenous_path is None:
+        raise ValueError(f"An exogenous path for {names} is needed to forecast this model")
+    if isinstance(exogenous_path, dict):    #{name: one value or one value per step}
+        exogenous_path = np.column_stack([np.broadcast_to(np.asarray(exogenous_path[name], dtype='float64'), (horizon,)) for name in names])
+    elif isinstance(exogenous_path, pd.DataFrame):
+        exogenous_path = exogenous_path[names]
+    path = np.asarray(exogenous_path, dtype='float64')
+    return np.broadcast_to(path.reshape(-1, len(names)), (horizon, len(names))) * stored['model']['scale']
+
+#-------------------------------------------------------------------
+#Recursions
+
+def _analytic(stored, parts, x, horizon):
+    vol = stored['model']['vol'].lower()
+    state = stored['state']
+    resids2 = list(np.square(state['resids']))
+    negative = [value ** 2 if value < 0 else 0.0 for value in state['resids']]
+    sigma2 = list(state['sigma2'])
+    y = list(state['y'])
+    means, variances = np.empty(horizon), np.empty(horizon)
+    for step in range(horizon):
+        if vol == 'egarch':
+            if step:
+                raise ValueError("EGARCH has no analytic multi-step variance forecast, use method='simulation'")
+            standardized = np.asarray(state['resids']) / np.sqrt(state['sigma2'])
+            log_variance = (parts['omega']
+                            + sum(alpha * (abs(standardized[-1 - i]) - np.sqrt(2 / np.pi)) for i, alpha in enumerate(parts['alpha']))
+                            + sum(gamma * standardized[-1 - j] for j, gamma in enumerate(parts['gamma']))
+                            + sum(beta * np.log(state['sigma2'][-1 - k]) for k, beta in enumerate(parts['beta'])))
+            variance = np.exp(log_variance)
+        else:
+            variance = (parts['omega']
+                        + sum(alpha * resids2[-1 - i] for i, alpha in enumerate(parts['alpha']))
+                        + sum(gamma * negative[-1 - j] for j, gamma in enumerate(parts['gamma']))
+                        + sum(beta * sigma2[-1 - k] for k, beta in enumerate(parts['beta'])))
+        mean = parts['const'] + sum(phi * y[-1 - lag] for lag, phi in enumerate(parts['ar'])) + x[step] @ parts['beta_x']
+        resids2.append(variance)            #E[e^2] of a future shock is its variance
+        negative.append(0.5 * variance)     #and half of it comes from negative shocks
+        sigma2.append(variance)
+        y.append(mean)
+        means[step], variances[step] = mean, variance
+    return means, variances
+
+def _error_variances(parts, variances):     #Variance of the h-step mean forecast error, the AR lags carry earlier shocks forward
+    horizon = len(variances)
+    weights = np.zeros(horizon)
+    weights[0] = 1.0
+    for step in range(1, horizon):
+        weights[step] = sum(phi * weights[step - 1 - lag] for lag, phi in enumerate(parts['ar']) if step - 1 - lag >= 0)
+    return np.array([weights[:step + 1] ** 2 @ variances[step::-1] for step in range(horizon)])
+
+def _standardized_shocks(stored, parts, rng, size):
+    dist = stored['model'].get('dist', 'normal')
+    if dist in ('normal', 'gaussian'):
+        return rng.standard_normal(size)
+    if dist in ('t', 'studentst'):
+        nu = parts['dist'][0]
+        return rng.standard_t(nu, size) * np.sqrt((nu - 2) / nu)
+    if dist in ('skewt', 'skewstudent'):
+        from arch.univariate import SkewStudent     #Hansen's skewed t, through its quantile function
+        return SkewStudent().ppf(rng.random(size), parts['dist'])
+    raise ValueError(f"Simulation forecasts do not support dist={dist!r}")
+
+def _simulation(stored, parts, x, horizon, simulations, seed):
+    vol = stored['model']['vol'].lower()
+    state = stored['state']
+    rng = np.random.default_rng(seed)
+    shocks = _standardized_shocks(stored, parts, rng, (horizon, simulations))
+    resids = [np.full(simulations, value) for value in state['resids']]
+    sigma2 = [np.full(simulations, value) for value in state['sigma2']]
+    y = [np.full(simulations, value) for value in state['y']]
+    means, variances, error_variances = np.empty(horizon), np.empty(horizon), np.empty(horizon)
+    for step in range(horizon):
+        if vol == 'egarch':
+            log_variance = (parts['omega']
+                            + sum(alpha * (np.abs(resids[-1 - i] / np.sqrt(sigma2[-1 - i])) - np.sqrt(2 / np.pi)) for i, alpha in enumerate(parts['alpha']))
+                            + sum(gamma * resids[-1 - j] / np.sqrt(sigma2[-1 - j]) for j, gamma in enumerate(parts['gamma']))
+                            + sum(beta * np.log(sigma2[-1 - k]) for k, beta in enumerate(parts['beta'])))
+            variance = np.exp(log_variance)
+        else:
+            variance = (parts['omega']
+                        + sum(alpha * resids[-1 - i] ** 2 for i, alpha in enumerate(parts['alpha']))
+                        + sum(gamma * resids[-1 - j] ** 2 * (resids[-1 - j] < 0) for j, gamma in enumerate(parts['gamma']))
+                        + sum(beta * sigma2[-1 - k] for k, beta in enumerate(parts['beta'])))
+        resid = np.sqrt(variance) * shocks[step]
+        value = parts['const'] + sum(phi * y[-1 - lag] for lag, phi in enumerate(parts['ar'])) + x[step] @ parts['beta_x'] + resid
+        resids.append(resid)
+        sigma2.append(variance)
+        y.append(value)
+        means[step], variances[step], error_variances[step] = value.mean(), variance.mean(), value.var()
+    return means, variances, error_variances
+
+#-------------------------------------------------------------------
+
+#stored: a stored model (fit_or_load) or its key, exogenous_path: (horizon x exogenous) returns as a DataFrame,
+#array or {name: value(s)}. Returns one row per step ahead with the 'mean', 'variance' and 'residual variance' forecasts
+def forecast(stored, horizon=1, exogenous_path=None, method='analytic', simulations=1000, seed=0):
+    if method not in forecast_methods:
+        raise ValueError(f"method must be one of {forecast_methods}, got {method!r}")
+    stored = load_model(stored) if isinstance(stored, str) else stored
+    if stored is None:
+        raise KeyError("No stored model under this key, fit it with fit_or_load() first")
+    parts = _split_params(stored)
+    x = _exogenous_path(stored, exogenous_path, horizon)
+    if method == 'analytic':
+        means, variances = _analytic(stored, parts, x, horizon)
+        error_variances = _error_variances(parts, variances)
+    else:
+        means, variances, error_variances = _simulation(stored, parts, x, horizon, simulations, seed)
+    scale = stored['model']['scale']
+    return pd.DataFrame({
+        'mean': means / scale,
+        'variance': error_variances / scale ** 2,           #Of the return forecast, as arch's forecast().variance
+        'residual variance': variances / scale ** 2,        #Conditional variance of the shock
+    }, index=pd.RangeIndex(1, horizon + 1, name='h'))
+
+#Stored model of the GARCH-X stage of a study file (fitted only when the data or the model changed)
+def study_model(study):
+    study = pipeline.load_study(study)
+    series = study['series']
+    model = {**pipeline.default_model, **study.get('model', {})}
+    _, results = pipeline.returns_panel(study)
+    returns_dataframe = results['returns_dataframe']
+    return fit_or_load(
+        returns_dataframe[series[model['dependent']]['name']],
+        returns_dataframe[[series[key]['name'] for key in model['exogenous']]],
+        model,
+    )
@@ -0,0 +1,149 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Specialised estimation backend for the exact model of the thesis:
+#   mean:     y[t] = Const + x[t]'b + e[t]
+#   variance: sigma2[t] = omega + alpha[1] e[t-1]^2 + beta[1] sigma2[t-1],   e[t] ~ Normal(0, sigma2[t])
+#The variance recursion (and the recursions of its derivatives) is a first order linear filter with
+#coefficient beta[1], so it runs in compiled code through scipy.signal.lfilter on all of them at once.
+#The log-likelihood gradient is analytic and the optimizer is the same SLSQP set-up arch uses, with the
+#same backcast for the first variance, so the estimates match arch_model(mean='ARX', vol='Garch', p=1, q=1)
+#to optimizer tolerance (see validate()). Standard errors are the robust (sandwich) ones printed by arch.
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+import pandas as pd             #Data manipulation external library
+from scipy import optimize, signal, stats
+
+#-------------------------------------------------------------------
+#Likelihood
+
+def backcast(resids):           #Exponentially weighted first variance, as arch's GARCH.backcast
+    tau = min(75, len(resids))
+    weights = 0.94 ** np.arange(tau)
+    weights /= weights.sum()
+    return float(np.sum(resids[:tau] ** 2 * weights))
+
+def variance(params, y, x, sigma2_0):
+    k = x.shape[1]
+    omega, alpha, beta = params[k:]
+    resids = y - x @ params[:k]
+    inputs = np.empty_like(y)
+    inputs[0] = omega + (alpha + beta) * sigma2_0
+    inputs[1:] = omega + alpha * resids[:-1] ** 2
+    return resids, signal.lfilter([1.0], [1.0, -beta], inputs)
+
+#Log-likelihood, and when scores=True the per-observation scores (T x parameters) as well
+def loglikelihood(params, y, x, sigma2_0, scores=False):
+    k = x.shape[1]
+    omega, alpha, beta = params[k:]
+    resids, sigma2 = variance(params, y, x, sigma2_0)
+    loglik = -0.5 * (np.log(2 * np.pi) + np.log(sigma2) + resids ** 2 / sigma2)
+    if not scores:
+        return loglik.sum()
+    inputs = np.zeros((len(y), k + 3))              #Inputs of the derivative recursions, same filter as sigma2
+    inputs[1:, :k] = -2 * alpha * resids[:-1, None] * x[:-1]
+    inputs[:, k] = 1.0
+    inputs[0, k + 1] = sigma2_0
+    inputs[1:, k + 1] = resids[:-1] ** 2
+    inputs[0, k + 2] = sigma2_0
+    inputs[1:, k + 2] = sigma2[:-1]
+    dsigma2 = signal.lfilter([1.0], [1.0, -beta], inputs, axis=0)
+    score = -0.5 * (1 / sigma2 - resids ** 2 / sigma2 ** 2)[:, None] * dsigma2
+    score[:, :k] += (resids / sigma2)[:, None] * x   #Direct effect of the mean parameters on e[t]
+    return loglik.sum(), score
+
+#-------------------------------------------------------------------
+#Estimation
+
+class KernelResult:             #Same attributes as the arch result used by pipeline.garch_table / garch_fit_statistics
+    def __init__(self, names, params, covariance, loglik, nobs, optimization_result):
+        self.params = pd.Series(params, index=names, name='params')
+        self.param_cov = pd.DataFrame(covariance, index=names, columns=names)
+        self.std_err = pd.Series(np.sqrt(np.diag(covariance)), index=names, name='std_err')
+        self.tvalues = (self.params / self.std_err).rename('tvalues')
+        self.pvalues = pd.Series(2 * stats.norm.sf(np.abs(self.tvalues)), index=names, name='pvalues')
+        self.loglikelihood = loglik
+        self.nobs = nobs
+        self.aic = -2 * loglik + 2 * len(params)
+        self.bic = -2 * loglik + np.log(nobs) * len(params)
+        self.optimization_result = optimization_result
+        self.convergence_flag = 0 if optimization_result.success else 1
+
+    def summary(self):
+        table = pd.DataFrame({'coef': self.params, 'std err': self.std_err, 't': self.tvalues, 'P>|t|': self.pvalues})
+        return (f"AR-X - GARCH(1,1) Model Results (garch_kernel backend)\n"
+                f"Log-Likelihood: {self.loglikelihood:.2f}   AIC: {self.aic:.2f}   BIC: {self.bic:.2f}   "
+                f"No. Observations: {self.nobs}\n{table.to_string()}")
+
+def _robust_covariance(params, y, x, sigma2_0):
+    _, score = loglikelihood(params, y, x, sigma2_0, scores=True)
+    hessian = np.empty((len(params), len(params)))
+    for i in range(len(params)):   #Central differences of the analytic gradient
+        step = 1e-5 * max(abs(params[i]), 1e-2)
+        shifted_up, shifted_down = params.copy(), params.copy()
+        shifted_up[i] += step
+        shifted_down[i] -= step
+        hessian[i] = (loglikelihood(shifted_up, y, x, sigma2_0, True)[1].sum(0)
+                      - loglikelihood(shifted_down, y, x, sigma2_0, True)[1].sum(0)) / (2 * step)
+    hessian = (hessian + hessian.T) / 2
+    inverse = np.linalg.inv(hessian)
+    return inverse @ (score.T @ score) @ inverse
+
+def _starting_values(y, x, ols):
+    resids = y - x @ ols
+    sample_variance = resids.var()
+    candidates = [(alpha, beta) for alpha in (0.05, 0.1, 0.2) for beta in (0.75, 0.85, 0.9) if alpha + beta < 1]
+    sigma2_0 = backcast(resids)
+    scored = []
+    for alpha, beta in candidates:
+        params = np.r_[ols, sample_variance * (1 - alpha - beta), alpha, beta]
+        scored.append((loglikelihood(params, y, x, sigma2_0), params))
+    return max(scored, key=lambda item: item[0])[1]
+
+#dependent_variable: Series, independent_variable: DataFrame (a constant is added as 'Const')
+#covariance=False skips the standard errors (NaN), which bootstrap and grid workloads do not need
+def fit(dependent_variable, independent_variable, starting_values=None, covariance=True, tolerance=1e-8, max_iterations=500):
+    y = np.asarray(dependent_variable, dtype='float64')
+    exogenous = pd.DataFrame(independent_variable)
+    x = np.column_stack([np.ones(len(y)), exogenous.to_numpy(dtype='float64')])
+    names = ['Const'] + [str(column) for column in exogenous.columns] + ['omega', 'alpha[1]', 'beta[1]']
+    k = x.shape[1]
+    ols = np.linalg.lstsq(x, y, rcond=None)[0]
+    sigma2_0 = backcast(y - x @ ols)   #arch fixes the backcast at the OLS residuals
+    start = np.asarray(starting_values, dtype='float64') if starting_values is not None else _starting_values(y, x, ols)
+    sample_variance = np.var(y)
+    scale = len(y)              #Optimise the average log-likelihood, as arch does
+
+    def objective(params):
+        loglik, score = loglikelihood(params, y, x, sigma2_0, scores=True)
+        return -loglik / scale, -score.sum(0) / scale
+
+    bounds = [(-np.inf, np.inf)] * k + [(1e-6 * sample_variance, 10 * sample_variance), (0.0, 1.0), (0.0, 1.0)]
+    constraint = {'type': 'ineq', 'fun': lambda params: 1 - params[k + 1] - params[k + 2],
+                  'jac': lambda params: np.r_[np.zeros(k), 0.0, -1.0, -1.0]}
+    optimization_result = optimize.minimize(objective, start, jac=True, method='SLSQP', bounds=bounds,
+                                            constraints=[constraint], options={'ftol': tolerance, 'maxiter': max_iterations})
+    params = optimization_result.x
+    loglik = loglikelihood(params, y, x, sigma2_0)
+    param_cov = _robust_covariance(params, y, x, sigma2_0) if covariance else np.full((len(params), len(params)), np.nan)
+    return KernelResult(names, params, param_cov, loglik, len(y), optimization_result)
+
+#-------------------------------------------------------------------
+
+#Fits the same data with arch and with this kernel, returns a table of both and raises if they differ
+def validate(dependent_variable, independent_variable, rtol=1e-3, atol=1e-4):
+    from arch import arch_model     #GARCH model
+    reference = arch_model(dependent_variable, x=independent_variable, mean='ARX', vol='Garch', p=1, q=1).fit(disp='off')
+    kernel = fit(dependent_variable, independent_variable)
+    comparison = pd.DataFrame({
+        'arch coef': reference.params, 'kernel coef': kernel.params,
+        'arch std err': reference.std_err, 'kernel std err': kernel.std_err,
+    })
+    if not np.allclose(comparison['arch coef'], comparison['kernel coef'], rtol=rtol, atol=atol):
+        raise AssertionError(f"Kernel estimates differ from arch:\n{comparison}")
+    if not np.isclose(reference.loglikelihood, kernel.loglikelihood, rtol=1e-6, atol=1e-3):
+        raise AssertionError(f"Kernel log-likelihood {kernel.loglikelihood} differs from arch {reference.loglikelihood}")
+    return comparison
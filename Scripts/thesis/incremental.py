@@ -0,0 +1,183 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Incremental (append) mode for daily refreshes of a study
+#After every run the state of the study is kept inside Cache/incremental: the last aligned date, a hash of
+#the aligned returns up to that date, running moments of every column, the fitted GARCH parameters and a
+#content key of every sheet of the report, next to a pickle of the stage results (ADF, VIF, GARCH).
+#On the next run only the rows appended after the last date are folded into the moments (Welford / Chan
+#update), the GARCH model is refitted starting from the stored parameters and only the sheets whose table
+#changed are written again: the others are copied from the previous workbook and parquet folder (see
+#report.ReportWriter.keep). When no row was appended the stored results are returned as they are, when older
+#rows changed the study is rebuilt in full.
+#The state belongs to the study without its period end, so moving 'end' forward appends the new days.
+#   python -m thesis update thesis_20_23_fix
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import json                     #Stores the incremental state
+import pickle                   #Stores the stage results of the last run
+import hashlib                  #Detects changes in rows that were already processed
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import paths, pipeline, memo, report
+
+#-------------------------------------------------------------------
+#Running moments
+
+def moments(values):            #Count, mean, sum of squared deviations, min and max of every column
+    values = np.asarray(values, dtype='float64')
+    mean = values.mean(axis=0) if len(values) else np.zeros(values.shape[1])
+    return {
+        'n': len(values),
+        'mean': mean,
+        'm2': ((values - mean) ** 2).sum(axis=0),
+        'min': values.min(axis=0) if len(values) else np.full(values.shape[1], np.inf),
+        'max': values.max(axis=0) if len(values) else np.full(values.shape[1], -np.inf),
+    }
+
+def update_moments(state, values):  #Folds a block of new rows into the running moments (Chan et al. update)
+    block = moments(values)
+    n = state['n'] + block['n']
+    if block['n'] == 0:
+        return state
+    delta = block['mean'] - state['mean']
+    return {
+        'n': n,
+        'mean': state['mean'] + delta * block['n'] / n,
+        'm2': state['m2'] + block['m2'] + delta ** 2 * state['n'] * block['n'] / n,
+        'min': np.minimum(state['min'], block['min']),
+        'max': np.maximum(state['max'], block['max']),
+    }
+
+def describe(state, columns):   #Same table as pipeline.describe (sample standard deviation)
+    return pd.DataFrame({
+        'min': state['min'],
+        'max': state['max'],
+        'mean': state['mean'],
+        'std': np.sqrt(state['m2'] / (state['n'] - 1)),
+    }, index=columns)
+
+#-------------------------------------------------------------------
+#Persisted state
+
+def _rows_hash(returns_dataframe):
+    digest = hashlib.sha1(returns_dataframe.index.to_numpy(dtype='datetime64[ns]').tobytes())
+    digest.update(np.ascontiguousarray(returns_dataframe.to_numpy(dtype='float64')).tobytes())
+    digest.update(json.dumps(list(returns_dataframe.columns)).encode())
+    return digest.hexdigest()
+
+def state_location(study):      #The period end is left out of the key, a later end is what appends rows
+    study = {**study, 'period': {key: value for key, value in study.get('period', {}).items() if key != 'end'}}
+    key = hashlib.sha1(json.dumps(study, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    return os.path.join(paths.cache_directory, 'incremental', f"{key}.json")
+
+def load_state(location):
+    if not os.path.exists(location):
+        return None
+    with open(location) as state_file:
+        state = json.load(state_file)
+    state['moments'] = {key: np.array(value) if isinstance(value, list) else value for key, value in state['moments'].items()}
+    return state
+
+def save_state(location, state):
+    os.makedirs(os.path.dirname(location), exist_ok=True)
+    serialisable = {**state, 'moments': {key: np.asarray(value).tolist() if key != 'n' else int(value) for key, value in state['moments'].items()}}
+    with open(location + '.tmp', 'w') as state_file:
+        json.dump(serialisable, state_file)
+    os.replace(location + '.tmp', location)
+
+def _results_location(location):
+    return os.path.splitext(location)[0] + '.pkl'
+
+def load_results(location):     #Stage results of the last run, None when they were not kept or cannot be read
+    try:
+        with open(_results_location(location), 'rb') as results_file:
+            return pickle.load(results_file)
+    except Exception:
+        return None
+
+def save_results(location, stage_results):
+    os.makedirs(os.path.dirname(location), exist_ok=True)
+    with open(_results_location(location) + '.tmp', 'wb') as results_file:
+        pickle.dump(stage_results, results_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(_results_location(location) + '.tmp', _results_location(location))
+
+#Writes the report of a run; sheets whose table has the content key it had in the last run are copied from the
+#previous report. Returns ({sheet: content key}, names of the sheets written again)
+def write_report(results, output_location, previous_keys):
+    sheet_keys, written = {}, []
+    with report.ReportWriter(output_location) as writer:
+        for sheet_name, table, index in pipeline.report_tables(results):
+            sheet_keys[sheet_name] = memo.content_key(table)
+            if sheet_keys[sheet_name] == previous_keys.get(sheet_name) and writer.keep(sheet_name):
+                continue
+            written.append(writer.add(sheet_name, table, index=index))
+    return sheet_keys, written
+
+#-------------------------------------------------------------------
+
+#Updates a study with the rows appended since its last run, returns the pipeline results plus
+#'appended' (number of new rows, None after a full rebuild) and 'sheets' (names of the workbook sheets written again)
+def run_incremental(study):
+    study = pipeline.load_study(study)
+    series = study['series']
+    model = {**pipeline.default_model, **study.get('model', {})}
+    stages = {'adf': True, 'vif': False, 'garch': True, **study.get('stages', {})}
+    _, results = pipeline.returns_panel(study)
+    returns_dataframe = results['returns_dataframe']
+    if len(returns_dataframe) == 0:
+        raise ValueError(f"Study {study.get('name')!r} has no aligned returns between {study['period']['start']} "
+                         f"and {study['period']['end']}, there is nothing to update")
+    location = state_location(study)
+    state = load_state(location)
+    stored = load_results(location) if state is not None else None
+
+    appended = None
+    if state is not None:
+        last_date = pd.Timestamp(state['last_date'])
+        processed = returns_dataframe[returns_dataframe.index <= last_date]
+        if len(processed) == state['rows'] and _rows_hash(processed) == state['rows_hash']:
+            appended = returns_dataframe[returns_dataframe.index > last_date]
+    if appended is not None and len(appended) == 0 and stored is not None:    #Nothing new: the results of the last run
+        results.update(stored)
+        results['descriptive'] = describe(state['moments'], returns_dataframe.columns)
+        results['appended'], results['sheets'] = 0, []
+        return results
+
+    if appended is None:        #First run or older rows changed: rebuild everything
+        running = moments(returns_dataframe)
+        starting_values = None
+    else:
+        running = update_moments(state['moments'], appended)
+        starting_values = state.get('garch_params')
+    results['descriptive'] = describe(running, returns_dataframe.columns)
+    if stages['adf']:
+        results['adf'] = pipeline.adf_test(returns_dataframe)
+    if stages['vif']:
+        results['vif'] = pipeline.vif(returns_dataframe)
+    garch_params, sheet_keys, sheets = None, {}, []
+    if stages['garch']:
+        dependent_variable = returns_dataframe[series[model['dependent']]['name']]
+        independent_variable = returns_dataframe[[series[key]['name'] for key in model['exogenous']]]
+        results['garch'] = pipeline.garch_x(dependent_variable, independent_variable, model, starting_values)
+        garch_params = results['garch'].params.tolist()
+    if study.get('output'):     #Same sheets as a full run, only the changed ones are written again
+        sheet_keys, sheets = write_report(results, os.path.join(paths.output_directory, study['output']),
+                                          state.get('sheet_keys', {}) if state is not None else {})
+
+    save_results(location, {stage: results[stage] for stage in ('adf', 'vif', 'garch') if stage in results})
+    save_state(location, {
+        'last_date': str(returns_dataframe.index[-1]),
+        'rows': len(returns_dataframe),
+        'rows_hash': _rows_hash(returns_dataframe),
+        'moments': running,
+        'garch_params': garch_params,
+        'sheet_keys': sheet_keys,
+    })
+    results['appended'] = None if appended is None else len(appended)
+    results['sheets'] = sheets
+    return results
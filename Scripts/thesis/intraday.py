@@ -0,0 +1,187 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Intraday (minute / tick) files that do not fit in memory
+#A file is read 'chunk_rows' lines at a time and every chunk is aggregated into open / high / low / close bars
+#of a configurable length ('5min', '1min', ...); the ticks of the last, still open bar and the bars of the
+#last, still open day are carried into the next chunk, so memory stays bounded by one chunk plus one day of
+#bars however long the file is. The file must be sorted by time. Every finished day is reduced to one row:
+#   rv   - realized variance, sum of squared bar log returns
+#   bv   - bipower variation, (pi / 2) * sum |r_t| |r_t-1| (robust to jumps)
+#   rk   - realized kernel with Parzen weights, bandwidth H = 3.5134 * (2n)^-0.4 * n^0.6 unless given
+#(intraday returns only, the overnight gap is left out) together with the day's open, close and close-to-close
+#log return. The daily table feeds a HAR regression (har) or, lagged one day, the daily pipeline as an extra
+#regressor column (study [intraday] tables, see pipeline.returns_panel).
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import math                     #Parzen kernel bandwidth
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import paths
+
+measures = ('rv', 'bv', 'rk')
+chunk_rows = 1_000_000          #Lines of the file held in memory at once
+
+#-------------------------------------------------------------------
+#Streaming bars
+
+def _chunks(location, timestamp, price, rows, timestamp_format, timezone):    #(time, price) chunks of the file
+    if not os.path.isabs(location) and not os.path.exists(location):
+        location = os.path.join(paths.data_directory, location)
+    for chunk in pd.read_csv(location, usecols=[timestamp, price], chunksize=rows, encoding='utf-8-sig'):
+        times = pd.to_datetime(chunk[timestamp], format=timestamp_format)
+        if timezone is not None:    #Days are counted in the exchange's own time zone
+            times = times.dt.tz_localize(timezone) if times.dt.tz is None else times.dt.tz_convert(timezone)
+            times = times.dt.tz_localize(None)
+        yield pd.DataFrame({'price': chunk[price].to_numpy(dtype='float64')}, index=pd.DatetimeIndex(times, name='time')).dropna()
+
+def _aggregate(ticks, bar):
+    grouped = ticks['price'].groupby(ticks.index.floor(bar))
+    bars = pd.DataFrame({
+        'open': grouped.first(), 'high': grouped.max(), 'low': grouped.min(), 'close': grouped.last(), 'ticks': grouped.size(),
+    })
+    bars.index.name = 'time'
+    return bars
+
+#Yields finished bars in time order, one frame per chunk of the file
+def iter_bars(location, bar='5min', timestamp='Timestamp', price='Price', rows=None, timestamp_format=None, timezone=None):
+    carry = None                #Ticks of the bar that may continue in the next chunk
+    for ticks in _chunks(location, timestamp, price, rows or chunk_rows, timestamp_format, timezone):
+        if carry is not None:
+            ticks = pd.concat([carry, ticks])
+        if ticks.empty:
+            continue
+        open_bar = ticks.index[-1].floor(bar)
+        finished = ticks.index < open_bar
+        carry = ticks[~finished]
+        if finished.any():
+            yield _aggregate(ticks[finished], bar)
+    if carry is not None and not carry.empty:
+        yield _aggregate(carry, bar)
+
+def iter_days(bar_chunks):      #Yields (date, bars of that day) for every finished day
+    pending = None
+    for bars in bar_chunks:
+        pending = bars if pending is None else pd.concat([pending, bars])
+        days = pending.index.normalize()
+        last_day = days[-1]
+        for day, day_bars in pending[days < last_day].groupby(days[days < last_day]):
+            yield day, day_bars
+        pending = pending[days == last_day]
+    if pending is not None and not pending.empty:
+        yield pending.index[0].normalize(), pending
+
+#Streams the bars into one parquet file (pyarrow is only imported here), returns the number of bars written
+def write_bars(location, output_location, bar='5min', **options):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer, written = None, 0
+    try:
+        for bars in iter_bars(location, bar, **options):
+            table = pa.Table.from_pandas(bars.astype({'ticks': 'int64'}), preserve_index=True)
+            writer = writer or pq.ParquetWriter(output_location, table.schema)
+            writer.write_table(table)
+            written += len(bars)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+#-------------------------------------------------------------------
+#Realized measures
+
+def parzen(x):
+    x = np.abs(x)
+    return np.where(x <= 0.5, 1 - 6 * x ** 2 + 6 * x ** 3, np.where(x <= 1, 2 * (1 - x) ** 3, 0.0))
+
+def default_bandwidth(n):       #Barndorff-Nielsen et al. rule with the noise to signal ratio estimated as 1 / 2n
+    return max(1, math.ceil(3.5134 * (2 * n) ** -0.4 * n ** 0.6))
+
+def realized_measures(closes, bandwidth=None):    #Realized measures of one day's bar closes
+    returns = np.diff(np.log(np.asarray(closes, dtype='float64')))
+    n = len(returns)
+    if n < 2:
+        return {'bars': n + 1, 'rv': float(returns @ returns) if n else np.nan, 'bv': np.nan, 'rk': np.nan}
+    bandwidth = default_bandwidth(n) if bandwidth is None else bandwidth
+    lags = np.arange(1, min(bandwidth, n - 1) + 1)
+    autocovariances = np.array([returns[lag:] @ returns[:-lag] for lag in lags])
+    rv = float(returns @ returns)
+    return {
+        'bars': n + 1,
+        'rv': rv,
+        'bv': float(np.pi / 2 * np.abs(returns[1:]) @ np.abs(returns[:-1])),
+        'rk': float(rv + 2 * parzen(lags / (bandwidth + 1)) @ autocovariances),
+    }
+
+#One row per day: open, close, close-to-close log 'return' and the realized measures, memory bounded by one chunk
+def daily_realized(location, bar='5min', bandwidth=None, **options):
+    rows, dates = [], []
+    for day, bars in iter_days(iter_bars(location, bar, **options)):
+        dates.append(day)
+        rows.append({'open': bars['open'].iloc[0], 'close': bars['close'].iloc[-1],
+                     **realized_measures(bars['close'].to_numpy(), bandwidth)})
+    realized = pd.DataFrame(rows, index=pd.DatetimeIndex(dates, name='Date'), columns=['open', 'close', 'bars', *measures])
+    realized.insert(2, 'return', np.log(realized['close']).diff())
+    return realized
+
+#-------------------------------------------------------------------
+#Daily models
+
+#Measure of the previous 'lag' trading day(s) on the dates of a daily frame (known before that day's close)
+def realized_regressor(realized, index, measure='rk', lag=1, log=False):
+    values = realized[measure].shift(lag)
+    values = np.log(values) if log else values
+    return values.reindex(pd.DatetimeIndex(index))
+
+def har_design(realized, measure='rv', horizons=(1, 5, 22), log=False):     #Target and daily / weekly / monthly means of the past
+    values = np.log(realized[measure]) if log else realized[measure]
+    names = {1: 'daily', 5: 'weekly', 22: 'monthly'}
+    design = pd.DataFrame({'target': values})
+    for horizon in horizons:
+        design[names.get(horizon, f"{horizon} days")] = values.rolling(horizon).mean().shift(1)
+    return design.dropna()
+
+#HAR-RV regression (Corsi, 2009) by OLS, returns {'Coefficients': coef / std err / t / P>|t|, 'Fit': R-squared and observations}
+def har(realized, measure='rv', horizons=(1, 5, 22), log=False):
+    from scipy import stats     #t distribution of the coefficient p-values
+    design = har_design(realized, measure, horizons, log)
+    y = design.pop('target').to_numpy()
+    x = np.column_stack([np.ones(len(design)), design.to_numpy()])
+    coefficients, _, _, _ = np.linalg.lstsq(x, y, rcond=None)
+    residuals = y - x @ coefficients
+    degrees = len(y) - x.shape[1]
+    covariance = residuals @ residuals / degrees * np.linalg.inv(x.T @ x)
+    std_err = np.sqrt(np.diag(covariance))
+    t_values = coefficients / std_err
+    names = ['const', *design.columns]
+    return {
+        'Coefficients': pd.DataFrame({'coef': coefficients, 'std err': std_err, 't': t_values,
+                                      'P>|t|': 2 * stats.t.sf(np.abs(t_values), degrees)}, index=names),
+        'Fit': pd.DataFrame([{'R-squared': 1 - residuals @ residuals / ((y - y.mean()) @ (y - y.mean())), 'No. Observations': len(y)}]),
+    }
+
+#-------------------------------------------------------------------
+
+#[intraday.<key>] tables of a study: file (inside the Data folder), timestamp / price columns, bar, timezone,
+#timestamp_format, bandwidth, chunk_rows. Returns {key: daily_realized table}
+def study_realized(entries):
+    return {
+        key: daily_realized(
+            entry['file'], entry.get('bar', '5min'), entry.get('bandwidth'),
+            timestamp=entry.get('timestamp', 'Timestamp'), price=entry.get('price', 'Price'), rows=entry.get('chunk_rows'),
+            timestamp_format=entry.get('timestamp_format'), timezone=entry.get('timezone'),
+        )
+        for key, entry in entries.items()
+    }
+
+#Adds the lagged 'measure' of every entry to the daily returns as a column called entry['name']
+def join_realized(returns_dataframe, realized, entries, dropna=True):
+    returns_dataframe = returns_dataframe.copy()
+    for key, entry in entries.items():
+        returns_dataframe[entry['name']] = realized_regressor(
+            realized[key], returns_dataframe.index, entry.get('measure', 'rk'), entry.get('lag', 1), entry.get('log', False)).to_numpy()
+    return returns_dataframe.dropna() if dropna else returns_dataframe
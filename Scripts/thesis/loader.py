@@ -0,0 +1,131 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Schema-aware reader for the csv files inside the Data folder
+#The files come in several shapes: a byte order mark in front of 'Date', '1/3/2020 0:00' timestamps,
+#the three header rows written by yahoo finance (Price / Ticker / Date) and lines wrapped in quotes.
+#detect_schema() reads the first lines of a file once and works out its encoding, header rows, column
+#names and exact date format, so read_prices() never has to infer dates row by row. With pyarrow installed
+#the dates are parsed by the pyarrow csv reader with that format, which is several times faster than
+#pd.read_csv(..., parse_dates=True).
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import io                       #Feeds unquoted lines to the csv parser
+import pandas as pd             #Data manipulation external library
+
+from thesis import paths, trace
+
+date_formats = ['%m/%d/%Y', '%m/%d/%Y %H:%M', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y', '%d/%m/%Y %H:%M']
+
+#-------------------------------------------------------------------
+#Schema detection
+
+def _split(line, quoted):
+    line = line.strip()
+    if quoted:
+        line = line[1:-1]
+    return [cell.strip() for cell in line.split(',')]
+
+def _date_format(samples):      #First format that parses every sampled date
+    for date_format in date_formats:
+        try:
+            pd.to_datetime(pd.Series(samples), format=date_format)
+            return date_format
+        except ValueError:
+            continue
+    raise ValueError(f"Unknown date format in {samples[:3]}")
+
+def detect_schema(location, sample_rows=20):
+    with open(location, 'rb') as csv_file:
+        head = csv_file.read(8192)
+    encoding = 'utf-8-sig' if head.startswith(b'\xef\xbb\xbf') else 'utf-8'
+    lines = [line for line in head.decode(encoding, errors='replace').splitlines()[:sample_rows + 3] if line.strip()]
+    quoted = lines[0].startswith('"') and lines[0].rstrip().endswith('"') and ',' in lines[0]
+    rows = [_split(line, quoted) for line in lines]
+    if rows[0][0] == 'Price' and len(rows) > 2 and rows[1][0] == 'Ticker':    #yahoo finance multi-row header
+        header_rows = 3 if rows[2][0] == 'Date' else 2
+        columns = ['Date'] + rows[1][1:]
+    else:
+        header_rows = 1
+        columns = rows[0]
+    samples = [row[0] for row in rows[header_rows:header_rows + sample_rows] if row[0]]
+    return {
+        'encoding': encoding,
+        'quoted': quoted,
+        'header_rows': header_rows,
+        'columns': columns,
+        'date_format': _date_format(samples),
+    }
+
+#-------------------------------------------------------------------
+#Reading
+
+def _source(location, schema):  #Quoted files are unquoted in memory, every other file is read straight from disk
+    if not schema['quoted']:
+        return location
+    with open(location, encoding=schema['encoding']) as csv_file:
+        return io.BytesIO('\n'.join(line.strip()[1:-1] for line in csv_file).encode())
+
+def _parse_pyarrow(location, schema):
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    columns = schema['columns']
+    table = pa_csv.read_csv(
+        _source(location, schema),
+        read_options=pa_csv.ReadOptions(skip_rows=schema['header_rows'], column_names=columns),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={'Date': pa.timestamp('ns'), **{column: pa.float64() for column in columns[1:]}},
+            timestamp_parsers=[schema['date_format']],
+        ),
+    )
+    table = table.filter(table['Date'].is_valid())
+    index = pd.DatetimeIndex(table['Date'].to_numpy(), name='Date')
+    return pd.DataFrame({column: table[column].to_numpy(zero_copy_only=False) for column in columns[1:]}, index=index)
+
+def _parse_pandas(location, schema):
+    columns = schema['columns']
+    frame = pd.read_csv(
+        _source(location, schema),
+        encoding=schema['encoding'],
+        skiprows=schema['header_rows'],
+        header=None,
+        names=columns,
+        dtype={'Date': object, **{column: 'float64' for column in columns[1:]}},
+    )
+    frame = frame[frame['Date'].notna()]
+    frame.index = pd.to_datetime(frame['Date'], format=schema['date_format'])
+    return frame.drop(columns='Date')
+
+def _parse(location, schema, engine):
+    if engine is None:          #pyarrow parses the dates in C++ with the detected format, pandas is the fallback
+        try:
+            import pyarrow.csv
+            engine = 'pyarrow'
+        except ImportError:
+            engine = 'c'
+    if engine == 'pyarrow':
+        return _parse_pyarrow(location, schema)
+    frame = _parse_pandas(location, schema)
+    frame.index = pd.DatetimeIndex(frame.index, name='Date').as_unit('ns')
+    return frame
+
+#Returns the file as a frame indexed by Date (datetime64) with one float64 column per price column
+#engine='pyarrow' or 'c' picks the parser, by default pyarrow is used when it is installed
+def read_prices(location, engine=None):
+    if not os.path.isabs(location) and not os.path.exists(location):
+        location = os.path.join(paths.data_directory, location)
+    with trace.span('read_csv', file=os.path.basename(location)) as record:
+        frame = _parse(location, detect_schema(location), engine)
+        record['rows out'] = len(frame)
+    return frame
+
+#Reads every csv file of a directory (the Data folder by default) into {file name: frame}
+def load_directory(directory=None, engine=None):
+    directory = directory or paths.data_directory
+    return {
+        file_name: read_prices(os.path.join(directory, file_name), engine)
+        for file_name in sorted(os.listdir(directory)) if file_name.endswith('.csv')
+    }
@@ -0,0 +1,164 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Content-addressed stage cache of the study pipeline
+#A stage is looked up by a hash of its name, its parameters and the content hash of its input (the numbers the
+#stage before it produced, or the bytes of the csv files for the load stage), never by the parameters of the
+#stages further up. An upstream option that produces the same numbers therefore does not refit anything
+#downstream; column names, dtypes and dates are part of the content key, so renaming a series does (a print
+#or an option that changes nothing in the result does not). The last 'memory_limit' results are kept in
+#memory for this process and every result is pickled to Cache/stages/<stage>-<key>.pkl for the next one; the folder is trimmed
+#to 'size_limit' bytes by dropping the least recently used results. THESIS_MEMO=0 disables the disk side, invalidate() drops results on demand.
+#Bump cache_version when a stage starts computing different numbers for the same inputs.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import json                     #Builds stable stage keys
+import pickle                   #Stores stage results
+import hashlib                  #Hashes stage parameters and stage results
+import collections              #Least recently used order of the results kept in memory
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import paths
+
+cache_version = 1
+memo_directory = os.path.join(paths.cache_directory, 'stages')
+size_limit = int(os.environ.get('THESIS_MEMO_SIZE', 512 * 2 ** 20))    #Bytes of stage results kept on disk
+memory_limit = int(os.environ.get('THESIS_MEMO_ENTRIES', 64))     #Stage results kept in memory by a long-lived process
+enabled = os.environ.get('THESIS_MEMO', '1') != '0'
+_memory = collections.OrderedDict()     #Stage key -> (content key, result, stage name) for this process, oldest first
+_file_keys = {}                 #File location -> (modification time, size, content key)
+
+#-------------------------------------------------------------------
+#Keys
+
+def stage_key(name, params, input_key):
+    return hashlib.sha1(json.dumps([cache_version, name, params, input_key], sort_keys=True, default=str).encode()).hexdigest()
+
+def _update(digest, value):     #Feeds the numbers (not the memory layout) of a stage result into the digest
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(type(value).__name__.encode())
+        digest.update(json.dumps([str(label) for label in (value.columns if isinstance(value, pd.DataFrame) else [value.name])]).encode())
+        digest.update(json.dumps([str(dtype) for dtype in np.atleast_1d(value.dtypes)]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(str((value.shape, value.dtype)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict{len(value)}".encode())
+        for key in sorted(value, key=str):
+            digest.update(str(key).encode())
+            _update(digest, value[key])
+    elif isinstance(value, (str, int, float, bool, type(None))):
+        digest.update(repr(value).encode())
+    else:                       #Fitted models and other objects
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+def content_key(value):
+    digest = hashlib.sha1()
+    _update(digest, value)
+    return digest.hexdigest()
+
+def file_key(location):         #Content hash of a file, re-read only when its modification time or size changed
+    status = os.stat(location)
+    cached = _file_keys.get(location)
+    if cached is None or cached[:2] != (status.st_mtime_ns, status.st_size):
+        digest = hashlib.sha1()
+        with open(location, 'rb') as input_file:
+            for block in iter(lambda: input_file.read(2 ** 20), b''):
+                digest.update(block)
+        cached = _file_keys[location] = (status.st_mtime_ns, status.st_size, digest.hexdigest())
+    return cached[2]
+
+#-------------------------------------------------------------------
+#Disk store
+
+def _location(name, key):
+    return os.path.join(memo_directory, f"{name}-{key}.pkl")
+
+def _load(location):
+    try:
+        with open(location, 'rb') as result_file:
+            entry = pickle.load(result_file)
+    except FileNotFoundError:
+        return None
+    except Exception:           #Unreadable (interrupted write, other library versions): computed again
+        os.remove(location)
+        return None
+    os.utime(location)          #Most recently used
+    return entry
+
+def _save(location, entry):
+    try:
+        data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:           #Results that cannot be pickled stay in memory only
+        return
+    os.makedirs(memo_directory, exist_ok=True)
+    with open(location + '.tmp', 'wb') as result_file:
+        result_file.write(data)
+    os.replace(location + '.tmp', location)
+
+def entries():                  #One row per stored result, least recently used first
+    if not os.path.isdir(memo_directory):
+        return pd.DataFrame(columns=['stage', 'key', 'bytes', 'last used'])
+    rows = []
+    for file_name in os.listdir(memo_directory):
+        if file_name.endswith('.pkl'):
+            status = os.stat(os.path.join(memo_directory, file_name))
+            name, key = file_name[:-4].rsplit('-', 1)
+            rows.append({'stage': name, 'key': key, 'bytes': status.st_size,
+                         'last used': pd.Timestamp(status.st_mtime_ns, unit='ns')})
+    return pd.DataFrame(rows, columns=['stage', 'key', 'bytes', 'last used']).sort_values('last used', ignore_index=True)
+
+def evict(limit=None):          #Drops the least recently used results until the folder fits in limit bytes
+    limit = size_limit if limit is None else limit
+    stored = entries()
+    excess = stored['bytes'].sum() - limit
+    removed = 0
+    for row in stored.itertuples():
+        if excess <= 0:
+            break
+        os.remove(_location(row.stage, row.key))
+        excess -= row.bytes
+        removed += 1
+    return removed
+
+#stage: only results of that stage (e.g. 'garch'), memory / disk: which copies to drop
+def invalidate(stage=None, memory=True, disk=True):
+    if memory:
+        for key in [key for key, entry in _memory.items() if stage is None or entry[2] == stage]:
+            del _memory[key]
+    removed = 0
+    if disk:
+        stored = entries()
+        for row in stored[stored['stage'] == stage].itertuples() if stage is not None else stored.itertuples():
+            os.remove(_location(row.stage, row.key))
+            removed += 1
+    return removed
+
+#-------------------------------------------------------------------
+
+#Returns (content key of the result, result) of a stage, computing it only when no stage with the same name,
+#parameters and input content was computed before. The content key is the input_key of the stages after it.
+def memoize(name, params, input_key, compute):
+    key = stage_key(name, params, input_key)
+    if key not in _memory:
+        entry = _load(_location(name, key)) if enabled else None
+        if entry is None:
+            result = compute()
+            entry = (content_key(result), result)
+            if enabled:
+                _save(_location(name, key), entry)
+                evict()
+        _memory[key] = (*entry, name)
+        while len(_memory) > memory_limit:
+            _memory.popitem(last=False)
+    _memory.move_to_end(key)
+    return _memory[key][:2]
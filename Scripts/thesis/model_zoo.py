@@ -0,0 +1,146 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Model zoo: the GARCH-X regression of the thesis fitted with alternative volatility specifications
+#(GARCH, GJR-GARCH, EGARCH), orders p / q, error distributions (normal, Student's t, skewed t) and ARX lags,
+#ranked by AIC and BIC in one table. Every specification has a simpler parent (fewer lags, normal errors,
+#lower q, lower p, in that order); the zoo is fitted in rounds from the simplest specifications up and a
+#specification whose parent did not converge is pruned instead of fitted. Each round runs on a process pool
+#that reads the returns from shared memory (see batch.py). All fits hold back the same first rows so the
+#information criteria are computed on the same observations.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import itertools                #Builds the grid of specifications
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd             #Data manipulation external library
+
+from thesis import pipeline, batch
+
+volatility_models = {           #Zoo name -> arch_model arguments
+    'GARCH': {'vol': 'Garch', 'o': 0},
+    'GJR-GARCH': {'vol': 'Garch', 'o': 1},
+    'EGARCH': {'vol': 'EGARCH', 'o': 1},      #With the asymmetric (leverage) term, like GJR-GARCH
+}
+default_grid = {
+    'vol': ['GARCH', 'GJR-GARCH', 'EGARCH'],
+    'p': [1, 2],
+    'q': [1, 2],
+    'dist': ['normal', 't', 'skewt'],
+    'lags': [0, 1],
+}
+
+#-------------------------------------------------------------------
+#Specifications
+
+def specification_name(specification):
+    return (f"{specification['vol']}({specification['p']},{specification['q']}) {specification['dist']}"
+            f"{' AR(' + str(specification['lags']) + ')' if specification['lags'] else ''}")
+
+def specifications(grid=None):  #Every combination of the grid, simplest first
+    grid = {**default_grid, **(grid or {})}
+    unknown = set(grid['vol']) - set(volatility_models)
+    if unknown:
+        raise ValueError(f"Unknown volatility models {sorted(unknown)}, choose from {list(volatility_models)}")
+    keys = ['vol', 'p', 'q', 'dist', 'lags']
+    combinations = [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+    return sorted(combinations, key=_depth)
+
+def _simplifications(specification):    #Candidate parents, nearest first
+    if specification['lags']:
+        yield {**specification, 'lags': specification['lags'] - 1}
+    if specification['dist'] != 'normal':
+        yield {**specification, 'dist': 'normal'}
+    if specification['q'] > 1:
+        yield {**specification, 'q': specification['q'] - 1}
+    if specification['p'] > 1:
+        yield {**specification, 'p': specification['p'] - 1}
+
+def _depth(specification):      #Fitting round of a specification
+    return specification['lags'] + (specification['dist'] != 'normal') + specification['q'] + specification['p']
+
+def parent(specification, available):   #First simplification that is part of the zoo, None for the roots
+    names = {specification_name(candidate) for candidate in available}
+    return next((candidate for candidate in _simplifications(specification) if specification_name(candidate) in names), None)
+
+#-------------------------------------------------------------------
+#Fitting
+
+def _fit(specification, dependent, exogenous, model, frame=None):
+    frame = frame if frame is not None else batch._shared['frame']
+    row = {'Model': specification_name(specification), **specification}
+    arguments = {**model, **volatility_models[specification['vol']], 'p': specification['p'], 'q': specification['q'],
+                 'dist': specification['dist'], 'lags': specification['lags'], 'backend': 'arch'}
+    try:
+        garch_result = pipeline.garch_x(frame[dependent], frame[list(exogenous)], arguments)
+    except Exception as error:  #One failing specification must not stop the rest of the zoo
+        return {**row, 'Status': f"Failed ({error})", 'Converged': False}, None
+    statistics = pipeline.garch_fit_statistics(garch_result)
+    row = {**row, 'Status': 'Fitted' if statistics['Converged'] else 'Not converged', **statistics,
+           'Parameters': len(garch_result.params)}
+    coefficients = pipeline.garch_table(garch_result).rename_axis('Parameter').reset_index()
+    coefficients.insert(0, 'Model', row['Model'])
+    return row, coefficients
+
+def _rounds(zoo, fit_jobs, prune):    #Fits the zoo round by round, pruning children of specifications that did not converge
+    rows, coefficients, converged = [], [], {}
+    for _, specifications_round in itertools.groupby(zoo, key=_depth):
+        jobs = []
+        for specification in specifications_round:
+            ancestor = parent(specification, zoo) if prune else None
+            if ancestor is not None and not converged[specification_name(ancestor)]:
+                converged[specification_name(specification)] = False
+                rows.append({'Model': specification_name(specification), **specification,
+                             'Status': f"Pruned (parent {specification_name(ancestor)} not converged)", 'Converged': False})
+            else:
+                jobs.append(specification)
+        for row, table in fit_jobs(jobs):
+            converged[row['Model']] = bool(row['Converged'])
+            rows.append(row)
+            if table is not None and row['Converged']:
+                coefficients.append(table)
+    return rows, coefficients
+
+#Returns {'Ranking': one row per specification sorted by AIC (unfitted ones last), 'Coefficients': every parameter
+#of every converged specification}. grid overrides entries of default_grid.
+def run_zoo(returns_dataframe, dependent, exogenous, grid=None, model=None, workers=None, prune=True):
+    exogenous = list(exogenous)
+    frame = returns_dataframe[[dependent] + exogenous].dropna()
+    zoo = specifications(grid)
+    model = {**pipeline.default_model, **(model or {}), 'hold_back': max(specification['lags'] for specification in zoo)}
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        rows, coefficients = _rounds(zoo, lambda jobs: [_fit(job, dependent, exogenous, model, frame) for job in jobs], prune)
+    else:
+        with batch.SharedPanel(frame) as panel:
+            with ProcessPoolExecutor(max_workers=workers, initializer=batch._worker_init,
+                                     initargs=(panel.descriptor,)) as pool:
+                rows, coefficients = _rounds(zoo, lambda jobs: list(pool.map(
+                    _fit, jobs, itertools.repeat(dependent), itertools.repeat(exogenous), itertools.repeat(model))), prune)
+
+    ranking = pd.DataFrame(rows).reindex(columns=list(rows[0]) + ['Log-Likelihood', 'AIC', 'BIC', 'No. Observations', 'Parameters'])
+    ranking = ranking.loc[:, ~ranking.columns.duplicated()]
+    for criterion in ('AIC', 'BIC'):
+        ranking[f"{criterion} Rank"] = ranking[criterion].where(ranking['Converged'].astype(bool)).rank(method='min').astype('Int64')
+    return {
+        'Ranking': ranking.sort_values(['AIC Rank', 'BIC Rank'], na_position='last').reset_index(drop=True),
+        'Coefficients': pd.concat(coefficients, ignore_index=True) if coefficients else pd.DataFrame(),
+    }
+
+#Model zoo of the GARCH-X stage of a study file, the study may narrow the grid with a [zoo] table
+def run_study_zoo(study, workers=None, export_results=True):
+    study = pipeline.load_study(study)
+    series = study['series']
+    model = {**pipeline.default_model, **study.get('model', {})}
+    _, results = pipeline.returns_panel(study)
+    tables = run_zoo(
+        results['returns_dataframe'],
+        series[model['dependent']]['name'],
+        [series[key]['name'] for key in model['exogenous']],
+        study.get('zoo'), model, workers,
+    )
+    if export_results and study.get('output'):
+        batch.write_report(tables, os.path.splitext(study['output'])[0] + '_zoo')
+    return tables
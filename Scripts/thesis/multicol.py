@@ -0,0 +1,112 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Multicollinearity diagnostics for any number of candidate regressors
+#The VIF of column i is the i-th diagonal element of the inverse of the (scaled) cross-product matrix of the
+#columns, so every VIF comes out of one k x k decomposition instead of one OLS regression per column.
+#   center=True  - columns are demeaned first, which gives the textbook VIF from the inverse correlation matrix,
+#                  the same numbers as statsmodels' variance_inflation_factor(values, i) (standardize=True)
+#   center=False - columns are only scaled to unit length, the auxiliary regressions have no constant as in
+#                  variance_inflation_factor(values, i, standardize=False) (the default before statsmodels 0.15)
+#The same eigen decomposition gives the condition number, the condition indices and the Belsley variance
+#decomposition proportions. rolling_vif() keeps the cross-product matrix of the window up to date by adding
+#the rows that enter and subtracting the rows that leave, and recomputes it exactly every 'refresh' steps.
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+import pandas as pd             #Data manipulation external library
+
+#-------------------------------------------------------------------
+#Cross-product matrix
+
+def _scaled(cross_product):     #Scales a cross-product matrix to unit diagonal (a correlation matrix when centered)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = 1 / np.sqrt(np.diagonal(cross_product, axis1=-2, axis2=-1))
+    return cross_product * scale[..., :, None] * scale[..., None, :]
+
+def cross_product(values, center=True):
+    values = np.asarray(values, dtype='float64')
+    if center:
+        values = values - values.mean(axis=0)
+    return _scaled(values.T @ values)
+
+def _vif_from_eigen(eigenvalues, eigenvectors):     #diag(C^-1) = sum_j v_ij^2 / lambda_j, infinite for exact collinearity
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverse = np.where(eigenvalues > 1e-12 * eigenvalues.max(axis=-1, keepdims=True), 1 / eigenvalues, np.inf)
+        vifs = (eigenvectors ** 2 @ np.where(np.isinf(inverse), 0.0, inverse)[..., None])[..., 0]
+        collinear = (eigenvectors ** 2 @ np.isinf(inverse)[..., None].astype('float64'))[..., 0] > 1e-12
+    return np.where(collinear, np.inf, vifs)
+
+#-------------------------------------------------------------------
+#Full sample diagnostics
+
+#Same Variable / VIF table as the thesis builds with statsmodels' variance_inflation_factor
+def vif_table(returns_dataframe, center=True):
+    eigenvalues, eigenvectors = np.linalg.eigh(cross_product(returns_dataframe, center))
+    vif_df = pd.DataFrame()
+    vif_df['Variable'] = returns_dataframe.columns
+    vif_df['VIF'] = _vif_from_eigen(eigenvalues, eigenvectors)
+    return vif_df
+
+#Returns {'VIF', 'Eigenvalues' (eigenvalue, condition index and the share of every variable's coefficient
+#variance that belongs to each eigenvalue), 'Condition Number'}
+def diagnostics(returns_dataframe, center=True):
+    eigenvalues, eigenvectors = np.linalg.eigh(cross_product(returns_dataframe, center))
+    eigenvalues, eigenvectors = eigenvalues[::-1], eigenvectors[:, ::-1]    #Largest eigenvalue first
+    eigenvalues = np.maximum(eigenvalues, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        condition_index = np.sqrt(eigenvalues[0] / eigenvalues)
+        phi = eigenvectors ** 2 / eigenvalues
+        proportions = phi / phi.sum(axis=1, keepdims=True)
+    eigen_table = pd.DataFrame(proportions.T, columns=returns_dataframe.columns)
+    eigen_table.insert(0, 'Condition Index', condition_index)
+    eigen_table.insert(0, 'Eigenvalue', eigenvalues)
+    eigen_table.index = pd.RangeIndex(1, len(eigenvalues) + 1, name='Dimension')
+    return {
+        'VIF': vif_table(returns_dataframe, center),
+        'Eigenvalues': eigen_table,
+        'Condition Number': float(condition_index[-1]),
+    }
+
+def condition_number(returns_dataframe, center=True):
+    eigenvalues = np.linalg.eigvalsh(cross_product(returns_dataframe, center))
+    with np.errstate(divide='ignore'):
+        return float(np.sqrt(eigenvalues[-1] / max(eigenvalues[0], 0.0)))
+
+#-------------------------------------------------------------------
+#Rolling window
+
+#VIF of every column over windows of 'window' rows moved 'step' rows at a time, indexed by the last date
+#of every window, plus the condition number of the window in the last column
+def rolling_vif(returns_dataframe, window=250, step=1, center=True, refresh=500, batch=64):
+    values = returns_dataframe.to_numpy(dtype='float64')
+    rows, k = values.shape
+    if window > rows:
+        raise ValueError(f"window of {window} rows is longer than the {rows} rows of data")
+    ends = np.arange(window, rows + 1, step)
+    vifs = np.empty((len(ends), k))
+    conditions = np.empty(len(ends))
+    matrices = np.empty((min(batch, len(ends)), k, k))     #Only one batch of window matrices is kept in memory
+
+    def decompose(first, count):
+        eigenvalues, eigenvectors = np.linalg.eigh(_scaled(matrices[:count]))
+        vifs[first:first + count] = _vif_from_eigen(eigenvalues, eigenvectors)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            conditions[first:first + count] = np.sqrt(eigenvalues[:, -1] / np.maximum(eigenvalues[:, 0], 0.0))
+
+    for position, end in enumerate(ends):
+        if position % refresh == 0:         #Exact recomputation keeps rounding errors of the updates from building up
+            block = values[end - window:end]
+            sums, products = block.sum(axis=0), block.T @ block
+        else:
+            entering, leaving = values[end - step:end], values[end - step - window:end - window]
+            sums = sums + entering.sum(axis=0) - leaving.sum(axis=0)
+            products = products + entering.T @ entering - leaving.T @ leaving
+        matrices[position % len(matrices)] = products - np.outer(sums, sums) / window if center else products
+        if position % len(matrices) == len(matrices) - 1 or position == len(ends) - 1:
+            decompose(position - position % len(matrices), position % len(matrices) + 1)
+    table = pd.DataFrame(vifs, index=returns_dataframe.index[ends - 1], columns=returns_dataframe.columns)
+    table['Condition Number'] = conditions
+    return table
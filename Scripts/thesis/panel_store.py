@@ -0,0 +1,173 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Memory-mapped store for an aligned panel of returns (one column per instrument, one row per date)
+#A store is a folder inside Cache/panels with three files:
+#   dates.i8    - the date index as int64 nanoseconds
+#   values.f8   - float64 matrix stored column after column, every column reserves 'capacity' rows
+#   meta.json   - column names, number of rows in use and the row capacity
+#Frames returned by frame() / column() are views on the memory map, nothing is copied into memory until a
+#stage actually touches the numbers. New instruments are written at the end of values.f8 and new dates
+#fill the reserved rows of every column, so neither rewrites the file; only when the reserved rows run out
+#is the matrix copied once into a file with twice the capacity.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import re                       #Turns study names into folder names
+import json                     #Stores the column names and sizes of a panel
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import paths
+
+minimum_reserve = 256           #Rows reserved after the last date when a store is created or grown
+
+def store_location(name):
+    return os.path.join(paths.cache_directory, 'panels', re.sub(r'[^A-Za-z0-9_.-]+', '_', name))
+
+#-------------------------------------------------------------------
+
+class PanelStore:
+    def __init__(self, location):
+        self.location = location
+        self.meta = None
+        if os.path.exists(self._file('meta.json')):
+            with open(self._file('meta.json')) as meta_file:
+                self.meta = json.load(meta_file)
+
+    def _file(self, file_name):
+        return os.path.join(self.location, file_name)
+
+    def _save_meta(self):       #Written last and atomically, a store is only extended once its data is on disk
+        with open(self._file('meta.json.tmp'), 'w') as meta_file:
+            json.dump(self.meta, meta_file)
+        os.replace(self._file('meta.json.tmp'), self._file('meta.json'))
+
+    @property
+    def exists(self):
+        return self.meta is not None
+
+    @property
+    def columns(self):
+        return list(self.meta['columns'])
+
+    @property
+    def rows(self):
+        return self.meta['rows']
+
+    #---------------------------------------------------------------
+    #Reading
+
+    def _values(self, mode='r'):    #Whole reserved matrix, (capacity, columns) in column order
+        if not self.meta['columns']:
+            return np.empty((self.meta['capacity'], 0))
+        return np.memmap(self._file('values.f8'), dtype='float64', mode=mode,
+                         shape=(self.meta['capacity'], len(self.meta['columns'])), order='F')
+
+    @property
+    def dates(self):
+        if self.rows == 0:
+            return pd.DatetimeIndex([], dtype='datetime64[ns]', name='Date')
+        dates = np.memmap(self._file('dates.i8'), dtype='int64', mode='r', shape=(self.rows,))
+        return pd.DatetimeIndex(dates.view('datetime64[ns]'), name='Date')
+
+    #columns: subset of columns (views on the same memory map), start / end: [start, end) date range
+    def frame(self, columns=None, start=None, end=None):
+        dates = self.dates
+        first = dates.searchsorted(pd.Timestamp(start)) if start is not None else 0
+        last = dates.searchsorted(pd.Timestamp(end)) if end is not None else self.rows
+        values = self._values()[first:last]
+        if columns is None or list(columns) == self.meta['columns']:    #One block over the whole matrix
+            return pd.DataFrame(values[:, :len(self.meta['columns'])], index=dates[first:last], columns=self.columns, copy=False)
+        positions = [self.meta['columns'].index(column) for column in columns]
+        return pd.DataFrame({column: values[:, position] for column, position in zip(columns, positions)},
+                            index=dates[first:last], copy=False)
+
+    def column(self, name):     #Contiguous view of one instrument
+        return pd.Series(self._values()[:self.rows, self.meta['columns'].index(name)], index=self.dates, name=name, copy=False)
+
+    #---------------------------------------------------------------
+    #Writing
+
+    def create(self, frame, reserve=None):
+        os.makedirs(self.location, exist_ok=True)
+        rows = len(frame)
+        capacity = rows + (reserve if reserve is not None else max(rows // 4, minimum_reserve))
+        values = np.full((len(frame.columns), capacity), np.nan)
+        values[:, :rows] = frame.to_numpy(dtype='float64').T
+        values.tofile(self._file('values.f8.tmp'))    #Open views of an older panel keep reading the old files
+        frame.index.to_numpy(dtype='datetime64[ns]').view('int64').tofile(self._file('dates.i8.tmp'))
+        os.replace(self._file('values.f8.tmp'), self._file('values.f8'))
+        os.replace(self._file('dates.i8.tmp'), self._file('dates.i8'))
+        self.meta = {'columns': [str(column) for column in frame.columns], 'rows': rows, 'capacity': capacity}
+        self._save_meta()
+        return self
+
+    def _grow(self, rows_needed):   #Copies the matrix once into a file with room for at least rows_needed rows
+        capacity = max(2 * self.meta['capacity'], rows_needed + minimum_reserve)
+        old_values = self._values()
+        with open(self._file('values.f8.tmp'), 'wb') as values_file:
+            padding = np.full(capacity - self.rows, np.nan)
+            for position in range(len(self.meta['columns'])):
+                np.ascontiguousarray(old_values[:self.rows, position]).tofile(values_file)
+                padding.tofile(values_file)
+        del old_values
+        os.replace(self._file('values.f8.tmp'), self._file('values.f8'))
+        self.meta['capacity'] = capacity
+        self._save_meta()
+
+    #New instruments over the stored dates (dates missing from the frame are NaN), appended to values.f8
+    def append_columns(self, frame):
+        new_columns = [column for column in frame.columns if str(column) not in self.meta['columns']]
+        if not new_columns:
+            return []
+        block = np.full((len(new_columns), self.meta['capacity']), np.nan)
+        block[:, :self.rows] = frame[new_columns].reindex(self.dates).to_numpy(dtype='float64').T
+        with open(self._file('values.f8'), 'r+b') as values_file:     #Written after the last stored column
+            values_file.seek(len(self.meta['columns']) * self.meta['capacity'] * 8)
+            values_file.truncate()
+            block.tofile(values_file)
+        self.meta['columns'] += [str(column) for column in new_columns]
+        self._save_meta()
+        return new_columns
+
+    #New dates after the last stored date, instruments missing from the frame are NaN on those dates
+    def append_rows(self, frame):
+        frame = frame[frame.index > self.dates[-1]] if self.rows else frame
+        if frame.empty:
+            return 0
+        if self.rows + len(frame) > self.meta['capacity']:
+            self._grow(self.rows + len(frame))
+        values = self._values(mode='r+')
+        values[self.rows:self.rows + len(frame)] = frame.reindex(columns=self.meta['columns']).to_numpy(dtype='float64')
+        values.flush()
+        del values
+        with open(self._file('dates.i8'), 'r+b') as dates_file:        #Written after the last stored date
+            dates_file.seek(self.rows * 8)
+            dates_file.truncate()
+            frame.index.to_numpy(dtype='datetime64[ns]').view('int64').tofile(dates_file)
+        self.meta['rows'] += len(frame)
+        self._save_meta()
+        return len(frame)
+
+    #Brings the store up to date with frame: new instruments and new dates are appended, the store is only
+    #rebuilt when stored dates or stored numbers changed. Returns 'created', 'rebuilt', 'appended' or 'unchanged'
+    def update(self, frame):
+        if not self.exists or self.rows == 0:  #An empty store has no last date to compare against
+            self.create(frame)
+            return 'created'
+        stored = self.frame()
+        overlap = frame.reindex(index=stored.index, columns=[column for column in stored.columns if column in frame.columns])
+        history_changed = (
+            not frame.index[frame.index <= stored.index[-1]].equals(stored.index)
+            or not np.array_equal(overlap.to_numpy(dtype='float64'), stored[overlap.columns].to_numpy(), equal_nan=True)
+        )
+        del stored, overlap
+        if history_changed:
+            self.create(frame)
+            return 'rebuilt'
+        added_rows = self.append_rows(frame)
+        added_columns = self.append_columns(frame)
+        return 'appended' if added_rows or added_columns else 'unchanged'
@@ -0,0 +1,16 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#File Hierarchy: Thesis Folder -> Data Folder | Output Folder | Studies Folder | Cache Folder | Scripts Folder (thesis package)
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+
+package_directory = os.path.dirname(os.path.abspath(__file__))
+root_directory = os.path.abspath(os.path.join(package_directory, '..', '..'))
+data_directory = os.path.join(root_directory, 'Data')
+output_directory = os.path.join(root_directory, 'Output')
+studies_directory = os.path.join(root_directory, 'Studies')
+cache_directory = os.environ.get('THESIS_CACHE', os.path.join(root_directory, 'Cache'))
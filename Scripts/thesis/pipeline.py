@@ -0,0 +1,264 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Study pipeline shared by every Thesis script
+#A study is described by a toml (or yaml) file inside the Studies folder and goes through the stages
+#load -> log-return -> align -> describe -> ADF -> VIF -> GARCH-X -> export.
+#Every stage result is memoized by its parameters and the content of its input (see memo.py), in memory and
+#on disk, so study variants and later runs only recompute the stages whose inputs actually changed.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import tomllib                  #Reads study files
+import pandas as pd             #Data manipulation external library
+
+from thesis import paths, sources, returns, calendars, unitroot, multicol, report, panel_store, memo, trace, intraday
+
+default_model = {               #GARCH 1,1 with exogenous variables, as used in the thesis
+    'mean': 'ARX',
+    'vol': 'Garch',
+    'p': 1,
+    'q': 1,
+    'scale': 100,               #Both dependent and independent variables are scaled to avoid convergence
+}
+
+#-------------------------------------------------------------------
+#Study files
+
+#Accepts a path to a .toml/.yaml study file or an already parsed dictionary, series given as source = "<name>"
+#take their name from the data-source registry unless they set one. 'study_file' keeps the file name (no extension)
+def load_study(study):
+    if isinstance(study, str):
+        location = study
+        if location.endswith(('.yaml', '.yml')):
+            import yaml         #Only needed for yaml study files
+            with open(location) as study_file:
+                study = yaml.safe_load(study_file)
+        else:
+            with open(location, 'rb') as study_file:
+                study = tomllib.load(study_file)
+        study.setdefault('study_file', os.path.splitext(os.path.basename(location))[0])
+    if any('name' not in entry for entry in study.get('series', {}).values()):
+        study = {**study, 'series': sources.named(study['series'])}
+    return study
+
+def study_location(name):       #Resolves 'thesis_20_23' to Studies/thesis_20_23.toml
+    if os.path.exists(name):
+        return name
+    return os.path.join(paths.studies_directory, name + '.toml')
+
+#-------------------------------------------------------------------
+#Stage cache
+
+def _stage(name, params, parent_key, compute):    #Returns (content key of the result, result)
+    computed = []
+    with trace.span(f"stage {name}") as record:
+        key, result = memo.memoize(name, params, parent_key, lambda: computed.append(True) or compute())
+        record['cached'] = not computed
+        record['rows out'] = trace.rows(result)
+    return key, result
+
+def clear_cache(stage=None, disk=False):    #Forgets the results of one stage (all by default), disk=True also removes them from Cache/stages
+    return memo.invalidate(stage, disk=disk)
+
+#-------------------------------------------------------------------
+#Stages
+
+#Reads every series of the study through the data-source registry (see sources.py): 'csv' entries from the
+#Data folder ('csv' is one file name or a list of files covering consecutive periods), 'ticker' entries from
+#yahoo finance, 'parquet' and 'fake' entries and 'source' references to Studies/sources.toml
+def load_prices(series, period, interval='1d'):
+    return sources.fetch_series(series, period['start'], period['end'], interval)
+
+#Daily logarithmic returns of every series in one pass over the wide price matrix, a series that did
+#not trade on a date has no return on that date and its next return is taken against its last price
+@trace.traced('log_returns')
+def log_returns(prices):
+    return returns.compute_returns(pd.concat(list(prices.values()), axis=1, sort=True), kind='log', gaps='previous')
+
+#Keeps only the dates where every series has a return
+#(dropna=False keeps every date so series covering different periods can share one frame)
+@trace.traced('concat/dropna')
+def align(returns_dataframe, period=None, dropna=True):
+    if dropna:
+        returns_dataframe = returns_dataframe.dropna()
+    if period:
+        returns_dataframe = returns_dataframe[
+            (returns_dataframe.index >= pd.Timestamp(period['start'])) & (returns_dataframe.index < pd.Timestamp(period['end']))
+        ]
+    return returns_dataframe
+
+#[align] table of a study: policy ('inner', 'ffill' or 'close'), anchor (series key) and limit (days), the
+#'close' and 'timezone' of every series are used by the 'close' policy. Returns (aligned returns, rows report)
+@trace.traced('align_calendars')
+def align_calendars(prices, series, alignment, period=None, dropna=True):
+    sessions = {key: {option: entry[option] for option in ('close', 'timezone') if option in entry} for key, entry in series.items()}
+    returns_dataframe, rows_report = calendars.align_returns(
+        prices, alignment.get('policy', 'inner'), alignment.get('anchor'), alignment.get('limit'), sessions)
+    returns_dataframe = align(returns_dataframe, period, dropna)
+    return returns_dataframe, {**rows_report, 'rows in period': len(returns_dataframe)}
+
+@trace.traced('describe')
+def describe(returns_dataframe):
+    raw_summary = returns_dataframe.describe()
+    return raw_summary.loc[['min', 'max', 'mean', 'std']].transpose()
+
+def is_stationary(pval, sig_lvl=0.05):      #Check if data point is stationary or not (stationary if p-value < 0.05)
+    return "Stationary" if pval<sig_lvl else "Non-stationary"
+
+@trace.traced('adf')
+def adf_test(returns_dataframe, trend='c'):   #Augmented Dickey-Fuller Test on every column at once, same numbers as arch's ADF
+    return unitroot.stationarity_table(returns_dataframe, 'adf', trend)
+
+@trace.traced('vif')
+def vif(returns_dataframe):     #Every VIF from one decomposition of the correlation matrix instead of one regression per column
+    return multicol.vif_table(returns_dataframe)
+
+#starting_values (e.g. the params of a previous fit) warm-starts the optimizer
+#model['backend'] = 'kernel' fits GARCH(1,1) ARX with the specialised garch_kernel backend instead of arch
+def garch11_x(model):           #GARCH(1,1)-X with normal errors, the only model of garch_kernel and of the bootstrap simulator
+    return (model['mean'], model['vol'], model['p'], model['q'], model.get('o', 0), model.get('dist', 'normal')) == \
+        ('ARX', 'Garch', 1, 1, 0, 'normal') and not model.get('lags')
+
+def garch_x(dependent_variable, independent_variable, model=None, starting_values=None):
+    model = {**default_model, **(model or {})}
+    if model.get('backend', 'arch') == 'kernel':
+        if not garch11_x(model):
+            raise ValueError("The kernel backend only fits mean='ARX' (no lags), vol='Garch', p=1, q=1 with normal errors")
+        from thesis import garch_kernel
+        with trace.span('garch fit', len(dependent_variable), backend='kernel') as record:
+            garch_result = garch_kernel.fit(dependent_variable*model['scale'], independent_variable*model['scale'], starting_values)
+            record['iterations'] = garch_result.optimization_result.nit
+        return garch_result
+    from arch import arch_model     #GARCH model
+    with trace.span('garch fit', len(dependent_variable), backend='arch', vol=model['vol']) as record:
+        garch_model = arch_model(
+            dependent_variable*model['scale'],
+            x=independent_variable*model['scale'],
+            mean=model['mean'],
+            lags=model.get('lags', 0),
+            vol=model['vol'],
+            p=model['p'],
+            o=model.get('o', 0),
+            q=model['q'],
+            dist=model.get('dist', 'normal'),
+            hold_back=model.get('hold_back'),
+        )
+        garch_result = garch_model.fit(disp='off', starting_values=starting_values)
+        record['iterations'] = garch_result.optimization_result.nit
+        record['rows out'] = garch_result.nobs
+    return garch_result
+
+def garch_table(garch_result):  #Coefficient table of the 'Mean Model' and 'Volatility Model' sections of summary()
+    return pd.DataFrame({
+        'coef': garch_result.params,
+        'std err': garch_result.std_err,
+        't': garch_result.tvalues,
+        'P>|t|': garch_result.pvalues,
+    })
+
+def garch_fit_statistics(garch_result):
+    return {
+        'Log-Likelihood': garch_result.loglikelihood,
+        'AIC': garch_result.aic,
+        'BIC': garch_result.bic,
+        'No. Observations': garch_result.nobs,
+        'Converged': garch_result.convergence_flag == 0,
+    }
+
+#Yields (sheet name, table, write the index) of every stage result of a run, in workbook order
+def report_tables(results):
+    yield "Descriptive", results['descriptive'], True
+    if results.get('adf') is not None:
+        yield "ADF Results", results['adf'], True
+    if results.get('vif') is not None:
+        yield "VIF", results['vif'], False
+    if results.get('garch') is not None:
+        yield "GARCH", garch_table(results['garch']), True
+        yield "GARCH Fit", pd.DataFrame([garch_fit_statistics(results['garch'])]), False
+        yield "GARCH Summary", report.text_table(results['garch'].summary()), False
+    if results.get('alignment') is not None:
+        yield "Alignment", pd.DataFrame([results['alignment']]), False
+    for key, realized in results.get('realized', {}).items():
+        yield f"Realized {key}", realized, True
+    yield "Returns", results['returns_dataframe'], True
+
+#Streams every stage result of a run into one workbook (plus its parquet twin), errors are raised
+def export(results, output_location):
+    with report.ReportWriter(output_location) as writer:
+        for sheet_name, table, index in report_tables(results):
+            writer.add(sheet_name, table, index=index)
+    print(f"[*] Study Report Generated at: {os.path.relpath(writer.workbook_location, paths.root_directory)}")
+    return writer.sheets
+
+#-------------------------------------------------------------------
+#Runs every stage of one study and returns a dictionary with the result of each stage
+
+#Re-reads the prices only when a file, the registry entry, the backend actually serving a series (THESIS_SOURCES)
+#or the offline mode of yahoo finance changed since the last run
+def _source_versions(series):
+    return sources.versions(series)
+
+def _intraday_versions(entries):    #Re-aggregates an intraday file only when its contents changed
+    return {key: memo.file_key(entry['file'] if os.path.exists(entry['file']) else os.path.join(paths.data_directory, entry['file']))
+            for key, entry in entries.items()}
+
+#Runs the load -> log-return -> align stages and returns (stage key, stage results)
+def returns_panel(study, dropna=True):
+    study = load_study(study)
+    series = study['series']
+    period = study['period']
+    interval = study.get('interval', '1d')
+    results = {}
+    prices_key, results['prices'] = _stage('load', [series, period, interval, _source_versions(series)], None,
+                                           lambda: load_prices(series, period, interval))
+    returns_key, results['returns'] = _stage('log_returns', None, prices_key,
+                                             lambda: log_returns(results['prices']))
+    if study.get('align'):      #Calendar-aware alignment of the prices instead of dropping every date one market was closed
+        aligned_key, (results['returns_dataframe'], results['alignment']) = _stage(
+            'align_calendars', [period, dropna, study['align'], series], prices_key,
+            lambda: align_calendars(results['prices'], series, study['align'], period, dropna))
+    else:
+        aligned_key, results['returns_dataframe'] = _stage('align', [period, dropna], returns_key,
+                                                           lambda: align(results['returns'], period, dropna))
+    if study.get('intraday'):   #Realized measures of intraday files (see intraday.py), lagged one day, as extra columns
+        entries = study['intraday']
+        realized_key, results['realized'] = _stage('intraday', [entries, _intraday_versions(entries)], None,
+                                                   lambda: intraday.study_realized(entries))
+        aligned_key, results['returns_dataframe'] = _stage(
+            'join_realized', [entries, dropna, realized_key], aligned_key,
+            lambda: intraday.join_realized(results['returns_dataframe'], results['realized'], entries, dropna))
+    if study.get('store'):      #store = true (or a store name) keeps the panel in Cache/panels and reads memory-mapped views of it
+        store_name = study['store'] if isinstance(study['store'], str) else study.get('study_file', study['name'])
+        store = panel_store.PanelStore(panel_store.store_location(store_name))
+        store.update(results['returns_dataframe'])
+        results['returns_dataframe'] = store.frame(results['returns_dataframe'].columns)
+    return aligned_key, results
+
+def run_study(study, export_results=True):   #THESIS_TRACE=1 writes a timing / memory trace of the run (see trace.py)
+    study = load_study(study)
+    with trace.session(study.get('name', 'study')):
+        return _run_study(study, export_results)
+
+def _run_study(study, export_results):
+    series = {**study['series'], **study.get('intraday', {})}     #Realized measures can be exogenous variables too
+    model = {**default_model, **study.get('model', {})}
+    stages = {'adf': True, 'vif': False, 'garch': True, **study.get('stages', {})}
+    aligned_key, results = returns_panel(study)
+    results['study'] = study
+    returns_dataframe = results['returns_dataframe']
+    _, results['descriptive'] = _stage('describe', None, aligned_key, lambda: describe(returns_dataframe))
+    if stages['adf']:
+        _, results['adf'] = _stage('adf', None, aligned_key, lambda: adf_test(returns_dataframe))
+    if stages['vif']:
+        _, results['vif'] = _stage('vif', None, aligned_key, lambda: vif(returns_dataframe))
+    if stages['garch']:
+        dependent_variable = returns_dataframe[series[model['dependent']]['name']]
+        independent_variable = returns_dataframe[[series[key]['name'] for key in model['exogenous']]]
+        _, results['garch'] = _stage('garch', model, aligned_key,
+                                     lambda: garch_x(dependent_variable, independent_variable, model))
+    if export_results and study.get('output'):
+        export(results, os.path.join(paths.output_directory, study['output']))
+    return results
@@ -0,0 +1,168 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#On-disk price cache placed in front of every yahoo finance download
+#Bars are stored per ticker and interval as parquet files inside the Cache folder, next to a small
+#json file listing the date ranges that were already requested. Only the missing dates are downloaded,
+#so re-running a study only reads the local parquet file.
+#Offline mode (THESIS_OFFLINE=1 or price_cache.offline = True) never touches the network and fills
+#missing dates from the local source registered for the ticker instead (Studies/sources.toml, see sources.py).
+#A stand-in that does not cover the requested dates raises a LookupError instead of serving a shorter series.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import json                     #Stores the list of cached date ranges
+import threading                #One lock per cache file so concurrent downloads do not corrupt it
+import pandas as pd             #Data manipulation external library
+
+from thesis import paths
+
+offline = os.environ.get('THESIS_OFFLINE', '') not in ('', '0')
+offline_sources = {             #Registered local source used as a stand-in for each yahoo finance ticker when offline
+    'BZ=F': 'brent',
+    'MTFZ24.NYM': 'api2',
+    'NG=F': 'lng_gas',
+}
+coverage_slack = pd.Timedelta(days=7)     #Days a stand-in may start late or end early (weekends, holidays)
+price_columns = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+_locks = {}
+_locks_guard = threading.Lock()
+
+#-------------------------------------------------------------------
+#Date range bookkeeping (every range is [start, end) just like yahoo finance)
+
+def _to_timestamp(value):
+    return pd.Timestamp(value).tz_localize(None).normalize()
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def missing_ranges(covered, start, end):        #Parts of [start, end) that are not inside any covered range
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in _merge_ranges(covered):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+#-------------------------------------------------------------------
+#Cache files
+
+def _cache_key(ticker, interval):
+    safe_ticker = ''.join(character if character.isalnum() else '_' for character in ticker)
+    return f"{safe_ticker}_{interval}"
+
+def _lock_for(key):
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+def _read_cache(key):
+    bars_location = os.path.join(paths.cache_directory, key + '.parquet')
+    ranges_location = os.path.join(paths.cache_directory, key + '.json')
+    if not (os.path.exists(bars_location) and os.path.exists(ranges_location)):
+        return None, []
+    with open(ranges_location) as ranges_file:
+        covered = [[_to_timestamp(start), _to_timestamp(end)] for start, end in json.load(ranges_file)['ranges']]
+    return pd.read_parquet(bars_location), covered
+
+def _write_cache(key, bars, covered):
+    os.makedirs(paths.cache_directory, exist_ok=True)
+    bars_location = os.path.join(paths.cache_directory, key + '.parquet')
+    ranges_location = os.path.join(paths.cache_directory, key + '.json')
+    bars.to_parquet(bars_location + '.tmp')     #Write to a temporary file first so a crash never leaves half a cache
+    os.replace(bars_location + '.tmp', bars_location)
+    with open(ranges_location + '.tmp', 'w') as ranges_file:
+        json.dump({'ranges': [[str(start.date()), str(end.date())] for start, end in _merge_ranges(covered)]}, ranges_file)
+    os.replace(ranges_location + '.tmp', ranges_location)
+
+def clear(ticker=None, interval='1d'):          #Deletes the cache of one ticker, or of every ticker when none is given
+    if not os.path.isdir(paths.cache_directory):
+        return
+    prefix = _cache_key(ticker, interval) if ticker else ''
+    for file_name in os.listdir(paths.cache_directory):
+        if file_name.startswith(prefix) and file_name.endswith(('.parquet', '.json')):
+            os.remove(os.path.join(paths.cache_directory, file_name))
+
+#-------------------------------------------------------------------
+#Price sources (yahoo finance or local csv files)
+
+def _empty_bars():
+    return pd.DataFrame(columns=price_columns, index=pd.DatetimeIndex([], name='Date'), dtype='float64')
+
+def _normalise_bars(bars):
+    if isinstance(bars.columns, pd.MultiIndex):  #Newer yfinance versions return (Price, Ticker) columns even for one ticker
+        bars.columns = bars.columns.get_level_values(0)
+    bars.index = pd.DatetimeIndex(bars.index).tz_localize(None)
+    bars.index.name = 'Date'
+    return bars[[column for column in price_columns if column in bars.columns]].astype('float64')
+
+def _fetch_remote(ticker, start, end, interval):
+    import yfinance             #API call to yahoo finance for financial data, only needed when the cache misses
+    bars = yfinance.download(
+        ticker,
+        start=start.strftime('%Y-%m-%d'),
+        end=end.strftime('%Y-%m-%d'),
+        interval=interval,
+        auto_adjust=False,      #Keep the 'Adj Close' column used by the thesis scripts
+        progress=False,
+    )
+    return _normalise_bars(bars)
+
+def _fetch_offline(ticker, start, end, interval):
+    if ticker not in offline_sources or interval != '1d':
+        raise LookupError(f"No offline stand-in for {ticker} ({interval}): add it to price_cache.offline_sources "
+                          "or give the series a csv source")
+    from thesis import sources  #Imported here, the yahoo backend of sources goes through this module
+    prices = sources.fetch_source(offline_sources[ticker], start, end, interval)
+    prices = prices[(prices.index >= start) & (prices.index < end)].rename(None)
+    edges = [(start, prices.index.min()), (prices.index.max() + pd.Timedelta(days=1), end)] if len(prices) else [(start, end)]
+    uncovered = [(gap_start, gap_end) for gap_start, gap_end in edges if gap_end - gap_start > coverage_slack]
+    if uncovered:
+        raise LookupError(f"Offline stand-in {offline_sources[ticker]!r} of {ticker} has no prices "
+                          + ' and '.join(f"from {gap_start.date()} to {(gap_end - pd.Timedelta(days=1)).date()}"
+                                         for gap_start, gap_end in uncovered))
+    bars = pd.DataFrame({'Close': prices, 'Adj Close': prices})     #Local files only hold one closing price
+    bars.index.name = 'Date'
+    return bars
+
+#-------------------------------------------------------------------
+#Drop-in replacement for yfinance.download(ticker, start, end, interval) used by the thesis scripts
+
+def download(ticker, start, end, interval='1d', offline_mode=None):
+    offline_mode = offline if offline_mode is None else offline_mode
+    start, end = _to_timestamp(start), _to_timestamp(end)
+    key = _cache_key(ticker, interval)
+    with _lock_for(key):
+        bars, covered = _read_cache(key)
+        gaps = missing_ranges(covered, start, end)
+        fetched = []
+        if offline_mode:
+            if gaps:            #Offline data is served but never stored, so the cache only ever holds real downloads
+                fetched = [_fetch_offline(ticker, gap_start, gap_end, interval) for gap_start, gap_end in gaps]
+        elif gaps:
+            fetched = [_fetch_remote(ticker, gap_start, gap_end, interval) for gap_start, gap_end in gaps]
+            stored = pd.concat([frame for frame in [bars] + fetched if frame is not None] or [_empty_bars()])
+            stored = stored[~stored.index.duplicated(keep='last')].sort_index()
+            _write_cache(key, stored, covered + [[gap_start, gap_end] for gap_start, gap_end in gaps])
+            bars, fetched = stored, []
+    frames = [frame for frame in [bars] + fetched if frame is not None and len(frame)]
+    if not frames:
+        return _empty_bars()
+    result = pd.concat(frames)
+    result = result[~result.index.duplicated(keep='first')].sort_index()
+    return result[(result.index >= start) & (result.index < end)]
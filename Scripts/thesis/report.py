@@ -0,0 +1,214 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Streaming report writer, one per run
+#Every table added to a ReportWriter is written row by row into a write-only workbook straight away
+#(xlsxwriter in constant_memory mode when it is installed, otherwise openpyxl's write_only workbook) and
+#saved as a parquet file next to it, so a run can export hundreds of sheets while only one table is held
+#in memory at a time. The workbook is written to a temporary file and the parquet files to a temporary folder,
+#both replace the previous report only when the run finishes (so sheets a run no longer writes disappear), errors
+#are raised instead of printed so a failed export is never mistaken for a finished one.
+#   Output/<name>.xlsx            - one sheet per table
+#   Output/<name>/<sheet>.parquet - the same tables for machine consumption
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import re                       #Cleans sheet names
+import shutil                   #Swaps and removes parquet folders
+import datetime                 #Excel cells hold plain datetime objects
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import paths, trace
+
+sheet_name_length = 31          #Longest sheet name Excel accepts
+
+#-------------------------------------------------------------------
+#Cells
+
+def _cell(value):               #Converts a pandas / numpy value into something both engines can write
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or value is pd.NaT or (isinstance(value, float) and not np.isfinite(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.tz_localize(None).to_pydatetime() if value.tzinfo else value.to_pydatetime()
+    if isinstance(value, (bool, int, float, str, datetime.datetime, datetime.date)):
+        return value
+    return str(value)
+
+def _label(value):              #Column / index names, tuples of a MultiIndex are joined
+    return ' '.join(str(part) for part in value) if isinstance(value, tuple) else ('' if value is None else str(value))
+
+def _rows(table, index):        #Header row followed by one list per table row, produced lazily
+    index_names = [_label(name) for name in table.index.names] if index else []
+    yield index_names + [_label(column) for column in table.columns]
+    labels = table.index if index else [()] * len(table)
+    for label, row in zip(labels, table.itertuples(index=False, name=None)):
+        label = label if isinstance(label, tuple) else (label,)
+        yield [_cell(value) for value in label + row]
+
+#-------------------------------------------------------------------
+#Workbook engines
+
+class _XlsxWriterBook:          #xlsxwriter keeps only the current row in memory with constant_memory
+    def __init__(self, location):
+        import xlsxwriter
+        self.book = xlsxwriter.Workbook(location, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd'})
+
+    def write(self, sheet_name, rows):
+        sheet = self.book.add_worksheet(sheet_name)
+        for row_number, row in enumerate(rows):
+            sheet.write_row(row_number, 0, row)
+
+    def close(self):
+        self.book.close()
+
+class _OpenpyxlBook:            #openpyxl's write-only workbook streams every sheet into a temporary file
+    def __init__(self, location):
+        from openpyxl import Workbook
+        self.location = location
+        self.book = Workbook(write_only=True)
+
+    def write(self, sheet_name, rows):
+        sheet = self.book.create_sheet(title=sheet_name)
+        for row in rows:
+            sheet.append(row)
+
+    def close(self):
+        self.book.save(self.location)
+
+def _engine(engine):
+    if engine is None:          #xlsxwriter is faster and lighter, openpyxl is the fallback installed with pandas
+        try:
+            import xlsxwriter
+            engine = 'xlsxwriter'
+        except ImportError:
+            engine = 'openpyxl'
+    return {'xlsxwriter': _XlsxWriterBook, 'openpyxl': _OpenpyxlBook}[engine]
+
+#-------------------------------------------------------------------
+
+#workbook_location: path of the .xlsx file (a bare name is placed inside the Output folder)
+#parquet=None writes the parquet twin whenever pyarrow is installed
+class ReportWriter:
+    def __init__(self, workbook_location, parquet=None, engine=None):
+        if not os.path.dirname(workbook_location):
+            workbook_location = os.path.join(paths.output_directory, workbook_location)
+        if not workbook_location.endswith('.xlsx'):
+            workbook_location += '.xlsx'
+        if parquet is None:
+            try:
+                import pyarrow
+                parquet = True
+            except ImportError:
+                parquet = False
+        self.workbook_location = workbook_location
+        self.parquet_directory = os.path.splitext(workbook_location)[0] if parquet else None
+        self.sheets = []
+        os.makedirs(os.path.dirname(workbook_location), exist_ok=True)
+        self._temporary_directory = self.parquet_directory + '.tmp' if parquet else None
+        if self._temporary_directory:
+            shutil.rmtree(self._temporary_directory, ignore_errors=True)    #Left behind by a run that was killed
+            os.makedirs(self._temporary_directory)
+        self._temporary_location = workbook_location + '.tmp'
+        self._book = _engine(engine)(self._temporary_location)
+        self._previous = None   #Report being replaced, opened by the first keep()
+
+    def _sheet_name(self, sheet_name):  #Valid and unique Excel sheet name
+        sheet_name = re.sub(r'[\[\]:*?/\\]', '_', str(sheet_name))[:sheet_name_length] or 'Sheet'
+        candidate, number = sheet_name, 1
+        while candidate.lower() in (name.lower() for name in self.sheets):
+            number += 1
+            suffix = f" ({number})"
+            candidate = sheet_name[:sheet_name_length - len(suffix)] + suffix
+        self.sheets.append(candidate)
+        return candidate
+
+    def add(self, sheet_name, table, index=True):
+        table = table.to_frame() if isinstance(table, pd.Series) else pd.DataFrame(table)
+        sheet_name = self._sheet_name(sheet_name)
+        with trace.span('excel write', len(table), sheet=sheet_name):
+            self._book.write(sheet_name, _rows(table, index))
+            if self.parquet_directory:
+                twin = table.copy(deep=False)
+                twin.columns = [_label(column) for column in twin.columns]
+                twin.to_parquet(os.path.join(self._temporary_directory, sheet_name + '.parquet'), index=index)
+        return sheet_name
+
+    def add_text(self, sheet_name, text):   #Text such as a model summary, one line per row
+        return self.add(sheet_name, text_table(text), index=False)
+
+    #Copies a sheet of the report being replaced (and its parquet file) instead of writing the table again,
+    #returns None when that report does not hold the sheet
+    def keep(self, sheet_name):
+        if self._previous is None:
+            if not os.path.exists(self.workbook_location):
+                return None
+            from openpyxl import load_workbook  #Reads the previous workbook row by row
+            self._previous = load_workbook(self.workbook_location, read_only=True)
+        twin = os.path.join(self.parquet_directory, sheet_name + '.parquet') if self.parquet_directory else None
+        if sheet_name not in self._previous.sheetnames or (twin and not os.path.exists(twin)):
+            return None
+        rows = self._previous[sheet_name].iter_rows(values_only=True)
+        sheet_name = self._sheet_name(sheet_name)
+        with trace.span('excel copy', sheet=sheet_name):
+            self._book.write(sheet_name, (list(row) for row in rows))
+            if twin:
+                copy = os.path.join(self._temporary_directory, sheet_name + '.parquet')
+                try:
+                    os.link(twin, copy)
+                except OSError:     #File systems without hard links
+                    shutil.copy2(twin, copy)
+        return sheet_name
+
+    def _close_previous(self):
+        if self._previous is not None:
+            self._previous.close()
+            self._previous = None
+
+    def close(self):
+        with trace.span('excel save', sheets=len(self.sheets)):
+            self._book.close()
+        self._close_previous()
+        os.replace(self._temporary_location, self.workbook_location)
+        if self._temporary_directory:   #The previous folder is moved aside first, a folder cannot be replaced in one step
+            previous = self.parquet_directory + '.old'
+            shutil.rmtree(previous, ignore_errors=True)
+            if os.path.exists(self.parquet_directory):
+                os.replace(self.parquet_directory, previous)
+            os.replace(self._temporary_directory, self.parquet_directory)
+            shutil.rmtree(previous, ignore_errors=True)
+
+    def discard(self):
+        try:
+            self._close_previous()
+            self._book.close()
+        finally:
+            if os.path.exists(self._temporary_location):
+                os.remove(self._temporary_location)
+            if self._temporary_directory:
+                shutil.rmtree(self._temporary_directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        if error_type is None:
+            self.close()
+        else:                   #The previous report is left as it was and the error is raised
+            self.discard()
+        return False
+
+#-------------------------------------------------------------------
+
+def text_table(text):           #One row per line of a text such as a model summary
+    return pd.DataFrame({'line': str(text).splitlines()})
+
+def debug_csv(table, file_name):    #Debug dumps go to Output/debug instead of the working directory
+    location = os.path.join(paths.output_directory, 'debug', file_name)
+    os.makedirs(os.path.dirname(location), exist_ok=True)
+    table.to_csv(location)
+    return location
@@ -0,0 +1,66 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Vectorized return engine for a wide price matrix (one column per instrument, any number of columns)
+#All returns are computed in one numpy pass over the whole matrix instead of one Series per instrument.
+#Missing prices (market holidays, instruments listed later) are handled explicitly through 'gaps':
+#   'previous' - return against the last available price of that instrument, NaN on the missing day itself
+#                (same numbers as np.log(x / x.shift(1)) on every series after its own dropna())
+#   'ffill'    - the missing price is carried forward, so the missing day gets a return of 0
+#   'keep'     - NaN on the missing day and on the day after it
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+kinds = ('log', 'simple', 'excess')
+gap_policies = ('previous', 'ffill', 'keep')
+
+#-------------------------------------------------------------------
+
+def _previous_prices(values, gaps):     #Price every return is measured against, NaN where there is none
+    previous = np.full_like(values, np.nan)
+    if gaps == 'keep':
+        previous[1:] = values[:-1]
+        return previous
+    rows = np.arange(values.shape[0])[:, None]
+    last_valid = np.where(np.isnan(values), -1, rows)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)   #Row of the last valid price at or before every row
+    columns = np.arange(values.shape[1])
+    previous[1:] = np.where(last_valid[:-1] >= 0, values[np.maximum(last_valid[:-1], 0), columns], np.nan)
+    return previous
+
+#prices: DataFrame (rows = dates) or 2-D array, risk_free: per-period rate (scalar, Series or array) for 'excess'
+def compute_returns(prices, kind='log', gaps='previous', risk_free=0.0, dtype='float64', drop_first=True):
+    if kind not in kinds:
+        raise ValueError(f"kind must be one of {kinds}, got {kind!r}")
+    if gaps not in gap_policies:
+        raise ValueError(f"gaps must be one of {gap_policies}, got {gaps!r}")
+    frame = prices if isinstance(prices, pd.DataFrame) else None
+    values = np.asarray(prices, dtype='float64')
+    if values.ndim == 1:
+        values = values[:, None]
+    previous = _previous_prices(values, gaps)
+    if gaps == 'ffill':
+        values = np.where(np.isnan(values), previous, values)
+    returns = np.empty(values.shape, dtype=dtype)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(values, previous, out=returns, casting='same_kind')
+        if kind == 'log':
+            returns[returns <= 0] = np.nan              #Log of a non-positive price ratio is undefined
+            np.log(returns, out=returns)
+        else:
+            returns -= 1
+            if kind == 'excess':
+                if isinstance(risk_free, pd.Series):    #Aligned on the dates of the prices
+                    if not isinstance(prices, (pd.Series, pd.DataFrame)):
+                        raise TypeError("risk_free is a Series, so prices must be a DataFrame or Series with a date index "
+                                        "(or pass risk_free as an array with one rate per row)")
+                    risk_free = risk_free.reindex(prices.index).to_numpy()
+                returns -= np.asarray(risk_free, dtype=dtype).reshape(-1, 1) if np.ndim(risk_free) else risk_free
+    start = 1 if drop_first else 0
+    if frame is None:
+        return returns[start:]
+    return pd.DataFrame(returns[start:], index=frame.index[start:], columns=frame.columns, copy=False)
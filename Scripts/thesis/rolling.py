@@ -0,0 +1,119 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Rolling-window and expanding-window GARCH-X estimation
+#Every window is fitted starting from the parameters of the previous window, since neighbouring windows share
+#almost all of their observations. A warm start can stop in a worse local optimum than the default start, so a
+#window is fitted again from the default start when the warm fit fails, does not converge or its mean
+#log-likelihood per observation drops by more than 'refit_drop' from the previous window; the better of the
+#two fits is kept and 'Iterations' counts the fits that ran. The windows are split into contiguous chunks
+#that run on separate processes (reading the returns from shared memory, see batch.py); only the first window
+#of every chunk starts cold.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import pipeline, batch
+
+refit_drop = 0.05               #Drop of the mean log-likelihood per observation that makes a window refit cold
+
+#-------------------------------------------------------------------
+
+#(first row, last row + 1) of every window, rolling windows keep a fixed length, expanding windows keep row 0
+def window_bounds(observations, window, step=1, expanding=False):
+    return [(0 if expanding else end - window, end) for end in range(window, observations + 1, step)]
+
+def _mean_loglikelihood(garch_result):
+    return garch_result.loglikelihood / garch_result.nobs
+
+#Returns (fit, iterations of every fit that ran, refitted cold). The warm-started fit is kept unless it failed,
+#did not converge or fell well below the previous window, then the fit from the default start is run as well
+def _fit_window(sample, dependent, exogenous, model, starting_values, previous=None):
+    warm_result = None
+    if starting_values is not None:
+        try:
+            warm_result = pipeline.garch_x(sample[dependent], sample[exogenous], model, starting_values)
+        except Exception:
+            warm_result = None
+        if warm_result is not None and warm_result.convergence_flag == 0 and \
+                (previous is None or _mean_loglikelihood(warm_result) >= previous - refit_drop):
+            return warm_result, warm_result.optimization_result.nit, False
+    cold_result = pipeline.garch_x(sample[dependent], sample[exogenous], model)
+    iterations = cold_result.optimization_result.nit + (warm_result.optimization_result.nit if warm_result is not None else 0)
+    if warm_result is not None and warm_result.loglikelihood > cold_result.loglikelihood:
+        return warm_result, iterations, True
+    return cold_result, iterations, starting_values is not None
+
+def _fit_chunk(frame, bounds, dependent, exogenous, model):
+    rows = []
+    starting_values, previous = None, None
+    for start, end in bounds:
+        sample = frame.iloc[start:end]
+        try:
+            garch_result, iterations, refitted = _fit_window(sample, dependent, exogenous, model, starting_values, previous)
+        except Exception:       #A window that cannot be fitted is reported as missing and the next one starts cold
+            starting_values, previous = None, None
+            rows.append({'Date': frame.index[end - 1], 'Observations': end - start})
+            continue
+        converged = garch_result.convergence_flag == 0
+        starting_values = garch_result.params.values if converged else None
+        previous = _mean_loglikelihood(garch_result) if converged else None
+        rows.append({
+            'Date': frame.index[end - 1],
+            'Observations': end - start,
+            'Iterations': iterations,
+            'Cold Refit': refitted,
+            'Converged': converged,
+            **{name: value for name, value in garch_result.params.items()},
+            **{f"{name} p-value": value for name, value in garch_result.pvalues.items()},
+        })
+    return rows
+
+def _pool_chunk(bounds, dependent, exogenous, model):
+    return _fit_chunk(batch._shared['frame'], bounds, dependent, exogenous, model)
+
+#Returns {'Coefficients', 'P-values', 'Diagnostics'}, each indexed by the last date of every window
+def rolling_garch_x(returns_dataframe, dependent, exogenous, window=500, step=1, expanding=False, model=None,
+                    chunks=None, workers=None):
+    exogenous = list(exogenous)
+    frame = returns_dataframe[[dependent] + exogenous].dropna()
+    bounds = window_bounds(len(frame), window, step, expanding)
+    if not bounds:
+        raise ValueError(f"A window of {window} rows does not fit in the {len(frame)} aligned observations of {dependent}")
+    workers = workers or os.cpu_count()
+    chunks = max(1, min(chunks or workers, len(bounds)))
+    chunk_bounds = [list(part) for part in np.array_split(np.array(bounds, dtype='int64').reshape(-1, 2), chunks)]
+    if workers == 1 or chunks == 1:
+        outcomes = [_fit_chunk(frame, part, dependent, exogenous, model) for part in chunk_bounds]
+    else:
+        with batch.SharedPanel(frame) as panel:
+            with ProcessPoolExecutor(max_workers=workers, initializer=batch._worker_init,
+                                     initargs=(panel.descriptor,)) as pool:
+                futures = [pool.submit(_pool_chunk, part, dependent, exogenous, model) for part in chunk_bounds]
+                outcomes = [future.result() for future in futures]
+    estimates = pd.DataFrame([row for rows in outcomes for row in rows]).set_index('Date')
+    p_value_columns = [column for column in estimates.columns if column.endswith(' p-value')]
+    diagnostics = ['Observations', 'Iterations', 'Cold Refit', 'Converged']
+    return {
+        'Coefficients': estimates.drop(columns=p_value_columns + diagnostics, errors='ignore'),
+        'P-values': estimates[p_value_columns].rename(columns=lambda column: column[:-len(' p-value')]),
+        'Diagnostics': estimates.reindex(columns=diagnostics),
+    }
+
+#Rolling (or expanding) version of the GARCH-X stage of a study file
+def run_study_rolling(study, window=500, step=1, expanding=False, chunks=None, workers=None):
+    study = pipeline.load_study(study)
+    series = study['series']
+    model = {**pipeline.default_model, **study.get('model', {})}
+    _, results = pipeline.returns_panel(study)
+    return rolling_garch_x(
+        results['returns_dataframe'],
+        series[model['dependent']]['name'],
+        [series[key]['name'] for key in model['exogenous']],
+        window, step, expanding, model, chunks, workers,
+    )
@@ -0,0 +1,245 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Data-source registry: where every price series comes from
+#Studies/sources.toml names price series ([sources.brent], [sources.coal_futures], ...) and maps the logical
+#names oil / coal / gas / index to one of them ([aliases]). A study series either describes its own source
+#(csv, parquet, ticker or fake keys, as before) or points at the registry with source = "oil", so swapping
+#brent_20_23.csv for dubai_oil.csv or 'BZ=F' is a change of one line in a toml file. Backends:
+#   csv      - files inside the Data folder, each file parsed once per process and again only when it changes
+#   parquet  - files inside the Data folder, only the requested columns are read, one read per file
+#   yahoo    - yahoo finance tickers, downloaded concurrently (fetch.py) behind the on-disk cache (price_cache.py)
+#   fake     - deterministic random prices seeded by the series name, no network and no files
+#fetch_series() groups the series by backend so every backend serves its whole batch in one call.
+#THESIS_SOURCES=<backend> (or sources.override) serves every series from that backend, e.g. 'fake' for
+#benchmarks and CI runs with zero network and predictable I/O.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import zlib                     #Stable seeds of the fake backend
+import tomllib                  #Reads the registry
+import threading                #Backends may be called from several threads
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+from thesis import paths, loader, fetch, price_cache, memo, trace
+
+registry_location = os.path.join(paths.studies_directory, 'sources.toml')
+override = os.environ.get('THESIS_SOURCES') or None     #Backend serving every series, None keeps each entry's own
+_registry = None                #{'sources': {...}, 'aliases': {...}} once sources.toml is read
+_registered = {}                #Sources added with register()
+_aliases = {}                   #Aliases changed with use()
+
+#-------------------------------------------------------------------
+#Registry
+
+def registry():
+    global _registry
+    if _registry is None:
+        _registry = {'sources': {}, 'aliases': {}}
+        if os.path.exists(registry_location):
+            with open(registry_location, 'rb') as registry_file:
+                _registry = {'sources': {}, 'aliases': {}, **tomllib.load(registry_file)}
+    return {
+        'sources': {**_registry['sources'], **_registered},
+        'aliases': {**_registry['aliases'], **_aliases},
+    }
+
+def register(name, **entry):    #register('brent_spot', csv='brent.csv', column='brent', name='Crude Oil')
+    _registered[name] = entry
+
+def use(logical_name, source_name):     #Points a logical name (oil, coal, gas, index) at another registered source
+    _aliases[logical_name] = source_name
+
+def backend_name(entry):
+    if 'backend' in entry:
+        return entry['backend']
+    for key, backend in (('ticker', 'yahoo'), ('csv', 'csv'), ('parquet', 'parquet'), ('fake', 'fake')):
+        if key in entry:
+            return backend
+    raise ValueError(f"Series {entry.get('name')!r} has no source: give it csv, parquet, ticker, fake or source")
+
+#Complete entry of one series with its 'backend': 'source' references are followed through the aliases
+def resolve(entry):
+    entry = dict(entry)
+    known = registry()
+    seen = []
+    while 'source' in entry:
+        name = entry.pop('source')
+        name = known['aliases'].get(name, name)
+        if name in seen:
+            raise LookupError(f"Data source {name!r} refers back to itself: {' -> '.join(seen + [name])}")
+        if name not in known['sources']:
+            raise LookupError(f"Unknown data source {name!r}, add it to {os.path.relpath(registry_location, paths.root_directory)}")
+        seen.append(name)
+        entry = {**known['sources'][name], **entry}
+    entry['backend'] = override or backend_name(entry)
+    return entry
+
+def named(series):              #Series entries with the name of their registered source when they do not set one
+    return {key: entry if 'name' in entry else {**entry, 'name': resolve(entry).get('name', key)} for key, entry in series.items()}
+
+#-------------------------------------------------------------------
+#Backends, fetch(entries, start, end, interval) returns {key: price series} for a {key: entry} batch
+
+def _data_location(file_name):
+    return file_name if os.path.isabs(file_name) else os.path.join(paths.data_directory, file_name)
+
+def _files(entry, option):
+    return [entry[option]] if isinstance(entry[option], str) else entry[option]
+
+def _join(pieces):              #Consecutive files of one series, the first file wins on overlapping dates
+    price = pd.concat(pieces)
+    return price[~price.index.duplicated(keep='first')].sort_index()
+
+class CsvSource:
+    def __init__(self):
+        self._files = {}        #location -> (content key, parsed frame)
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+
+    def read(self, location):
+        key = memo.file_key(location)
+        with self._lock:
+            cached = self._files.get(location)
+        if cached is None or cached[0] != key:
+            cached = (key, loader.read_prices(location))
+            with self._lock:
+                self._files[location] = cached
+        return cached[1]
+
+    def fetch(self, entries, start, end, interval):
+        return {key: _join([self.read(_data_location(file_name))[entry['column']] for file_name in _files(entry, 'csv')])
+                for key, entry in entries.items()}
+
+    def versions(self, entry):
+        return [memo.file_key(_data_location(file_name)) for file_name in _files(entry, 'csv')]
+
+class ParquetSource:
+    def __init__(self):
+        self._columns = {}      #location -> (content key, {column: series})
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._columns.clear()
+
+    def _read(self, location, columns):     #Reads only the columns not cached yet, with the dates as index
+        import pyarrow.parquet as pq    #Only needed by parquet sources
+        key = memo.file_key(location)
+        with self._lock:
+            cached = self._columns.get(location)
+            if cached is None or cached[0] != key:
+                cached = self._columns[location] = (key, {})
+        missing = [column for column in columns if column not in cached[1]]
+        if missing:
+            stored_index = 'Date' in pq.read_schema(location).names
+            frame = pd.read_parquet(location, columns=missing + (['Date'] if stored_index else []))
+            if 'Date' in frame.columns:
+                frame = frame.set_index('Date')
+            frame.index = pd.DatetimeIndex(frame.index, name='Date')
+            with self._lock:
+                cached[1].update({column: frame[column].astype('float64') for column in missing})
+        return cached[1]
+
+    def fetch(self, entries, start, end, interval):
+        wanted = {}             #location -> columns wanted by the whole batch
+        for entry in entries.values():
+            for file_name in _files(entry, 'parquet'):
+                wanted.setdefault(_data_location(file_name), []).append(entry['column'])
+        columns = {location: self._read(location, list(dict.fromkeys(names))) for location, names in wanted.items()}
+        return {key: _join([columns[_data_location(file_name)][entry['column']] for file_name in _files(entry, 'parquet')])
+                for key, entry in entries.items()}
+
+    def versions(self, entry):
+        return [memo.file_key(_data_location(file_name)) for file_name in _files(entry, 'parquet')]
+
+class YahooSource:              #Caching and offline mode are those of price_cache
+    def fetch(self, entries, start, end, interval):
+        frames = fetch.download_frames({key: entry['ticker'] for key, entry in entries.items()}, start, end, interval)
+        return {key: frames[key][entry.get('column', 'Adj Close')] for key, entry in entries.items()}
+
+    def versions(self, entry):  #Offline stand-ins must never be served later as if they were downloads
+        return {'offline': price_cache.offline}
+
+class FakeSource:
+    origin = pd.Timestamp('1990-01-01')     #Every fake series starts here, so a window is always the same slice
+
+    def __init__(self):
+        self._series = {}       #(seed, last date) -> generated prices
+        self._lock = threading.Lock()
+
+    #Business-day prices whose log returns follow a GARCH(1,1); ~2% of the dates are dropped as holidays.
+    #Shocks and holidays come from two streams, so a later end only adds dates and keeps the earlier ones
+    def generate(self, seed, end):
+        end = pd.Timestamp(end)
+        with self._lock:
+            if (seed, end) in self._series:
+                return self._series[(seed, end)]
+        rng = np.random.default_rng(seed)
+        dates = pd.bdate_range(self.origin, end, inclusive='left', name='Date')
+        shocks = rng.standard_normal(len(dates))
+        log_returns = np.empty(len(dates))
+        variance = 2e-4
+        for row in range(len(dates)):
+            log_returns[row] = np.sqrt(variance) * shocks[row]
+            variance = 4e-6 + 0.08 * log_returns[row] ** 2 + 0.9 * variance
+        open_dates = np.random.default_rng([seed, 1]).random(len(dates)) > 0.02
+        prices = pd.Series(np.exp(np.log(100.0) + np.cumsum(log_returns)).round(4), index=dates)[open_dates]
+        with self._lock:
+            self._series[(seed, end)] = prices
+        return prices
+
+    def fetch(self, entries, start, end, interval):
+        prices = {}
+        for key, entry in entries.items():
+            seed = entry['fake'] if isinstance(entry.get('fake'), int) and not isinstance(entry['fake'], bool) else \
+                zlib.crc32(str(entry.get('name', key)).encode())
+            generated = self.generate(seed, end)
+            prices[key] = generated[generated.index >= pd.Timestamp(start)]
+        return prices
+
+    def versions(self, entry):
+        return None
+
+backends = {
+    'csv': CsvSource(),
+    'parquet': ParquetSource(),
+    'yahoo': YahooSource(),
+    'fake': FakeSource(),
+}
+
+#-------------------------------------------------------------------
+
+def clear():                    #Forgets every parsed file, e.g. before timing the load stage again
+    for backend in backends.values():
+        if hasattr(backend, 'clear'):
+            backend.clear()
+
+#Returns {key: price series named after the entry} for a {key: series entry} dictionary of a study,
+#with one batched call per backend
+def fetch_series(series, start, end, interval='1d'):
+    resolved = {key: resolve(entry) for key, entry in series.items()}
+    batches = {}
+    for key, entry in resolved.items():
+        batches.setdefault(entry['backend'], {})[key] = entry
+    prices = {}
+    for backend, entries in batches.items():
+        if backend not in backends:
+            raise LookupError(f"Unknown source backend {backend!r}, expected one of {sorted(backends)}")
+        with trace.span(f"source {backend}", len(entries)) as record:
+            prices.update(backends[backend].fetch(entries, start, end, interval))
+            record['rows out'] = trace.rows(prices)
+    return {key: prices[key].rename(resolved[key].get('name', key)) for key in series}
+
+def fetch_source(name, start, end, interval='1d'):     #Prices of one registered source or alias
+    return fetch_series({name: {'source': name}}, start, end, interval)[name]
+
+def versions(series):           #Resolved entries and file contents, so a stage reloads when either changed
+    return {key: [entry, backends[entry['backend']].versions(entry) if entry['backend'] in backends else None]
+            for key, entry in ((key, resolve(entry)) for key, entry in series.items())}
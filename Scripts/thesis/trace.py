@@ -0,0 +1,199 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Timing / memory trace of a pipeline run
+#The stages wrap their work in span('name') (or the @traced decorator); while a Trace is active every span
+#records its wall time, the CPU time of its own thread ('cpu') and of the whole process ('process cpu'), peak
+#and final resident memory, rows in / out and, for fits, the optimizer iterations. Spans nest (a study stage contains the fit it runs) and may run on several threads.
+#Without an active Trace a span costs a function call, so the hooks stay in place in production code.
+#   with trace.Trace('thesis_20_23') as run_trace:
+#       pipeline.run_study(...)
+#   run_trace.save()            - Output/trace/<name>.json (spans) and <name>.trace.json (chrome://tracing)
+#THESIS_TRACE=1 traces every pipeline.run_study call. On Linux the peak memory of a span is its own (the
+#high-water mark is reset when the span starts) as long as no span is open on another thread, since the mark
+#belongs to the whole process; otherwise, and outside Linux, it is the high-water mark of the process and the
+#span's 'peak scope' says so.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+import re                       #Turns trace names into file names
+import json                     #Stores the traces
+import time                     #Wall and CPU time of every span
+import threading                #Spans of every thread nest separately
+import functools                #Keeps the name of traced functions
+import contextlib               #Span context managers
+
+from thesis import paths
+
+_active = None                  #Trace currently recording, None when tracing is off
+_local = threading.local()      #Open spans of the current thread
+_open = {}                      #Thread -> number of open spans, a thread only resets the high-water mark when alone
+_open_lock = threading.Lock()
+
+#-------------------------------------------------------------------
+#Resident memory (bytes)
+
+def _status():                  #{'VmRSS': bytes, 'VmHWM': bytes} from /proc, empty outside Linux
+    try:
+        with open('/proc/self/status') as status_file:
+            return {line.split(':')[0]: int(line.split()[1]) * 1024 for line in status_file if line.startswith(('VmRSS', 'VmHWM'))}
+    except OSError:
+        return {}
+
+def _high_water_mark():
+    status = _status()
+    if 'VmHWM' in status:
+        return status['VmHWM']
+    import resource             #ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if os.uname().sysname == 'Darwin' else 1024)
+
+def _reset_high_water_mark():   #Linux only, lets every span measure its own peak
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+def resident_memory():
+    return _status().get('VmRSS', _high_water_mark())
+
+#-------------------------------------------------------------------
+
+class Trace:
+    def __init__(self, name='run'):
+        self.name = name
+        self.spans = []
+        self.started = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        global _active
+        self._previous = _active
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        _active = self
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        global _active
+        _active = self._previous
+        return False
+
+    def _add(self, record):
+        with self._lock:
+            self.spans.append(record)
+
+    def table(self):            #One row per span in start order (pandas is only imported here)
+        import pandas as pd     #Data manipulation external library
+        return pd.DataFrame(sorted(self.spans, key=lambda record: record['start']))
+
+    def chrome_events(self):    #Complete ('X') events of the Chrome trace event format, times in microseconds
+        process = os.getpid()
+        return [{
+            'name': record['name'],
+            'cat': 'stage',
+            'ph': 'X',
+            'ts': round(record['start'] * 1e6, 3),
+            'dur': round(record['wall'] * 1e6, 3),
+            'pid': process,
+            'tid': record['thread'],
+            'args': {key: value for key, value in record.items() if key not in ('name', 'start', 'wall', 'thread') and value is not None},
+        } for record in self.spans]
+
+    #location: base path without extension (Output/trace/<name> by default), returns (spans json, chrome trace)
+    def save(self, location=None):
+        location = location or os.path.join(paths.output_directory, 'trace', re.sub(r'[^A-Za-z0-9_.-]+', '_', self.name))
+        os.makedirs(os.path.dirname(location), exist_ok=True)
+        spans = sorted(self.spans, key=lambda record: record['start'])
+        with open(location + '.json', 'w') as trace_file:
+            json.dump({'name': self.name, 'started': self.started_at, 'spans': spans}, trace_file, indent=1, default=str)
+        with open(location + '.trace.json', 'w') as trace_file:
+            json.dump({'traceEvents': self.chrome_events(), 'displayTimeUnit': 'ms'}, trace_file, default=str)
+        return location + '.json', location + '.trace.json'
+
+#-------------------------------------------------------------------
+#Hooks
+
+#Yields the span record, the stage may fill in 'rows out', 'iterations' or any other value while it runs
+@contextlib.contextmanager
+def span(name, rows_in=None, **details):
+    run_trace = _active
+    if run_trace is None:
+        yield {}
+        return
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    parent = stack[-1] if stack else None
+    thread = threading.get_ident()
+    high_water = _high_water_mark()
+    if parent is not None:      #The parent's peak so far is kept before the mark is reset for this span
+        parent['peak rss'] = max(parent['peak rss'], high_water)
+    with _open_lock:            #Resetting would wipe the peaks of spans open on other threads
+        alone = all(count == 0 for other, count in _open.items() if other != thread)
+        resettable = alone and _reset_high_water_mark()
+        _open[thread] = _open.get(thread, 0) + 1
+    record = {
+        'name': name,
+        'parent': parent['name'] if parent else None,
+        'depth': len(stack),
+        'thread': thread,
+        'rows in': rows_in,
+        'rows out': None,
+        'iterations': None,
+        'peak rss': 0 if resettable else high_water,
+        'peak scope': 'span' if resettable else 'process',
+        **details,
+    }
+    stack.append(record)
+    started, cpu_started, process_cpu_started = time.perf_counter(), time.thread_time(), time.process_time()
+    try:
+        yield record
+    finally:
+        record['wall'] = time.perf_counter() - started
+        record['cpu'] = time.thread_time() - cpu_started
+        record['process cpu'] = time.process_time() - process_cpu_started
+        record['start'] = started - run_trace.started
+        record['peak rss'] = max(record['peak rss'], _high_water_mark())
+        record['rss'] = resident_memory()
+        stack.pop()
+        with _open_lock:
+            _open[thread] -= 1
+        if parent is not None:
+            parent['peak rss'] = max(parent['peak rss'], record['peak rss'])
+        run_trace._add(record)
+
+def rows(value):                #Row count of a frame, array or {key: series} of a stage
+    if isinstance(value, dict):
+        return max((rows(item) for item in value.values()), default=0)
+    if isinstance(value, tuple):
+        return rows(value[0]) if value else None
+    return len(value) if hasattr(value, '__len__') else None
+
+#@traced('name') records a span around every call, rows in / out are taken from the first argument and the result
+def traced(name):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return function(*args, **kwargs)
+            with span(name, rows(args[0]) if args else None) as record:
+                result = function(*args, **kwargs)
+                record['rows out'] = rows(result)
+                return result
+        return wrapper
+    return decorator
+
+def session(name):              #Trace saved on exit when THESIS_TRACE is set and no trace is already recording
+    if _active is not None or os.environ.get('THESIS_TRACE', '') in ('', '0'):
+        return contextlib.nullcontext()
+    return _SavedTrace(name)
+
+class _SavedTrace(Trace):
+    def __exit__(self, error_type, error, traceback):
+        super().__exit__(error_type, error, traceback)
+        print(f"[*] Trace Generated at: {os.path.relpath(self.save()[1], paths.root_directory)}")
+        return False
@@ -0,0 +1,237 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Batched unit root tests (ADF, KPSS and Phillips-Perron) over every column of a frame at once
+#Columns with the same observed dates are tested together as one stack of regressions:
+#   ADF  - the lagged design (level, differences, trend) is built once for the whole stack with a sliding window,
+#          one QR of the largest design gives the residual sum of squares of every smaller lag length (the
+#          nested regressions are the leading columns of the same QR), so the AIC/BIC lag search needs no refits
+#   KPSS - every column is detrended by the same trend design in one least squares solve
+#   PP   - the trend is partialled out of y[t] and y[t-1] once and rho follows column by column in closed form
+#Stacks are split into chunks that run on a thread pool (numpy releases the GIL inside the linear algebra).
+#The statistics, lag choices and p-values are the ones of arch.unitroot.ADF / KPSS / PhillipsPerron.
+import os                       #Basic computer capabilities to be able to locate csv files inside data folder
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+
+tests = ('adf', 'kpss', 'pp')
+trends = ('n', 'c', 'ct')
+lag_methods = ('aic', 'bic')
+
+#-------------------------------------------------------------------
+#Shared building blocks
+
+def default_lags(nobs):         #Schwert rule used by arch for the ADF search and the PP / KPSS long run variance
+    return int(np.ceil(12.0 * np.power(nobs / 100.0, 1 / 4.0)))
+
+def trend_design(nobs, trend):  #Constant and/or linear trend (1, 2, ..., nobs) columns, as arch's add_trend
+    columns = []
+    if trend in ('c', 'ct'):
+        columns.append(np.ones(nobs))
+    if trend == 'ct':
+        columns.append(np.arange(1, nobs + 1, dtype='float64'))
+    return np.column_stack(columns) if columns else np.empty((nobs, 0))
+
+#y: (T, N) -> lhs (N, n) and rhs (N, n, 1 + lags) with the columns Level.L1, Diff.L1, ..., Diff.L<lags>
+def lagged_design(y, lags):
+    delta = np.diff(y, axis=0)
+    windows = np.lib.stride_tricks.sliding_window_view(delta, lags + 1, axis=0)    #(n, N, lags + 1), oldest first
+    nobs = windows.shape[0]
+    lhs = windows[:, :, -1].T
+    level = y[lags:lags + nobs].T[:, :, None]
+    differences = windows[:, :, -2::-1].transpose(1, 0, 2) if lags else np.empty((y.shape[1], nobs, 0))
+    return lhs, np.concatenate([level, differences], axis=2)
+
+#Newey-West (Bartlett) long run variance of every column of u, lags may differ per column
+def long_run_variance(u, lags):
+    nobs = u.shape[0]
+    lags = np.broadcast_to(np.asarray(lags), u.shape[1:])
+    total = (u ** 2).sum(axis=0)
+    for j in range(1, int(lags.max(initial=0)) + 1):
+        weight = np.where(j <= lags, 1 - j / (lags + 1), 0.0)
+        total += 2 * weight * (u[j:] * u[:-j]).sum(axis=0)
+    return total / nobs
+
+def _stacked_ols(lhs, rhs):     #t-statistic of the first regressor (Level.L1) of every regression in the stack
+    q, r = np.linalg.qr(rhs)
+    diagonal = np.abs(np.diagonal(r, axis1=1, axis2=2))
+    singular = diagonal.min(axis=1) <= 1e-10 * np.maximum(diagonal.max(axis=1), 1e-300)
+    r[singular] = np.eye(r.shape[1])    #Placeholder so the batch solves, singular columns are reported as NaN
+    params = np.linalg.solve(r, np.einsum('nti,nt->ni', q, lhs)[:, :, None])[:, :, 0]
+    resids = lhs - np.einsum('nti,ni->nt', rhs, params)
+    dof = rhs.shape[1] - rhs.shape[2]
+    s2 = (resids ** 2).sum(axis=1) / dof
+    r_inverse = np.linalg.inv(r)
+    std_err = np.sqrt(s2 * (r_inverse[:, 0, :] ** 2).sum(axis=1))
+    return np.where(singular, np.nan, params[:, 0] / std_err)
+
+#-------------------------------------------------------------------
+#Tests on one stack of columns with identical dates, y: (T, N), every function returns a dict of (N,) arrays
+
+def _adf_stack(y, trend='c', max_lags=None, method='aic'):
+    from arch.unitroot.unitroot import mackinnonp
+    nobs_total, columns = y.shape
+    if max_lags is None:
+        max_max_lags = max((nobs_total - 1) // 2 - 1, 0) - (len(trend) if trend != 'n' else 0)
+        max_lags = max(min(default_lags(nobs_total), max_max_lags), 0)
+    lhs, rhs = lagged_design(y, max_lags)
+    nobs = lhs.shape[1]
+    deterministic = trend_design(nobs, trend)
+    full_rhs = np.concatenate([np.broadcast_to(deterministic, (columns,) + deterministic.shape), rhs], axis=2)
+
+    #Lag search: the residual sum of squares with the first i regressors is y'y - sum(Q'y[:i]^2)
+    q, _ = np.linalg.qr(full_rhs)
+    qpy = np.einsum('nti,nt->ni', q, lhs)
+    rss = (lhs ** 2).sum(axis=1)[:, None] - np.cumsum(qpy ** 2, axis=1)
+    start = deterministic.shape[1] + 1
+    sigma2 = np.maximum(rss[:, start - 1:start + max_lags], 1e-300) / nobs
+    penalty = 2.0 if method == 'aic' else np.log(nobs)
+    criteria = nobs * np.log(sigma2) + penalty * np.arange(max_lags + 1)
+    lags = np.argmin(criteria, axis=1)
+
+    #Final regression of every column on its own lag length, over the longest sample that lag allows
+    statistic = np.empty(columns)
+    observations = np.empty(columns, dtype='int64')
+    for lag in np.unique(lags):
+        selected = lags == lag
+        lag_lhs, lag_rhs = lagged_design(y[:, selected], int(lag))
+        deterministic = trend_design(lag_lhs.shape[1], trend)
+        lag_rhs = np.concatenate([lag_rhs, np.broadcast_to(deterministic, (lag_rhs.shape[0],) + deterministic.shape)], axis=2)
+        statistic[selected] = _stacked_ols(lag_lhs, lag_rhs)
+        observations[selected] = lag_lhs.shape[1]
+    pvalue = np.array([mackinnonp(stat, regression=trend, num_unit_roots=1) if np.isfinite(stat) else np.nan for stat in statistic])
+    return {'t-statistic': statistic, 'p-value': pvalue, 'lags': lags, 'nobs': observations}
+
+def _kpss_lags(u):              #Hobijn et al. (1998) bandwidth, as arch's KPSS._autolag
+    nobs = u.shape[0]
+    s0 = (u ** 2).sum(axis=0) / nobs
+    s1 = np.zeros(u.shape[1])
+    for i in range(1, int(np.power(nobs, 2.0 / 9.0)) + 1):
+        product = (u[i:] * u[:nobs - i]).sum(axis=0) / (nobs / 2)
+        s0 = s0 + product
+        s1 = s1 + i * product
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma_hat = 1.1447 * np.power((s1 / s0) ** 2, 1.0 / 3.0)
+        lags = np.minimum(nobs, np.nan_to_num(gamma_hat * np.power(nobs, 1.0 / 3.0))).astype('int64')
+    return lags
+
+def _kpss_stack(y, trend='c', lags=None):
+    from arch.unitroot.unitroot import kpss_crit
+    nobs = y.shape[0]
+    deterministic = trend_design(nobs, trend)
+    u = y - deterministic @ np.linalg.lstsq(deterministic, y, rcond=None)[0]
+    lags = _kpss_lags(u) if lags is None else np.full(y.shape[1], lags)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        statistic = (np.cumsum(u, axis=0) ** 2).sum(axis=0) / nobs ** 2 / long_run_variance(u, lags)
+    pvalue = np.array([kpss_crit(stat, trend)[0] if np.isfinite(stat) else np.nan for stat in statistic])
+    return {'t-statistic': statistic, 'p-value': pvalue, 'lags': lags, 'nobs': np.full(y.shape[1], nobs)}
+
+def _pp_stack(y, trend='c', lags=None):
+    from arch.unitroot.unitroot import mackinnonp
+    lags = default_lags(y.shape[0]) if lags is None else lags
+    current, previous = y[1:], y[:-1]
+    nobs = current.shape[0]
+    deterministic = trend_design(nobs, trend)
+    k = deterministic.shape[1] + 1
+    if deterministic.shape[1]:  #Frisch-Waugh: partial the trend out of both sides once for every column
+        projection = np.linalg.lstsq(deterministic, np.hstack([current, previous]), rcond=None)[0]
+        fitted = deterministic @ projection
+        current, previous = current - fitted[:, :y.shape[1]], previous - fitted[:, y.shape[1]:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx = (previous ** 2).sum(axis=0)
+        rho = (previous * current).sum(axis=0) / sxx
+        u = current - rho * previous
+        s2 = (u ** 2).sum(axis=0) / (nobs - k)
+        sigma = np.sqrt(s2 / sxx)
+        gamma0 = s2 * (nobs - k) / nobs
+        lam2 = long_run_variance(u, lags)
+        statistic = np.sqrt(gamma0 / lam2) * ((rho - 1) / sigma) - 0.5 * ((lam2 - gamma0) / np.sqrt(lam2)) * (nobs * sigma / np.sqrt(s2))
+    statistic = np.where(sigma > 0, statistic, np.nan)
+    pvalue = np.array([mackinnonp(stat, regression=trend, dist_type='adf-t') if np.isfinite(stat) else np.nan for stat in statistic])
+    return {'t-statistic': statistic, 'p-value': pvalue, 'lags': np.full(y.shape[1], lags), 'nobs': np.full(y.shape[1], nobs)}
+
+stack_tests = {'adf': _adf_stack, 'kpss': _kpss_stack, 'pp': _pp_stack}
+
+#-------------------------------------------------------------------
+#Batching
+
+def _stacks(frame):             #Groups the columns by the dates they are observed on (each column is tested after its own dropna())
+    values = frame.to_numpy(dtype='float64')
+    observed = ~np.isnan(values)
+    groups = {}
+    for position in range(values.shape[1]):
+        groups.setdefault(observed[:, position].tobytes(), []).append(position)
+    return [(observed[:, positions[0]], positions) for positions in groups.values()], values
+
+#Fewest observations a column needs: at least one degree of freedom left in the test regression
+def minimum_observations(test, trend, options):
+    deterministic = trend_design(0, trend).shape[1]
+    if test == 'adf':           #T - 1 - lags rows against level, lags differences and the trend
+        return 2 * (options.get('max_lags') or 0) + deterministic + 3
+    if test == 'pp':            #T - 1 rows against y[t-1] and the trend
+        return deterministic + 3
+    return deterministic + 2    #KPSS: residuals of the trend regression
+
+def _run(test, frame, trend, workers, options):
+    if test not in tests:
+        raise ValueError(f"test must be one of {tests}, got {test!r}")
+    valid_trends = ('c', 'ct') if test == 'kpss' else trends
+    if trend not in valid_trends:
+        raise ValueError(f"trend must be one of {valid_trends} for {test}, got {trend!r}")
+    if options.get('method', 'aic') not in lag_methods:
+        raise ValueError(f"method must be one of {lag_methods}, got {options['method']!r}")
+    frame = frame.to_frame() if isinstance(frame, pd.Series) else frame
+    stacks, values = _stacks(frame)
+    minimum = minimum_observations(test, trend, options)
+    for rows, positions in stacks:
+        if rows.sum() < minimum:
+            raise ValueError(f"{test.upper()} with trend {trend!r} needs at least {minimum} observations, "
+                             f"{', '.join(repr(frame.columns[position]) for position in positions)} has {rows.sum()}")
+    workers = workers or os.cpu_count()
+    jobs = [(rows, chunk) for rows, positions in stacks for chunk in np.array_split(positions, min(workers, len(positions)))]
+    compute = lambda job: stack_tests[test](values[job[0]][:, job[1]], trend, **options)
+    if workers == 1 or len(jobs) == 1:
+        outputs = [compute(job) for job in jobs]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(compute, jobs))
+    table = pd.DataFrame(index=frame.columns, columns=['t-statistic', 'p-value', 'lags', 'nobs'], dtype='float64')
+    for (_, chunk), output in zip(jobs, outputs):
+        for name, column in output.items():
+            table.iloc[chunk, table.columns.get_loc(name)] = column
+    return table.astype({'lags': 'int64', 'nobs': 'int64'})
+
+#Every function returns one row per column: 't-statistic', 'p-value', 'lags' (selected or bandwidth) and 'nobs'
+def adf_batch(frame, trend='c', max_lags=None, method='aic', workers=None):
+    return _run('adf', frame, trend, workers, {'max_lags': max_lags, 'method': method})
+
+def kpss_batch(frame, trend='c', lags=None, workers=None):
+    return _run('kpss', frame, trend, workers, {'lags': lags})
+
+def pp_batch(frame, trend='c', lags=None, workers=None):
+    return _run('pp', frame, trend, workers, {'lags': lags})
+
+#-------------------------------------------------------------------
+#Result tables
+
+def conclusion(test, pval, sig_lvl=0.05):   #KPSS has stationarity as its null hypothesis, ADF and PP have a unit root
+    if test == 'kpss':
+        return "Non-stationary" if pval<sig_lvl else "Stationary"
+    return "Stationary" if pval<sig_lvl else "Non-stationary"
+
+#Same t-statistic / p-value / conclusion table the thesis scripts build from arch's ADF one column at a time
+def stationarity_table(frame, test='adf', trend='c', sig_lvl=0.05, workers=None, **options):
+    table = _run(test, frame, trend, workers, {'max_lags': None, 'method': 'aic', **options} if test == 'adf' else {'lags': None, **options})
+    return pd.DataFrame({
+        "t-statistic": table['t-statistic'],
+        "p-value": table['p-value'],
+        "conclusion": [conclusion(test, pval, sig_lvl) for pval in table['p-value']],
+    }, index=table.index)
+
+def run_tests(frame, tests=tests, trend='c', sig_lvl=0.05, workers=None):  #{test: table} for several tests at once
+    return {test: stationarity_table(frame, test, trend, sig_lvl, workers) for test in tests}
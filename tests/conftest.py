@@ -0,0 +1,18 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Test setup: the thesis package is imported from the Scripts folder with its cache in a temporary folder and
+#yahoo finance in offline mode, so the tests never touch Cache/ or the network
+import os                       #Environment read by the thesis package when it is imported
+import sys                      #Puts the Scripts folder on the import path
+import tempfile                 #Cache folder of the test session
+
+scripts_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Scripts')
+sys.path.insert(0, scripts_directory)
+os.environ['THESIS_CACHE'] = tempfile.mkdtemp(prefix='thesis-cache-')
+os.environ['THESIS_OFFLINE'] = '1'
+os.environ.pop('THESIS_SOURCES', None)
@@ -0,0 +1,34 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Offline setup of the benchmark suite (bench.py) is undone once the benchmark is over
+import sys                      #Checks the yahoo finance stub
+import contextlib               #Runs the same test with and without a failing benchmark
+import pytest
+
+from thesis import bench, memo, price_cache
+
+@pytest.mark.parametrize('failing', [False, True])
+def test_offline_setup_is_restored(monkeypatch, failing):
+    monkeypatch.setattr(price_cache, 'offline', False)
+    monkeypatch.setattr(memo, 'enabled', True)
+    yfinance = sys.modules.get('yfinance')
+    with pytest.raises(RuntimeError) if failing else contextlib.nullcontext():
+        with bench.offline():
+            assert price_cache.offline and not memo.enabled
+            with pytest.raises(RuntimeError, match='stubbed out'):
+                sys.modules['yfinance'].download('NG=F')
+            if failing:
+                raise RuntimeError('stage failed')
+    assert price_cache.offline is False and memo.enabled is True
+    assert sys.modules.get('yfinance') is yfinance
+
+def test_run_leaves_the_process_as_it_was(monkeypatch):
+    monkeypatch.setattr(memo, 'enabled', True)
+    results = bench.run(('10x',), repeat=1, save=False)
+    assert set(results['stage']) == {'load', 'log_returns', 'align', 'describe', 'adf', 'vif', 'garch'}
+    assert memo.enabled is True
@@ -0,0 +1,33 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Bootstrap of the GARCH-X coefficients (bootstrap.py) on a simulated GARCH(1,1)-X sample
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+import pandas as pd             #Data manipulation external library
+import pytest
+
+from thesis import bootstrap
+
+@pytest.fixture(scope='module')
+def sample():
+    rng = np.random.default_rng(0)
+    x = np.column_stack([np.ones(600), rng.standard_normal((600, 2))])
+    innovations = rng.standard_normal((1, 600))
+    y = bootstrap.simulate(np.array([0.05, 0.3, -0.2, 0.05, 0.08, 0.88]), x, innovations, 1.0)[0]
+    return pd.Series(y / 100, name='Index'), pd.DataFrame(x[:, 1:] / 100, columns=['Crude Oil', 'Coal'])
+
+@pytest.mark.parametrize('model', [{'o': 1}, {'p': 2}, {'vol': 'EGARCH'}, {'dist': 't'}, {'lags': 1}])
+def test_unsupported_model_is_refused(sample, model):
+    with pytest.raises(ValueError, match="only simulates"):
+        bootstrap.bootstrap(*sample, model, replications=2, workers=1)
+
+def test_intervals_cover_the_estimates(sample):
+    results = bootstrap.bootstrap(*sample, replications=20, workers=1)
+    intervals = results['Intervals']
+    assert list(intervals.index) == list(results['Replications'].columns)
+    assert (intervals['replications'] > 10).all()
+    assert (intervals['2.5%'] <= intervals['97.5%']).all()
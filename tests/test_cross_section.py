@@ -0,0 +1,30 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Cross-section of GARCH-X fits (cross_section.py), one fit per dependent series of a fake-source panel
+import pytest
+
+from thesis import cross_section, pipeline
+
+@pytest.fixture(scope='module')
+def panel():
+    study = {
+        'name': 'Cross-section test',
+        'period': {'start': '2021-01-01', 'end': '2023-12-29'},
+        'series': {key: {'fake': seed, 'name': key} for seed, key in enumerate(['A', 'B', 'Crude Oil', 'Coal'], 1)},
+    }
+    return pipeline.returns_panel(study, dropna=False)[1]['returns_dataframe']
+
+def test_no_dependents_is_refused(panel):
+    with pytest.raises(ValueError, match="no dependent series"):
+        cross_section.run_cross_section(panel, [], ['Crude Oil', 'Coal'], workers=1)
+
+def test_one_fit_per_dependent(panel):
+    tables = cross_section.run_cross_section(panel, ['A', 'B'], ['Crude Oil', 'Coal'], workers=1)
+    assert list(tables['Fits']['Dependent']) == ['A', 'B']
+    assert list(tables['Coefficient Matrix']['Dependent']) == ['A', 'B']
+    assert {'Crude Oil', 'Coal', 'omega', 'alpha[1]', 'beta[1]'} <= set(tables['Coefficient Matrix'].columns)
@@ -0,0 +1,41 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#DCC / CCC GARCH (dcc.py) on simulated standardized residuals and a fake-source panel
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+import pandas as pd             #Data manipulation external library
+import pytest
+
+from thesis import dcc, pipeline
+
+def test_constant_loglikelihood_matches_rowwise():
+    resid = np.random.default_rng(0).standard_normal((300, 3))
+    resid[:, 1] += 0.5 * resid[:, 0]
+    correlation = np.corrcoef(resid, rowvar=False)
+    rowwise = dcc._block_loglikelihood(resid, np.broadcast_to(correlation, (len(resid),) + correlation.shape))
+    assert dcc.constant_loglikelihood(resid, correlation) == pytest.approx(rowwise, rel=1e-12)
+
+@pytest.mark.parametrize('method', dcc.methods)
+def test_one_series_is_refused(method):
+    with pytest.raises(ValueError, match="at least two series"):
+        dcc.fit(pd.DataFrame({'Index': np.zeros(10)}), method, workers=1)
+
+def test_dcc_and_ccc_on_fake_panel():
+    study = {
+        'name': 'DCC test',
+        'period': {'start': '2021-01-01', 'end': '2023-12-29'},
+        'series': {key: {'fake': seed, 'name': key} for seed, key in enumerate(['Index', 'Crude Oil', 'Coal'], 1)},
+    }
+    returns_dataframe = pipeline.returns_panel(study)[1]['returns_dataframe']
+    dcc_result = dcc.fit(returns_dataframe, 'dcc', workers=1)
+    ccc_result = dcc.fit(returns_dataframe, 'ccc', workers=1)
+    a, b = dcc_result.params
+    assert 0 <= a and 0 <= b and a + b < 1
+    assert dcc_result.loglikelihood >= ccc_result.loglikelihood - 1e-6   #CCC is DCC with a = b = 0
+    paths = dcc_result.correlation_paths()
+    assert list(paths.columns) == ['Index / Crude Oil', 'Index / Coal'] and len(paths) == len(returns_dataframe)
+    assert (paths.abs() <= 1).all().all()
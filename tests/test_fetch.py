@@ -0,0 +1,63 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Retry path of the concurrent fetch stage (fetch.py), with an injected downloader and sleep instead of yahoo finance
+import threading                #The downloader is called from the fetch thread pool
+import pandas as pd             #Data manipulation external library
+import pytest
+
+from thesis import fetch
+
+def _bars(ticker):
+    return pd.DataFrame({'Adj Close': [1.0, 2.0]}, index=pd.DatetimeIndex(['2024-01-02', '2024-01-03'], name='Date')).assign(ticker=ticker)
+
+class FlakyDownloader:          #Fails the first 'failures' calls of every ticker with 'error', then returns bars
+    def __init__(self, failures, error=ConnectionError):
+        self.failures = failures
+        self.error = error
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker, start, end, interval):
+        with self._lock:
+            self.calls[ticker] = self.calls.get(ticker, 0) + 1
+            calls = self.calls[ticker]
+        if calls <= self.failures:
+            raise self.error(f"attempt {calls} of {ticker} failed")
+        return _bars(ticker)
+
+#-------------------------------------------------------------------
+
+def test_retries_then_succeeds():
+    downloader, sleeps = FlakyDownloader(failures=2), []
+    frames = fetch.download_frames({'oil': 'BZ=F', 'gas': 'NG=F'}, '2024-01-01', '2024-01-05', downloader=downloader,
+                                   retries=3, backoff=0.5, sleep=sleeps.append)
+    assert list(frames) == ['oil', 'gas']
+    assert frames['oil']['ticker'].iloc[0] == 'BZ=F' and frames['gas']['ticker'].iloc[0] == 'NG=F'
+    assert downloader.calls == {'BZ=F': 3, 'NG=F': 3}
+    assert sorted(sleeps) == [0.5, 0.5, 1.0, 1.0]     #Exponential backoff, two failures per ticker
+
+def test_gives_up_after_retries():
+    downloader, sleeps = FlakyDownloader(failures=10), []
+    with pytest.raises(ConnectionError):
+        fetch.download_frames({'oil': 'BZ=F'}, '2024-01-01', '2024-01-05', downloader=downloader,
+                              retries=4, backoff=0.1, sleep=sleeps.append)
+    assert downloader.calls == {'BZ=F': 4}
+    assert sleeps == pytest.approx([0.1, 0.2, 0.4])   #No sleep after the last attempt
+
+def test_lookup_error_is_not_retried():
+    downloader, sleeps = FlakyDownloader(failures=10, error=LookupError), []
+    with pytest.raises(LookupError, match=r"Series 'coal' \(MTFZ24.NYM\)"):
+        fetch.download_frames({'coal': 'MTFZ24.NYM'}, '2024-01-01', '2024-01-05', downloader=downloader,
+                              retries=3, sleep=sleeps.append)
+    assert downloader.calls == {'MTFZ24.NYM': 1}
+    assert sleeps == []
+
+def test_download_wide_aligns_columns():
+    wide = fetch.download_wide({'oil': 'BZ=F', 'gas': 'NG=F'}, '2024-01-01', '2024-01-05', downloader=FlakyDownloader(failures=0))
+    assert list(wide.columns) == ['BZ=F', 'NG=F']
+    assert len(wide) == 2
@@ -0,0 +1,37 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#GARCH(1,1)-X kernel (garch_kernel.py) against arch on a fake-source panel
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+import pytest
+
+from thesis import pipeline, garch_kernel
+
+@pytest.fixture(scope='module')
+def panel():
+    study = {
+        'name': 'Kernel test',
+        'period': {'start': '2020-01-01', 'end': '2023-12-29'},
+        'series': {key: {'fake': seed, 'name': key} for seed, key in enumerate(['Index', 'Crude Oil', 'Coal', 'Natural Gas'], 1)},
+    }
+    returns_dataframe = pipeline.returns_panel(study)[1]['returns_dataframe'] * pipeline.default_model['scale']
+    return returns_dataframe['Index'], returns_dataframe[['Crude Oil', 'Coal', 'Natural Gas']]
+
+def test_kernel_matches_arch(panel):
+    comparison = garch_kernel.validate(*panel)     #Raises when the estimates or the log-likelihood differ
+    np.testing.assert_allclose(comparison['kernel coef'], comparison['arch coef'], rtol=1e-3, atol=1e-4)
+    np.testing.assert_allclose(comparison['kernel std err'], comparison['arch std err'], rtol=5e-2)
+
+def test_validate_flags_a_different_fit(panel, monkeypatch):
+    fit = garch_kernel.fit
+    def shifted(*args, **kwargs):   #A kernel whose constant is off by 0.01
+        garch_result = fit(*args, **kwargs)
+        garch_result.params.iloc[0] += 0.01
+        return garch_result
+    monkeypatch.setattr(garch_kernel, 'fit', shifted)
+    with pytest.raises(AssertionError, match="differ from arch"):
+        garch_kernel.validate(*panel)
@@ -0,0 +1,25 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Import budget of the package ('python -m thesis imports'): the checked modules import within the budget in a
+#fresh interpreter and leave arch, yfinance, statsmodels and scipy to the stages that use them
+import pytest
+
+from thesis import __main__ as cli
+
+@pytest.mark.parametrize('module', cli.checked_modules)
+def test_no_heavy_modules_at_import(module):
+    _, packages = cli._import_report(module)
+    assert 'thesis' in packages
+    assert not set(packages) & set(cli.heavy_modules)
+
+def test_imports_command_within_budget(capsys):
+    assert cli.main(['imports']) == 0, capsys.readouterr().out
+
+def test_imports_command_fails_over_budget(capsys):
+    assert cli.main(['imports', '--budget', '0', 'thesis.paths']) == 1
+    assert 'thesis.paths' in capsys.readouterr().out
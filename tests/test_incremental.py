@@ -0,0 +1,87 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Append mode of a study (incremental.py) on fake prices: moving the period end forward folds only the new days
+#into the stored state and gives the same descriptive table as a full run over the whole period
+import os                       #Lists the files of the report
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+import pytest
+
+from thesis import paths, pipeline, incremental
+
+def _study(end):
+    return {
+        'name': 'Incremental test',
+        'period': {'start': '2020-01-01', 'end': end},
+        'series': {
+            'index': {'fake': 1, 'name': 'Index'},
+            'oil': {'fake': 2, 'name': 'Crude Oil'},
+            'gas': {'fake': 3, 'name': 'Natural Gas'},
+        },
+        'model': {'dependent': 'index', 'exogenous': ['oil', 'gas']},
+        'stages': {'adf': False},
+    }
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):   #Incremental states and reports of every test in their own folder
+    monkeypatch.setattr(paths, 'cache_directory', str(tmp_path / 'cache'))
+    monkeypatch.setattr(paths, 'output_directory', str(tmp_path / 'output'))
+    return tmp_path
+
+#-------------------------------------------------------------------
+
+def test_moments_update_matches_full_moments():
+    values = np.random.default_rng(0).standard_normal((250, 3))
+    running = incremental.update_moments(incremental.moments(values[:100]), values[100:])
+    full = incremental.moments(values)
+    for key in ('mean', 'm2', 'min', 'max'):
+        np.testing.assert_allclose(running[key], full[key])
+    assert running['n'] == full['n']
+
+def test_later_end_appends_new_rows():
+    first = incremental.run_incremental(_study('2023-06-30'))
+    assert first['appended'] is None            #No state yet: full build
+    second = incremental.run_incremental(_study('2023-12-29'))
+    full = pipeline.returns_panel(_study('2023-12-29'))[1]['returns_dataframe']
+    assert second['appended'] == len(full) - len(first['returns_dataframe'])
+    assert second['appended'] > 0
+    pd.testing.assert_frame_equal(second['descriptive'], pipeline.describe(full), check_exact=False, rtol=1e-10)
+    assert second['garch'].params.index.equals(first['garch'].params.index)
+    unchanged = incremental.run_incremental(_study('2023-12-29'))
+    assert unchanged['appended'] == 0 and unchanged['sheets'] == []
+    pd.testing.assert_frame_equal(unchanged['descriptive'], second['descriptive'])
+    assert unchanged['garch'].params.equals(second['garch'].params)
+
+def test_changed_rows_rebuild_the_state():
+    incremental.run_incremental(_study('2023-06-30'))
+    location = incremental.state_location(_study('2023-12-29'))
+    assert location == incremental.state_location(_study('2023-06-30'))   #Same state whatever the end
+    state = incremental.load_state(location)
+    incremental.save_state(location, {**state, 'rows_hash': 'rows revised since the last run'})
+    results = incremental.run_incremental(_study('2023-12-29'))
+    assert results['appended'] is None
+    pd.testing.assert_frame_equal(results['descriptive'], pipeline.describe(results['returns_dataframe']), check_exact=False, rtol=1e-10)
+
+def test_unchanged_sheets_are_copied(cache):
+    study = {**_study('2023-06-30'), 'output': 'incremental.xlsx', 'stages': {'adf': True}}
+    first = incremental.run_incremental(study)
+    assert 'Returns' in first['sheets'] and 'ADF Results' in first['sheets']
+    location = incremental.state_location(study)
+    incremental.save_state(location, {**incremental.load_state(location), 'rows_hash': 'rows revised since the last run'})
+    rebuilt = incremental.run_incremental(study)   #Same rows again: only the GARCH summary (fit date and time) may change
+    assert rebuilt['appended'] is None
+    assert set(rebuilt['sheets']) <= {'GARCH Summary'}
+    assert sorted(os.listdir(cache / 'output' / 'incremental')) == sorted(f"{sheet}.parquet" for sheet in first['sheets'])
+    returns_sheet = pd.read_excel(cache / 'output' / 'incremental.xlsx', sheet_name='Returns', index_col=0)
+    np.testing.assert_allclose(returns_sheet.to_numpy(), first['returns_dataframe'].to_numpy())
+    appended = incremental.run_incremental({**study, 'period': {**study['period'], 'end': '2023-12-29'}})
+    assert {'Descriptive', 'ADF Results', 'GARCH', 'Returns'} <= set(appended['sheets'])
+
+def test_empty_panel_is_refused():
+    with pytest.raises(ValueError, match="no aligned returns"):
+        incremental.run_incremental(_study('2020-01-02'))
@@ -0,0 +1,105 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Key invalidation of the stage cache (memo.py): a stage is computed again exactly when its name, parameters
+#or input content change, and the load stage also when a file or the offline mode of yahoo finance changes
+import os                       #Rewrites a file between two file keys
+import pandas as pd             #Data manipulation external library
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+import pytest
+
+from thesis import memo, pipeline, price_cache, sources
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):   #Empty memory and disk store for every test
+    monkeypatch.setattr(memo, 'memo_directory', str(tmp_path / 'stages'))
+    monkeypatch.setattr(memo, 'enabled', True)
+    monkeypatch.setattr(memo, '_memory', memo.collections.OrderedDict())
+    return tmp_path
+
+class Counter:                  #compute() of a stage that counts its calls
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+#-------------------------------------------------------------------
+
+def test_stage_key_depends_on_name_params_and_input():
+    key = memo.stage_key('garch', {'p': 1}, 'abc')
+    assert key == memo.stage_key('garch', {'p': 1}, 'abc')
+    assert key != memo.stage_key('garch', {'p': 2}, 'abc')
+    assert key != memo.stage_key('garch', {'p': 1}, 'abd')
+    assert key != memo.stage_key('align', {'p': 1}, 'abc')
+
+def test_content_key_follows_numbers_not_layout():
+    frame = pd.DataFrame({'oil': [0.1, 0.2], 'gas': [0.3, 0.4]}, index=pd.DatetimeIndex(['2024-01-02', '2024-01-03']))
+    assert memo.content_key(frame) == memo.content_key(frame.copy())
+    assert memo.content_key(frame) == memo.content_key(pd.DataFrame(np.asfortranarray(frame.to_numpy()), index=frame.index, columns=frame.columns))
+    changed = frame.copy()
+    changed.iloc[1, 1] = 0.5
+    assert memo.content_key(frame) != memo.content_key(changed)
+    assert memo.content_key(frame) != memo.content_key(frame.rename(columns={'gas': 'coal'}))
+
+def test_memoize_recomputes_only_on_key_change(store):
+    compute = Counter(pd.Series([1.0, 2.0], name='x'))
+    first = memo.memoize('stage', [1], 'input', compute)
+    assert memo.memoize('stage', [1], 'input', compute)[0] == first[0]
+    assert compute.calls == 1
+    memo.memoize('stage', [2], 'input', compute)      #Other parameters
+    memo.memoize('stage', [1], 'other input', compute)
+    assert compute.calls == 3
+    assert first[0] == memo.content_key(compute.value)
+
+def test_memoize_reads_disk_after_memory_is_dropped(store):
+    compute = Counter([1, 2, 3])
+    memo.memoize('stage', None, 'input', compute)
+    memo.invalidate(memory=True, disk=False)
+    assert memo.memoize('stage', None, 'input', compute)[1] == [1, 2, 3]
+    assert compute.calls == 1
+    assert memo.invalidate('stage') == 1            #Memory and disk copies dropped
+    memo.memoize('stage', None, 'input', compute)
+    assert compute.calls == 2
+
+def test_memory_keeps_the_most_recently_used(store, monkeypatch):
+    monkeypatch.setattr(memo, 'enabled', False)     #Memory side only
+    monkeypatch.setattr(memo, 'memory_limit', 2)
+    computes = {name: Counter(name) for name in 'abc'}
+    for name in 'ab':
+        memo.memoize(name, None, None, computes[name])
+    memo.memoize('a', None, None, computes['a'])    #'b' is now the least recently used
+    memo.memoize('c', None, None, computes['c'])
+    assert len(memo._memory) == 2
+    memo.memoize('a', None, None, computes['a'])
+    memo.memoize('b', None, None, computes['b'])
+    assert {name: counter.calls for name, counter in computes.items()} == {'a': 1, 'b': 2, 'c': 1}
+
+def test_file_key_follows_file_content(tmp_path):
+    location = tmp_path / 'prices.csv'
+    location.write_text('Date,brent\n2024-01-02,80.1\n')
+    key = memo.file_key(str(location))
+    assert memo.file_key(str(location)) == key
+    location.write_text('Date,brent\n2024-01-02,80.2\n')
+    os.utime(location, ns=(0, 0))                  #A new modification time is enough, the content decides
+    assert memo.file_key(str(location)) != key
+
+def test_load_stage_key_follows_offline_mode(monkeypatch):
+    series = {'gas': {'ticker': 'NG=F', 'name': 'Natural Gas'}}
+    monkeypatch.setattr(price_cache, 'offline', False)
+    online = pipeline._source_versions(series)
+    monkeypatch.setattr(price_cache, 'offline', True)
+    assert pipeline._source_versions(series) != online
+
+def test_load_stage_key_follows_backend_override(monkeypatch):
+    series = {'gas': {'ticker': 'NG=F', 'name': 'Natural Gas'}}
+    monkeypatch.setattr(sources, 'override', None)
+    own = pipeline._source_versions(series)
+    monkeypatch.setattr(sources, 'override', 'fake')
+    assert pipeline._source_versions(series) != own
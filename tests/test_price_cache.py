@@ -0,0 +1,29 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Offline mode of the yahoo finance cache (price_cache.py): stand-ins are served only for the dates they cover
+import pytest
+
+from thesis import price_cache
+
+def test_offline_stand_in_covering_the_window():
+    bars = price_cache.download('NG=F', '2020-01-01', '2023-12-29', offline_mode=True)
+    assert bars.index.min() < price_cache._to_timestamp('2020-01-08')
+    assert bars.index.max() > price_cache._to_timestamp('2023-12-20')
+
+@pytest.mark.parametrize('start, end, missing', [
+    ('2016-01-01', '2019-12-31', 'from 2016-01-01 to 2019-12-30'),   #Before the stand-in starts
+    ('2017-01-01', '2020-12-31', 'from 2017-01-01 to 2020-01-01'),   #Only the end of the window is covered
+    ('2021-01-01', '2024-06-01', 'from 2023-12-30 to 2024-05-31'),   #After the stand-in ends
+])
+def test_offline_stand_in_not_covering_the_window(start, end, missing):
+    with pytest.raises(LookupError, match=f"'lng_gas' of NG=F has no prices {missing}"):
+        price_cache.download('NG=F', start, end, offline_mode=True)
+
+def test_ticker_without_stand_in():
+    with pytest.raises(LookupError, match=r"No offline stand-in for \^dji"):
+        price_cache.download('^dji', '2020-01-01', '2023-12-29', offline_mode=True)
@@ -0,0 +1,39 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Report writer (report.py): the workbook and its parquet folder replace the previous report only when a run finishes
+import os                       #Lists the files of the report
+import pandas as pd             #Data manipulation external library
+import pytest
+
+from thesis import report
+
+def _table(value):
+    return pd.DataFrame({'value': [value, value + 1]}, index=pd.Index(['a', 'b'], name='row'))
+
+def _write(location, sheets):
+    with report.ReportWriter(str(location), parquet=True, engine='openpyxl') as writer:
+        for sheet_name, value in sheets.items():
+            writer.add(sheet_name, _table(value))
+
+def test_sheets_a_run_no_longer_writes_are_removed(tmp_path):
+    _write(tmp_path / 'study.xlsx', {'Descriptive': 1, 'VIF': 2})
+    _write(tmp_path / 'study.xlsx', {'Descriptive': 3})
+    assert sorted(os.listdir(tmp_path / 'study')) == ['Descriptive.parquet']
+    assert pd.read_parquet(tmp_path / 'study' / 'Descriptive.parquet')['value'].tolist() == [3, 4]
+    assert sorted(os.listdir(tmp_path)) == ['study', 'study.xlsx']
+
+def test_failed_run_leaves_the_previous_report(tmp_path):
+    _write(tmp_path / 'study.xlsx', {'Descriptive': 1, 'VIF': 2})
+    with pytest.raises(RuntimeError):
+        with report.ReportWriter(str(tmp_path / 'study.xlsx'), parquet=True, engine='openpyxl') as writer:
+            writer.add('Descriptive', _table(5))
+            raise RuntimeError('stage failed')
+    assert sorted(os.listdir(tmp_path)) == ['study', 'study.xlsx']
+    assert sorted(os.listdir(tmp_path / 'study')) == ['Descriptive.parquet', 'VIF.parquet']
+    assert pd.read_parquet(tmp_path / 'study' / 'Descriptive.parquet')['value'].tolist() == [1, 2]
+    assert pd.read_excel(tmp_path / 'study.xlsx', sheet_name='Descriptive')['value'].tolist() == [1, 2]
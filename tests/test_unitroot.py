@@ -0,0 +1,25 @@
+#© 2024 
+#Author: Muhammad Fatahillah Dante <mfdantee@gmail.com> 
+#Code will be published to Author's public repository: https://github.com/app-renticeship
+#Universitas Indonesia, Faculty of Economics and Business 
+#Created to process data for bachelor's thesis
+#
+#------------------------------------------------------------------
+#Batched unit root tests (unitroot.py) refuse columns too short for the test regression
+import numpy as np              #External mathematical operations library to process large arrays and matrices (price data)
+import pandas as pd             #Data manipulation external library
+import pytest
+
+from thesis import unitroot
+
+@pytest.mark.parametrize('test', unitroot.tests)
+def test_empty_column_is_refused(test):
+    frame = pd.DataFrame({'Index': np.random.default_rng(0).standard_normal(50), 'Natural Gas': np.nan})
+    with pytest.raises(ValueError, match=r"'Natural Gas' has 0"):
+        unitroot.stationarity_table(frame, test)
+
+def test_short_column_with_many_lags_is_refused():
+    frame = pd.DataFrame({'Index': np.random.default_rng(0).standard_normal(12)})
+    with pytest.raises(ValueError, match=r"needs at least 14 observations, 'Index' has 12"):
+        unitroot.adf_batch(frame, max_lags=5)
+    assert np.isfinite(unitroot.adf_batch(frame, max_lags=2)['t-statistic'].iloc[0])